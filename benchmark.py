@@ -0,0 +1,502 @@
+"""Offline benchmark for the analysis pipeline.
+
+Drives the real code paths of main.py (analyze_text, start_analysis ->
+run_analysis -> update_result, model discovery and startup) against
+FakeGenAI, so throughput and latency can be measured without an API key,
+quota or display. Results are written as JSON and can be compared:
+
+    python benchmark.py --output once.json
+    python benchmark.py --output simdi.json --compare once.json
+"""
+import argparse
+import concurrent.futures
+import heapq
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, REPO_DIR)
+
+import main  # noqa: E402
+from fake_genai import FAKE_LATENCY_DISTRIBUTIONS, FakeGenAI  # noqa: E402
+
+BENCHMARK_VERSION = 1
+SCENARIOS = ('startup', 'analyze', 'gui', 'discovery', 'stylometry')
+
+# Gösterge ifadesi içermeyen, Türkçe görünümlü nötr kelimeler
+WORDS = (
+    'ders', 'ödev', 'kitap', 'okul', 'öğrenci', 'zaman', 'şehir', 'deniz', 'proje', 'sonuç',
+    'gün', 'hafta', 'yazı', 'konu', 'soru', 'cevap', 'fikir', 'örnek', 'tarih', 'bilim',
+    've', 'ama', 'çünkü', 'ile', 'için', 'gibi', 'daha', 'çok', 'az', 'her',
+    'geldi', 'gitti', 'yazdı', 'okudu', 'düşündü', 'anlattı', 'gördü', 'buldu', 'sordu', 'bitti'
+)
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of an unsorted list"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(latencies, elapsed, errors=0):
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'elapsed': round(elapsed, 3),
+        'throughput_per_sec': round(len(latencies) / elapsed, 2) if elapsed else None,
+        'latency_mean': round(sum(latencies) / len(latencies), 4) if latencies else None,
+        'latency_p50': round(percentile(latencies, 50), 4) if latencies else None,
+        'latency_p95': round(percentile(latencies, 95), 4) if latencies else None,
+        'latency_p99': round(percentile(latencies, 99), 4) if latencies else None,
+    }
+
+
+def peak_rss_mb():
+    # Linux'ta ru_maxrss KB, macOS'ta bayt cinsindendir
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def make_texts(count, words, indicator_rate, indicators, seed):
+    rng = random.Random(seed)
+    texts = []
+    for number in range(count):
+        body = [rng.choice(WORDS) for _ in range(words)]
+        if rng.random() < indicator_rate:
+            body.insert(rng.randrange(len(body)), rng.choice(indicators))
+        texts.append(f"{number}. " + ' '.join(body) + '.')
+    return texts
+
+
+def is_error(result):
+    return result.startswith("Analiz sırasında hata") or result.startswith("Hata:")
+
+
+class HeadlessFrame:
+    """Stands in for the Tk root: after() callbacks run on the benchmark thread"""
+
+    def __init__(self):
+        self._events = []
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def after(self, ms, callback):
+        with self._lock:
+            self._sequence += 1
+            heapq.heappush(self._events, (time.perf_counter() + ms / 1000, self._sequence, callback))
+
+    def run_until(self, done, timeout):
+        """Mainloop replacement: run due callbacks until done() or timeout"""
+        deadline = time.perf_counter() + timeout
+        while not done():
+            now = time.perf_counter()
+            if now > deadline:
+                return False
+            with self._lock:
+                event = self._events[0] if self._events else None
+                if event and event[0] <= now:
+                    heapq.heappop(self._events)
+            if event is None:
+                time.sleep(0.001)
+            elif event[0] <= now:
+                event[2]()
+            else:
+                time.sleep(min(event[0] - now, 0.005))
+        return True
+
+
+class HeadlessText:
+    """Minimal Text widget: whole-buffer delete, start/end insert, timestamps of inserts"""
+
+    def __init__(self, content=''):
+        self.content = content
+        self.first_append = None
+
+    def config(self, **kwargs):
+        pass
+
+    configure = config
+
+    def get(self, start, end=None):
+        return self.content
+
+    def delete(self, start, end=None):
+        self.content = ''
+
+    def insert(self, index, text):
+        if index == main.tk.END:
+            if self.first_append is None:
+                self.first_append = time.perf_counter()
+            self.content += text
+        else:
+            self.content = text + self.content
+
+    def see(self, index):
+        pass
+
+
+class HeadlessButton:
+    def __init__(self):
+        self.text = "Analiz Et"
+
+    def configure(self, **kwargs):
+        self.text = kwargs.get('text', self.text)
+
+
+class HeadlessWidget:
+    """Accepts any widget constructor or method call; after() goes to the shared headless loop"""
+
+    loop = None
+
+    def __init__(self, *args, **kwargs):
+        self.options = kwargs
+
+    def after(self, ms, callback):
+        HeadlessWidget.loop.after(ms, callback)
+
+    def get(self):
+        return self.options.get('value')
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class HeadlessToolkit:
+    """Module stand-in (customtkinter, tkinter) whose every attribute builds a HeadlessWidget"""
+
+    def __init__(self, **constants):
+        self.__dict__.update(constants)
+
+    def __getattr__(self, name):
+        return HeadlessWidget
+
+
+def use_headless_ui(loop):
+    """Let AIDetectionApp build its window without a display; callbacks run on `loop`"""
+    HeadlessWidget.loop = loop
+    main.ctk = HeadlessToolkit()
+    main.tk = HeadlessToolkit(END='end', WORD='word')
+    main.scrolledtext = HeadlessToolkit()
+
+
+def bench_startup(args):
+    """Cold start of AIDetectionApp in fresh interpreters, up to the verified API key.
+
+    The window is built with headless widgets unless customtkinter and a
+    display are available; everything else (config load, AIDetector
+    construction, background key verification) is the real start path.
+    """
+    script = (
+        "import time, json, os, sys\n"
+        "started = time.perf_counter()\n"
+        "import main\n"
+        "imported = time.perf_counter()\n"
+        "from benchmark import HeadlessFrame, use_headless_ui\n"
+        "from fake_genai import FakeGenAI\n"
+        "main.use_fake_backend(FakeGenAI(latency=%r, distribution='constant'))\n"
+        "headless = not (main.ctk.is_installed() and os.environ.get('DISPLAY'))\n"
+        "loop = HeadlessFrame()\n"
+        "if headless:\n"
+        "    use_headless_ui(loop)\n"
+        "ready = []\n"
+        "class App(main.AIDetectionApp):\n"
+        "    def on_api_key_verified(self, is_valid):\n"
+        "        super().on_api_key_verified(is_valid)\n"
+        "        ready.append(time.perf_counter())\n"
+        "constructing = time.perf_counter()\n"
+        "app = App()\n"
+        "constructed = time.perf_counter()\n"
+        "if headless:\n"
+        "    loop.run_until(lambda: ready, 30)\n"
+        "else:\n"
+        "    while not ready:\n"
+        "        app.app.update()\n"
+        "        time.sleep(0.001)\n"
+        "phases = main.STARTUP_TIMER.report()['phases_ms']\n"
+        "print(json.dumps({'import': imported - started, 'app': constructed - constructing,"
+        " 'first_call': phases['first network call'] / 1000, 'ready': ready[0] - started,"
+        " 'headless': headless}))\n"
+    ) % args.latency
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_DIR, os.environ.get('PYTHONPATH')])))
+
+    runs = []
+    for _ in range(args.startup_runs):
+        # Her çalıştırma boş bir klasörde başlar: yalnızca kayıtlı anahtar var, model kayıtları yok
+        workdir = tempfile.mkdtemp(prefix='startup-')
+        try:
+            with open(os.path.join(workdir, main.CONFIG_FILE), 'w') as f:
+                json.dump({'api_key': 'fake-api-key'}, f)
+            started = time.perf_counter()
+            output = subprocess.run([sys.executable, '-c', script], cwd=workdir, env=env,
+                                    capture_output=True, text=True, check=True).stdout
+            total = time.perf_counter() - started
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        runs.append(dict(json.loads(output.strip().splitlines()[-1]), process=total))
+
+    report = {
+        phase: {
+            'median': round(percentile([run[phase] for run in runs], 50), 4),
+            'min': round(min(run[phase] for run in runs), 4)
+        }
+        for phase in ('process', 'import', 'app', 'first_call', 'ready')
+    }
+    report['headless'] = runs[0]['headless']
+    return report
+
+
+def bench_analyze(detector, backend, texts, concurrency, stream):
+    """analyze_text from `concurrency` threads, as the batch mode does"""
+    latencies = []
+    errors = []
+
+    def one(text):
+        started = time.perf_counter()
+        on_chunk = (lambda piece: None) if stream else None
+        result = detector.analyze_text(text, on_chunk)
+        latencies.append(time.perf_counter() - started)
+        errors.append(is_error(result))
+
+    calls_before = backend.calls
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, texts))
+    report = summarize(latencies, time.perf_counter() - started, sum(errors))
+    report['backend_calls'] = backend.calls - calls_before
+    report['concurrency'] = concurrency
+    report['stream'] = stream
+    return report
+
+
+def bench_gui(detector, texts, timeout):
+    """start_analysis -> run_analysis -> update_result with a headless frame, one text at a time"""
+    if main.tk is None:
+        return {'skipped': "tkinter yok"}
+
+    frame = HeadlessFrame()
+    detector.content_frame = frame
+    detector.analyze_button = HeadlessButton()
+    first_chunks = []
+    latencies = []
+    errors = 0
+
+    started = time.perf_counter()
+    for text in texts:
+        detector.input_text = HeadlessText(text)
+        detector.result_text = HeadlessText()
+        clicked = time.perf_counter()
+        detector.start_analysis()
+        finished = frame.run_until(lambda: detector.analyze_button.text == "Analiz Et", timeout)
+        latencies.append(time.perf_counter() - clicked)
+        if detector.result_text.first_append is not None:
+            first_chunks.append(detector.result_text.first_append - clicked)
+        if not finished or is_error(detector.result_text.content):
+            errors += 1
+        detector.analysis_thread.join(timeout)
+
+    report = summarize(latencies, time.perf_counter() - started, errors)
+    report['first_chunk_p50'] = round(percentile(first_chunks, 50), 4) if first_chunks else None
+    report['first_chunk_p95'] = round(percentile(first_chunks, 95), 4) if first_chunks else None
+    return report
+
+
+def bench_discovery(detector, backend, workdir):
+    """Model discovery with a cold registry, then warm, then the background validation path"""
+    report = {}
+    frame = HeadlessFrame()
+    detector.content_frame = frame
+
+    for phase in ('cold', 'warm'):
+        if phase == 'cold':
+            detector.model_registry = main.ModelRegistry(os.path.join(workdir, 'bench_registry.json'))
+        calls_before = backend.calls + backend.list_calls
+        started = time.perf_counter()
+        models = detector.get_available_models()
+        report[f'get_available_models_{phase}'] = {
+            'elapsed': round(time.perf_counter() - started, 4),
+            'backend_calls': backend.calls + backend.list_calls - calls_before,
+            'models': len(models)
+        }
+
+    detector.model_registry = main.ModelRegistry(os.path.join(workdir, 'bench_registry_bg.json'))
+    calls_before = backend.calls + backend.list_calls
+    started = time.perf_counter()
+    detector.validate_models_in_background()
+    frame.run_until(lambda: not frame._events, 5)
+    report['validate_models_in_background'] = {
+        'elapsed': round(time.perf_counter() - started, 4),
+        'backend_calls': backend.calls + backend.list_calls - calls_before
+    }
+    return report
+
+
+def bench_stylometry(texts, batch_size):
+    """Offline stylometric detector: per-text cost one at a time and in array batches"""
+    detector = main.get_local_detector()
+    if detector is None:
+        return {'skipped': "numpy yok"}
+    detector.analyze_batch(texts[:1])
+
+    latencies = []
+    started = time.perf_counter()
+    for text in texts:
+        single = time.perf_counter()
+        detector.analyze_text(text)
+        latencies.append(time.perf_counter() - single)
+    report = summarize(latencies, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for offset in range(0, len(texts), batch_size):
+        detector.analyze_batch(texts[offset:offset + batch_size])
+    batch_elapsed = time.perf_counter() - started
+    report['batch_size'] = batch_size
+    report['per_text_ms_single'] = round(sum(latencies) / len(latencies) * 1000, 4)
+    report['per_text_ms_batch'] = round(batch_elapsed / len(texts) * 1000, 4)
+    return report
+
+
+def compare(current, baseline):
+    """Print relative changes of headline numbers against an earlier result file"""
+    rows = []
+    for scenario, metrics in current['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(scenario, {})
+        for key in ('throughput_per_sec', 'latency_p50', 'latency_p95', 'latency_p99', 'first_chunk_p50',
+                    'per_text_ms_batch'):
+            if isinstance(metrics.get(key), (int, float)) and base.get(key):
+                change = (metrics[key] - base[key]) / base[key] * 100
+                rows.append(f"{scenario:<16} {key:<20} {base[key]:>10} -> {metrics[key]:<10} {change:+.1f}%")
+        if scenario == 'startup' and 'process' in metrics and 'process' in base:
+            change = (metrics['process']['median'] - base['process']['median']) / base['process']['median'] * 100
+            rows.append(f"{scenario:<16} {'process_median':<20} {base['process']['median']:>10} -> "
+                        f"{metrics['process']['median']:<10} {change:+.1f}%")
+    print('\n'.join(rows), file=sys.stderr)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run(args):
+    backend = FakeGenAI(
+        latency=args.latency, jitter=args.jitter, distribution=args.distribution,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+        models=args.models, seed=args.seed, stream_chunk_chars=args.stream_chunk,
+        min_cache_tokens=main.CONTEXT_CACHE_MIN_TOKENS
+    )
+    main.use_fake_backend(backend)
+    # Sahte arka uçla kota beklemesi ölçümü bozmasın
+    main.get_analysis_engine(rpm=args.rpm, tpm=10 ** 12)
+    if args.metrics:
+        main.METRICS.enable()
+
+    # Önbellek, model kayıtları ve config.json gerçek dosyalara dokunmasın
+    workdir = tempfile.mkdtemp(prefix='benchmark-')
+    previous_dir = os.getcwd()
+    os.chdir(workdir)
+    try:
+        api_keys = [f'fake-api-key-{index}' for index in range(1, args.keys + 1)]
+        detector = main.AIDetector(api_key=api_keys, use_cache=False, local_fallback=False)
+        detector.current_model = args.models[0].split('/')[-1]
+        detector.available_models = [name.split('/')[-1] for name in args.models]
+        detector.hedge_requests = not args.no_hedge
+        detector.engine.context_cache.enabled = args.context_cache
+        texts = make_texts(args.requests, args.words, args.indicator_rate,
+                           detector.ai_features.get('ai_indicators', []), args.seed)
+
+        scenarios = {}
+        for scenario in args.scenarios:
+            print(f"{scenario}...", file=sys.stderr)
+            if scenario == 'startup':
+                scenarios['startup'] = bench_startup(args)
+            elif scenario == 'analyze':
+                scenarios['analyze'] = bench_analyze(detector, backend, texts, args.concurrency, False)
+                scenarios['analyze_stream'] = bench_analyze(detector, backend, texts, args.concurrency, True)
+            elif scenario == 'gui':
+                scenarios['gui'] = bench_gui(detector, texts[:args.gui_runs], args.timeout)
+            elif scenario == 'discovery':
+                scenarios['discovery'] = bench_discovery(detector, backend, workdir)
+            elif scenario == 'stylometry':
+                scenarios['stylometry'] = bench_stylometry(texts, args.stylometry_batch)
+            scenarios[scenario]['peak_rss_mb'] = peak_rss_mb()
+    finally:
+        os.chdir(previous_dir)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    result = {
+        'benchmark_version': BENCHMARK_VERSION,
+        'timestamp': time.time(),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'scenarios': scenarios,
+        'peak_rss_mb': peak_rss_mb(),
+        'engine': main.get_analysis_engine().stats()
+    }
+    if args.metrics:
+        result['metrics'] = main.METRICS.snapshot()
+    return result
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Sahte Gemini arka ucuyla çevrimdışı performans ölçümü")
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--requests', type=int, default=200, help="analyze senaryosundaki metin sayısı")
+    parser.add_argument('--concurrency', type=int, default=8, help="Eşzamanlı analiz sayısı")
+    parser.add_argument('--words', type=int, default=120, help="Metin başına kelime sayısı")
+    parser.add_argument('--indicator-rate', type=float, default=0.0,
+                        help="Yerel ön taramaya takılan (gösterge ifadesi içeren) metin oranı")
+    parser.add_argument('--stylometry-batch', type=int, default=main.LOCAL_BATCH_SIZE,
+                        help="Stilometri senaryosunda tek dizi geçişindeki metin sayısı")
+    parser.add_argument('--gui-runs', type=int, default=20, help="Arayüz senaryosundaki analiz sayısı")
+    parser.add_argument('--startup-runs', type=int, default=5, help="Soğuk başlangıç ölçüm sayısı")
+    parser.add_argument('--timeout', type=float, default=60, help="Tek analiz için en fazla süre, saniye")
+    parser.add_argument('--rpm', type=int, default=10 ** 6, help="Anahtar başına dakikalık istek sınırı")
+    parser.add_argument('--keys', type=int, default=1, help="Havuzdaki sahte API anahtarı sayısı")
+    parser.add_argument('--latency', type=float, default=0.05, help="Ortalama sahte API gecikmesi, saniye")
+    parser.add_argument('--jitter', type=float, default=0.02, help="Gecikmenin standart sapması, saniye")
+    parser.add_argument('--distribution', choices=FAKE_LATENCY_DISTRIBUTIONS, default='lognormal')
+    parser.add_argument('--error-rate', type=float, default=0.0, help="500 hatası oranı")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="429 hatası oranı")
+    parser.add_argument('--stream-chunk', type=int, default=16, help="Akış parçası başına karakter")
+    parser.add_argument('--models', nargs='+', default=['models/gemini-1.5-flash', 'models/gemini-1.5-pro'])
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--no-hedge', action='store_true', help="Yedekli (hedged) istekleri kapat")
+    parser.add_argument('--context-cache', action='store_true', help="Talimat önekini bağlam önbelleğine al")
+    parser.add_argument('--metrics', action='store_true', help="main.METRICS anlık görüntüsünü sonuca ekle")
+    parser.add_argument('-o', '--output', help="Sonuç JSON dosyası (varsayılan: stdout)")
+    parser.add_argument('--compare', metavar='DOSYA', help="Önceki bir sonuç dosyasıyla karşılaştır")
+    args = parser.parse_args(argv)
+
+    result = run(args)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(result, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
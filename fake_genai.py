@@ -0,0 +1,269 @@
+"""Offline stand-in for google.generativeai used by --fake-backend, benchmark.py and the tests.
+
+main.use_fake_backend() puts a FakeGenAI behind the shared GeminiClient (a
+GeminiClient can also be given its own), so the real analysis paths run end to
+end without an API key, quota or network.
+"""
+import asyncio
+import datetime
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+
+def estimate_tokens(text):
+    """Same rough estimate as main.estimate_tokens (about 4 characters per token)"""
+    return len(text) // 4 + 1
+
+
+class FakeAPIError(Exception):
+    """Error raised by FakeGenAI, carrying an HTTP-like status code"""
+    
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.code = code
+
+
+FAKE_LATENCY_DISTRIBUTIONS = ('constant', 'normal', 'lognormal', 'exponential')
+
+
+class FakeGenAI:
+    """Offline stand-in for google.generativeai, for end-to-end tests without quota.
+
+    Answers are deterministic per text (hash based) and follow whatever format
+    the request asked for: JSON verdict, packed JSON array or the text layout.
+    Latency is drawn from `distribution` with mean `latency`; `jitter` is the
+    standard deviation (normal, lognormal) and is ignored otherwise. Calls are
+    counted per API key; keys in `invalid_keys` are rejected like a revoked key.
+    Cached contents live in memory; prefixes shorter than `min_cache_tokens`
+    are refused the way the API refuses them.
+    """
+    
+    def __init__(self, latency=0.05, jitter=0.02, error_rate=0.0, rate_limit_rate=0.0,
+                 models=('models/gemini-1.5-flash', 'models/gemini-1.5-pro'), seed=None,
+                 distribution='normal', stream_chunk_chars=16, invalid_keys=(), min_cache_tokens=0):
+        if distribution not in FAKE_LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Bilinmeyen gecikme dağılımı: {distribution}")
+        self.latency = latency
+        self.jitter = jitter
+        self.distribution = distribution
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.models = list(models)
+        self.stream_chunk_chars = stream_chunk_chars
+        self.invalid_keys = set(invalid_keys)
+        self.api_key = None
+        self.calls = 0
+        self.key_calls = {}
+        self.list_calls = 0
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.types = SimpleNamespace(GenerationConfig=lambda **kwargs: SimpleNamespace(**kwargs))
+        self.transport = FakeTransport()
+        self.min_cache_tokens = min_cache_tokens
+        self.cached_contents = {}
+        self.caching = SimpleNamespace(CachedContent=FakeCachedContentFactory(self))
+        self.GenerativeModel = FakeModelFactory(self)
+    
+    def configure(self, api_key=None, **kwargs):
+        self.api_key = api_key
+    
+    def list_models(self):
+        """Model discovery; takes one sampled latency like any other round trip"""
+        with self._lock:
+            self.list_calls += 1
+            delay = self.sample_latency()
+        time.sleep(delay)
+        if self.api_key in self.invalid_keys:
+            raise FakeAPIError("400 API key not valid. Please pass a valid API key.", 400)
+        return [SimpleNamespace(name=name, supported_generation_methods=['generateContent']) for name in self.models]
+    
+    def sample_latency(self):
+        # Kilit tutulurken çağrılır (random.Random thread'ler arasında paylaşılıyor)
+        if self.distribution == 'constant' or self.latency <= 0:
+            return self.latency
+        if self.distribution == 'exponential':
+            return self.random.expovariate(1 / self.latency)
+        if self.distribution == 'lognormal':
+            # Ortalaması latency, standart sapması jitter olan log-normal
+            sigma = math.sqrt(math.log(1 + (self.jitter / self.latency) ** 2))
+            return self.random.lognormvariate(math.log(self.latency) - sigma ** 2 / 2, sigma)
+        return max(0.0, self.random.gauss(self.latency, self.jitter))
+    
+    def next_call(self, api_key=None):
+        """Count a call and return (delay, error) drawn from the configured distribution"""
+        api_key = api_key or self.api_key
+        with self._lock:
+            self.calls += 1
+            self.key_calls[api_key] = self.key_calls.get(api_key, 0) + 1
+            delay = self.sample_latency()
+            roll = self.random.random()
+        if api_key in self.invalid_keys:
+            return delay, FakeAPIError("400 API key not valid. Please pass a valid API key.", 400)
+        if roll < self.rate_limit_rate:
+            return delay, FakeAPIError("429 Resource has been exhausted (e.g. check quota).", 429)
+        if roll < self.rate_limit_rate + self.error_rate:
+            return delay, FakeAPIError("500 An internal error has occurred.", 500)
+        return delay, None
+    
+    @staticmethod
+    def verdict_for(text):
+        digest = hashlib.sha256(text.encode('utf-8')).digest()
+        return (
+            ('Yapay Zeka', 'İnsan', 'Belirsiz')[digest[0] % 3],
+            ('Düşük', 'Orta', 'Yüksek')[digest[1] % 3]
+        )
+    
+    def answer(self, prompt, generation_config=None):
+        json_mode = getattr(generation_config, 'response_mime_type', None) == 'application/json'
+        items = re.findall(r'^\[(t\d+)\]\n(.*?)(?=^\[t\d+\]\n|\Z)', prompt, re.M | re.S)
+        if json_mode and items:
+            return json.dumps([
+                dict(zip(('sonuc', 'guven'), self.verdict_for(text)), id=item_id, nedenler=["sahte yanıt"])
+                for item_id, text in items
+            ], ensure_ascii=False)
+        
+        verdict, confidence = self.verdict_for(prompt)
+        if json_mode:
+            return json.dumps({'sonuc': verdict, 'guven': confidence, 'nedenler': ["sahte yanıt"]}, ensure_ascii=False)
+        return f"- Sonuç: {verdict}\n- Güven Seviyesi: {confidence}\n- Nedenler:\n  • sahte yanıt"
+
+
+class FakeTransport:
+    """Stand-in for google.ai.generativelanguage; the service clients only remember their key"""
+    
+    @staticmethod
+    def GenerativeServiceClient(client_options=None, **kwargs):
+        return SimpleNamespace(api_key=(client_options or {}).get('api_key'))
+    
+    GenerativeServiceAsyncClient = GenerativeServiceClient
+
+
+class FakeCachedContent:
+    """In-memory cached content created by FakeGenAI"""
+    
+    def __init__(self, backend, model, display_name, system_instruction, ttl):
+        self.backend = backend
+        self.name = f"cachedContents/{id(self):x}"
+        self.model = model if model.startswith('models/') else f"models/{model}"
+        self.display_name = display_name
+        self.system_instruction = system_instruction
+        self.usage_metadata = SimpleNamespace(total_token_count=estimate_tokens(system_instruction))
+        self.update(ttl=ttl)
+    
+    def update(self, ttl=None, **kwargs):
+        if hasattr(self, 'expire_time') and not self.alive():
+            raise FakeAPIError(f"404 CachedContent not found: {self.name}", 404)
+        self.expire_time = datetime.datetime.now(datetime.timezone.utc) + ttl
+    
+    def delete(self):
+        self.backend.cached_contents.pop(self.name, None)
+    
+    def alive(self):
+        return self.name in self.backend.cached_contents \
+            and self.expire_time > datetime.datetime.now(datetime.timezone.utc)
+
+
+class FakeCachedContentFactory:
+    """Stand-in for genai.caching.CachedContent (create / list)"""
+    
+    def __init__(self, backend):
+        self.backend = backend
+    
+    def create(self, model, display_name=None, system_instruction=None, ttl=None, **kwargs):
+        tokens = estimate_tokens(system_instruction or '')
+        if tokens < self.backend.min_cache_tokens:
+            raise FakeAPIError(
+                f"400 Cached content is too small. total_token_count={tokens}, "
+                f"min_total_token_count={self.backend.min_cache_tokens}", 400
+            )
+        with self.backend._lock:
+            cache = FakeCachedContent(self.backend, model, display_name, system_instruction or '', ttl)
+            self.backend.cached_contents[cache.name] = cache
+        return cache
+    
+    def list(self):
+        return [cache for cache in list(self.backend.cached_contents.values()) if cache.alive()]
+
+
+class FakeModelFactory:
+    """Callable standing in for genai.GenerativeModel, including from_cached_content"""
+    
+    def __init__(self, backend):
+        self.backend = backend
+    
+    def __call__(self, model_name, **kwargs):
+        return FakeGenerativeModel(self.backend, model_name)
+    
+    def from_cached_content(self, cached_content, **kwargs):
+        return FakeGenerativeModel(self.backend, cached_content.model, cached_content)
+
+
+class FakeGenerativeModel:
+    """GenerativeModel replacement used by FakeGenAI"""
+    
+    def __init__(self, backend, model_name, cached_content=None):
+        self.backend = backend
+        self.model_name = model_name
+        self.cached_content = cached_content
+        self._client = None
+        self._async_client = None
+    
+    def _full_prompt(self, prompt):
+        # Önbellekli modelde talimat öneki istemden değil önbellekten gelir
+        if self.cached_content is None:
+            return str(prompt), 0
+        if not self.cached_content.alive():
+            raise FakeAPIError(f"404 CachedContent not found (or expired): {self.cached_content.name}", 404)
+        instruction = self.cached_content.system_instruction
+        return instruction + str(prompt), estimate_tokens(instruction)
+    
+    def _response(self, prompt, text, cached_tokens=0):
+        return SimpleNamespace(
+            parts=[SimpleNamespace(text=text)],
+            text=text,
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=estimate_tokens(str(prompt)),
+                candidates_token_count=estimate_tokens(text),
+                cached_content_token_count=cached_tokens
+            )
+        )
+    
+    def _chunks(self, prompt, text):
+        size = max(1, self.backend.stream_chunk_chars)
+        return [self._response(prompt, text[i:i + size]) for i in range(0, len(text), size)]
+    
+    def generate_content(self, prompt, stream=False, generation_config=None, **kwargs):
+        delay, error = self.backend.next_call(getattr(self._client, 'api_key', None))
+        time.sleep(delay)
+        if error:
+            raise error
+        prompt, cached_tokens = self._full_prompt(prompt)
+        text = self.backend.answer(prompt, generation_config)
+        return iter(self._chunks(prompt, text)) if stream else self._response(prompt, text, cached_tokens)
+    
+    async def generate_content_async(self, prompt, stream=False, generation_config=None, **kwargs):
+        delay, error = self.backend.next_call(getattr(self._async_client, 'api_key', None))
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        prompt, cached_tokens = self._full_prompt(prompt)
+        text = self.backend.answer(prompt, generation_config)
+        if not stream:
+            return self._response(prompt, text, cached_tokens)
+        
+        chunks = self._chunks(prompt, text)
+        
+        async def stream_chunks():
+            for chunk in chunks:
+                await asyncio.sleep(0)
+                yield chunk
+        return stream_chunks()
+    
+    def count_tokens(self, contents):
+        return SimpleNamespace(total_tokens=estimate_tokens(str(contents)))
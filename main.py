@@ -1,23 +1,2872 @@
-import customtkinter as ctk
-import tkinter as tk
-from tkinter import messagebox, scrolledtext
-import google.generativeai as genai
+import time
+
+# Başlangıç süresi ölçümü için modül yüklenmeye başladığı an
+_MODULE_STARTED = time.perf_counter()
+
+try:
+    import tkinter as tk
+    from tkinter import messagebox, scrolledtext
+except ImportError:
+    # GUI kütüphaneleri olmadan da (batch modu) çalışabilmek için opsiyonel
+    tk = None
+    messagebox = None
+    scrolledtext = None
+import argparse
+import atexit
+import asyncio
+import bisect
+import concurrent.futures
+import datetime
+import glob
+import gzip
+import hashlib
+import importlib
+import importlib.util
 import json
+import math
 import os
+import sqlite3
+import struct
+import unicodedata
+from collections import Counter, OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import chain, count
+from contextlib import contextmanager
+import sys
 import threading
 import queue
-import time
+import random
 import re
-import signal  # Add this import at the top with other imports
-import concurrent.futures  # Add this import at the top
+import signal
+
+
+class StartupTimer:
+    """Records per-phase startup durations so regressions can be tracked"""
+    
+    def __init__(self, started):
+        self.started = started
+        self.phases = {}
+        self._lock = threading.Lock()
+    
+    def record(self, phase, seconds):
+        with self._lock:
+            # Aynı aşama tekrar ölçülürse ilk değer korunur
+            self.phases.setdefault(phase, round(seconds * 1000, 1))
+    
+    @contextmanager
+    def measure(self, phase):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started)
+    
+    def report(self):
+        """Return phase durations and elapsed time since module load in milliseconds"""
+        with self._lock:
+            return {
+                'phases_ms': dict(self.phases),
+                'elapsed_ms': round((time.perf_counter() - self.started) * 1000, 1)
+            }
+
+
+STARTUP_TIMER = StartupTimer(_MODULE_STARTED)
+
+
+# Ölçüm (metrik) altyapısı; kapalıyken her çağrı tek bir bool kontrolüdür
+METRICS_PREFIX = 'ai_detector_'
+METRICS_SNAPSHOT_INTERVAL = 15
+METRICS_LATENCY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (Prometheus style, cumulative on export)"""
+    
+    def __init__(self, buckets=METRICS_LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+    
+    def percentile(self, q):
+        """Estimate the q-th percentile by linear interpolation inside its bucket"""
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, self.counts):
+            if count and seen + count >= rank:
+                return round(lower + (bound - lower) * (rank - seen) / count, 6)
+            seen += count
+            lower = bound
+        # Son kovanın üstü: üst sınır bilinmediği için son sınır döndürülür
+        return self.buckets[-1]
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.metrics.observe(self.name, time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class Metrics:
+    """Process-wide counters, latency histograms and gauges.
+
+    Disabled by default; observe/increment/timer return immediately until
+    enable() is called, so instrumented hot paths cost one attribute check.
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self.started = time.time()
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+        self._snapshot_thread = None
+    
+    def enable(self, enabled=True):
+        self.enabled = enabled
+    
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+    
+    def observe(self, name, value, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+    
+    def increment(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+    
+    def timer(self, name, **labels):
+        """Context manager observing the elapsed seconds of its block"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+    
+    def register_gauge(self, name, callback, **labels):
+        """callback() -> number, or {label_pairs_tuple: number}, read at export time.
+
+        Gauges are keyed by name and labels, so per-instance gauges need an
+        identifying label or a later registration replaces the earlier one.
+        """
+        with self._lock:
+            self._gauges[self._key(name, labels)] = callback
+    
+    def _read_gauges(self):
+        """Current gauge values as {(name, label_pairs): number}"""
+        with self._lock:
+            gauges = dict(self._gauges)
+        values = {}
+        for (name, labels), callback in gauges.items():
+            try:
+                value = callback()
+            except Exception as e:
+                print(f"Metrik okunamadı ({name}): {str(e)}", file=sys.stderr)
+                continue
+            if isinstance(value, dict):
+                for extra, item in value.items():
+                    values[name, labels + tuple(extra)] = item
+            else:
+                values[name, labels] = value
+        return values
+    
+    def snapshot(self):
+        """JSON-friendly view: counters, histogram percentiles and gauges"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (h.count, h.sum, h.percentile(50), h.percentile(95), h.percentile(99))
+                          for key, h in self._histograms.items()}
+        
+        def label_text(labels):
+            return ','.join(f"{k}={v}" for k, v in labels) or '_'
+        
+        result = {'timestamp': time.time(), 'uptime': round(time.time() - self.started, 1),
+                  'counters': {}, 'histograms': {}, 'gauges': {}}
+        for (name, labels), value in sorted(counters.items()):
+            result['counters'].setdefault(name, {})[label_text(labels)] = value
+        for (name, labels), value in sorted(self._read_gauges().items()):
+            result['gauges'].setdefault(name, {})[label_text(labels)] = value
+        for (name, labels), (count, total, p50, p95, p99) in sorted(histograms.items()):
+            result['histograms'].setdefault(name, {})[label_text(labels)] = {
+                'count': count,
+                'mean': round(total / count, 6) if count else None,
+                'p50': p50, 'p95': p95, 'p99': p99
+            }
+        return result
+    
+    def render_prometheus(self):
+        """Export everything in the Prometheus text exposition format"""
+        def escape(value):
+            return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        
+        def label_text(labels, extra=()):
+            pairs = [f'{k}="{escape(v)}"' for k, v in tuple(labels) + tuple(extra)]
+            return '{' + ','.join(pairs) + '}' if pairs else ''
+        
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(
+                (key, (h.buckets, list(h.counts), h.sum, h.count)) for key, h in self._histograms.items()
+            )
+        
+        lines = []
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {METRICS_PREFIX}{name} counter")
+            lines.append(f"{METRICS_PREFIX}{name}{label_text(labels)} {value}")
+        for (name, labels), (buckets, counts, total, count) in histograms:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {METRICS_PREFIX}{name} histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else f"{bound:g}"
+                lines.append(f"{METRICS_PREFIX}{name}_bucket{label_text(labels, [('le', le)])} {cumulative}")
+            lines.append(f"{METRICS_PREFIX}{name}_sum{label_text(labels)} {total:.6f}")
+            lines.append(f"{METRICS_PREFIX}{name}_count{label_text(labels)} {count}")
+        for (name, labels), value in sorted(self._read_gauges().items()):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {METRICS_PREFIX}{name} gauge")
+            lines.append(f"{METRICS_PREFIX}{name}{label_text(labels)} {value}")
+        return '\n'.join(lines) + '\n'
+    
+    def write_snapshot(self, path):
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+    
+    def start_snapshots(self, path, interval=METRICS_SNAPSHOT_INTERVAL):
+        """Enable metrics and rewrite a JSON snapshot at path every interval seconds"""
+        self.enable()
+        
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.write_snapshot(path)
+                except Exception as e:
+                    print(f"Metrik anlık görüntüsü yazılamadı: {str(e)}", file=sys.stderr)
+        
+        self._snapshot_thread = threading.Thread(target=loop, name="MetricsSnapshot", daemon=True)
+        self._snapshot_thread.start()
+
+
+METRICS = Metrics()
+
+
+class LazyModule:
+    """Module proxy that imports the real module on first attribute access"""
+    
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+    
+    def _load(self):
+        with self._lock:
+            if self._module is None:
+                with STARTUP_TIMER.measure(f'import {self._name}'):
+                    self._module = importlib.import_module(self._name)
+        return self._module
+    
+    def __getattr__(self, attr):
+        module = self._module or self._load()
+        return getattr(module, attr)
+    
+    def is_installed(self):
+        return importlib.util.find_spec(self._name.split('.')[0]) is not None
+
+
+# Ağır kütüphaneler ilk kullanımda yüklenir; batch modu customtkinter'ı hiç yüklemez
+ctk = LazyModule('customtkinter')
+genai = LazyModule('google.generativeai')
+# Havuzdaki ek anahtarların istemcileri için SDK'nın kullandığı taşıma (transport) katmanı
+glm = LazyModule('google.ai.generativelanguage')
+np = LazyModule('numpy')
+
+# Analiz prompt'u değiştiğinde artırılmalı; eski önbellek kayıtları geçersiz olur
+PROMPT_VERSION = 2
+
+# Girintisiz, kısa talimat şablonları. JSON şablonu yanıt şemasıyla, metin şablonu akış modunda kullanılır.
+ANALYSIS_PROMPT_JSON = (
+    "Metnin yapay zeka mı insan mı tarafından yazıldığını analiz et. "
+    "sonuc: Yapay Zeka|İnsan|Belirsiz; guven: Düşük|Orta|Yüksek; nedenler: en fazla 5 kısa madde.\n"
+    "Metin:\n"
+)
+ANALYSIS_PROMPT_TEXT = (
+    "Metnin yapay zeka mı insan mı tarafından yazıldığını analiz et. Yalnızca şu biçimde yanıt ver:\n"
+    "- Sonuç: Yapay Zeka|İnsan|Belirsiz\n"
+    "- Güven Seviyesi: Düşük|Orta|Yüksek\n"
+    "- Nedenler: en fazla 5 kısa madde\n"
+    "Metin:\n"
+)
+# Yerel kararı gerektirmeyen zayıf gösterge eşleşmeleri metnin ardından modele ipucu olarak gönderilir
+PRESCREEN_HINT = "\n\n(Yerel tarama notu: metinde {phrases} ifadeleri geçiyor; tek başına kanıt değildir.)"
+ANALYSIS_RESPONSE_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'sonuc': {'type': 'string'},
+        'guven': {'type': 'string'},
+        'nedenler': {'type': 'array', 'items': {'type': 'string'}}
+    },
+    'required': ['sonuc', 'guven', 'nedenler']
+}
+
+# Kısa metinleri tek istekte toplu analiz etmek için (paketleme modu)
+PACKED_PROMPT = (
+    "Her metnin yapay zeka mı insan mı tarafından yazıldığını ayrı ayrı analiz et. "
+    "Her [id] için bir kayıt döndür: id; sonuc: Yapay Zeka|İnsan|Belirsiz; guven: Düşük|Orta|Yüksek; "
+    "nedenler: en fazla 2 kısa madde.\n"
+)
+PACKED_RESPONSE_SCHEMA = {
+    'type': 'array',
+    'items': {
+        'type': 'object',
+        'properties': dict(ANALYSIS_RESPONSE_SCHEMA['properties'], id={'type': 'string'}),
+        'required': ['id'] + ANALYSIS_RESPONSE_SCHEMA['required']
+    }
+}
+
+
+class ResultCache:
+    """Persistent, thread-safe SQLite cache for analysis results"""
+    
+    def __init__(self, path='analysis_cache.db', max_entries=10000,
+                 max_bytes=50 * 1024 * 1024, ttl=7 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        # Tek bağlantı + kilit: worker thread'leri aynı bağlantıyı sırayla kullanır
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, result TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+        self._conn.commit()
+        self._entries, self._bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()
+        # Birden çok önbellek aynı metrikleri ezmesin diye her örnek kendi yolu ile etiketlenir
+        METRICS.register_gauge('cache_hit_ratio', lambda: round(self.stats()['hit_rate'], 4), cache=path)
+    
+    @staticmethod
+    def make_key(text, model, variant='', version=PROMPT_VERSION):
+        """Hash normalized text together with the model, request variant and prompt version.
+
+        `variant` names whatever else shapes the answer (template, output limit),
+        see AIDetector.cache_variant().
+        """
+        normalized = ' '.join(unicodedata.normalize('NFC', text).split())
+        payload = f"{version}\0{model}\0{variant}\0{normalized}".encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()
+    
+    def get(self, key):
+        """Return the cached result or None on a miss / expired entry"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, size, created FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                METRICS.increment('cache_lookups_total', result='miss', cache=self.path)
+                return None
+            
+            result, size, created = row
+            if self.ttl and now - created > self.ttl:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._conn.commit()
+                self._entries -= 1
+                self._bytes -= size
+                self.misses += 1
+                METRICS.increment('cache_lookups_total', result='miss', cache=self.path)
+                return None
+            
+            self._conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            METRICS.increment('cache_lookups_total', result='hit', cache=self.path)
+            return result
+    
+    def put(self, key, result):
+        """Store a result and evict least recently used entries past the bounds"""
+        now = time.time()
+        size = len(result.encode('utf-8'))
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, result, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, result, size, now, now)
+            )
+            if old:
+                self._bytes -= old[0]
+            else:
+                self._entries += 1
+            self._bytes += size
+            self._evict()
+            self._conn.commit()
+    
+    def _evict(self):
+        """Drop expired rows, then the oldest accessed ones until within bounds (lock held)"""
+        if self.ttl:
+            expired = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results WHERE created < ?",
+                (time.time() - self.ttl,)
+            ).fetchone()
+            if expired[0]:
+                self._conn.execute("DELETE FROM results WHERE created < ?", (time.time() - self.ttl,))
+                self._entries -= expired[0]
+                self._bytes -= expired[1]
+                self.evictions += expired[0]
+        
+        while self._entries > self.max_entries or self._bytes > self.max_bytes:
+            # Her turda en eski %10'luk dilimi (en az 1 kayıt) sil
+            batch = max(1, self._entries // 10)
+            rows = self._conn.execute(
+                "SELECT key, size FROM results ORDER BY accessed LIMIT ?", (batch,)
+            ).fetchall()
+            if not rows:
+                break
+            self._conn.executemany("DELETE FROM results WHERE key = ?", [(r[0],) for r in rows])
+            self._entries -= len(rows)
+            self._bytes -= sum(r[1] for r in rows)
+            self.evictions += len(rows)
+    
+    def stats(self):
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': self._entries,
+                'bytes': self._bytes
+            }
+    
+    def clear(self):
+        """Remove every cached result"""
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+            self._entries = 0
+            self._bytes = 0
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Kalıcı iş kuyruğu: geçici hatalar bu kadar denemeye kadar artan beklemeyle yeniden kuyruğa alınır
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BASE_DELAY = 30
+JOB_RETRY_MAX_DELAY = 3600
+
+
+class JobStore:
+    """Durable SQLite job queue: pending -> in_flight -> done / failed, with retry backoff.
+
+    One runner per job file is assumed: jobs left in_flight by a crashed run
+    are returned to pending when the store is opened.
+    """
+    
+    def __init__(self, path, max_attempts=JOB_MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, state TEXT NOT NULL DEFAULT 'pending', "
+            "attempts INTEGER NOT NULL DEFAULT 0, not_before REAL NOT NULL DEFAULT 0, "
+            "result TEXT, error TEXT, updated REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, not_before)")
+        self._conn.execute("UPDATE jobs SET state = 'pending' WHERE state = 'in_flight'")
+    
+    def add(self, paths):
+        """Register inputs; paths already in the store keep their state"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO jobs (path, updated) VALUES (?, ?)",
+                ((path, time.time()) for path in paths)
+            )
+            self._conn.execute("COMMIT")
+    
+    def claim(self):
+        """Atomically move the next due pending job to in_flight; returns (id, path) or None"""
+        with self._lock:
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, path FROM jobs WHERE state = 'pending' AND not_before <= ? "
+                    "ORDER BY id LIMIT 1", (now,)
+                ).fetchone()
+                if row:
+                    self._conn.execute(
+                        "UPDATE jobs SET state = 'in_flight', attempts = attempts + 1, updated = ? WHERE id = ?",
+                        (now, row[0])
+                    )
+            finally:
+                self._conn.execute("COMMIT")
+            return row
+    
+    def complete(self, job_id, result):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET state = 'done', result = ?, error = NULL, updated = ? WHERE id = ?",
+                (result, time.time(), job_id)
+            )
+    
+    def fail(self, job_id, error, retryable=False):
+        """Requeue retryable failures with exponential backoff; returns the new state"""
+        with self._lock:
+            attempts, = self._conn.execute("SELECT attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            now = time.time()
+            if retryable and attempts < self.max_attempts:
+                delay = min(JOB_RETRY_MAX_DELAY, JOB_RETRY_BASE_DELAY * 2 ** (attempts - 1))
+                state = 'pending'
+            else:
+                delay = 0
+                state = 'failed'
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, not_before = ?, updated = ? WHERE id = ?",
+                (state, error, now + delay, now, job_id)
+            )
+            return state
+    
+    def retry_failed(self):
+        """Put permanently failed jobs back into the queue (e.g. after the quota reset)"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET state = 'pending', attempts = 0, not_before = 0 WHERE state = 'failed'"
+            )
+    
+    def next_retry_delay(self):
+        """Seconds until a pending job becomes due; None when nothing is left to do"""
+        with self._lock:
+            next_due, = self._conn.execute(
+                "SELECT MIN(not_before) FROM jobs WHERE state = 'pending'"
+            ).fetchone()
+            if next_due is not None:
+                return max(0.0, next_due - time.time())
+            in_flight, = self._conn.execute("SELECT COUNT(*) FROM jobs WHERE state = 'in_flight'").fetchone()
+            # Diğer worker'ların işleri yeniden kuyruğa dönebilir
+            return 1.0 if in_flight else None
+    
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = {'pending': 0, 'in_flight': 0, 'done': 0, 'failed': 0}
+        counts.update(dict(rows))
+        return counts
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Türkçe büyük/küçük harf eşlemesi: Python'un lower() fonksiyonu 'I' -> 'i' ve 'İ' -> 'i̇' (2 karakter) üretir
+TURKISH_LOWER_TABLE = str.maketrans({'I': 'ı', 'İ': 'i'})
+
+
+def turkish_casefold(text):
+    """Lowercase text with Turkish rules, keeping every character offset unchanged"""
+    folded = text.translate(TURKISH_LOWER_TABLE).lower()
+    if len(folded) == len(text):
+        return folded
+    # Nadir durum: uzunluğu değişen karakterler varsa karakter karakter katla
+    return ''.join(
+        c if len(c.lower()) != 1 else c.lower()
+        for c in text.translate(TURKISH_LOWER_TABLE)
+    )
+
+
+class IndicatorMatcher:
+    """Aho-Corasick automaton that finds every indicator phrase in one pass"""
+    
+    def __init__(self, phrases, whole_words=True):
+        self.whole_words = whole_words
+        self.phrases = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        
+        seen = set()
+        for phrase in phrases:
+            folded = ' '.join(turkish_casefold(phrase).split())
+            if folded and folded not in seen:
+                seen.add(folded)
+                self._add(folded, len(self.phrases))
+                self.phrases.append(folded)
+        self._build()
+    
+    def _add(self, phrase, index):
+        node = 0
+        for char in phrase:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = next_node
+        self._out[node] = (index,)
+    
+    def _build(self):
+        """Compute failure links breadth-first and merge outputs along them"""
+        pending = deque(self._goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for char, child in self._goto[node].items():
+                pending.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                if self._out[self._fail[child]]:
+                    self._out[child] = self._out[child] + self._out[self._fail[child]]
+    
+    def scan(self, text):
+        """Return (start, end, phrase) for every indicator occurrence in text.
+
+        Whitespace runs match a single space; offsets refer to the original text.
+        """
+        folded = turkish_casefold(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        hits = []
+        node = 0
+        # Daraltılmış metindeki her karakterin orijinal metindeki konumu
+        offsets = []
+        
+        for position, char in enumerate(folded):
+            if char.isspace():
+                if offsets and folded[offsets[-1]].isspace():
+                    continue
+                char = ' '
+            offsets.append(position)
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            
+            for index in out[node]:
+                phrase = self.phrases[index]
+                start = offsets[len(offsets) - len(phrase)]
+                end = position + 1
+                if self.whole_words and (
+                    (start > 0 and folded[start - 1].isalnum()) or
+                    (end < len(folded) and folded[end].isalnum())
+                ):
+                    continue
+                hits.append((start, end, phrase))
+        
+        hits.sort()
+        return hits
+
+
+# Yakın kopya tespiti: kelime shingle'ları + MinHash imzası + LSH bantları
+DUPLICATE_THRESHOLD = 0.8
+DUPLICATE_NUM_PERM = 128
+DUPLICATE_SHINGLE_WORDS = 3
+DUPLICATE_MAX_CANDIDATES = 200
+DUPLICATE_WORD_RE = re.compile(r"\w+")
+# 32 bitlik kıyım değerleri için asal modül; a * h + b taşmadan 64 bite sığar
+_MINHASH_PRIME = 4294967291
+
+
+class NearDuplicateIndex:
+    """Persistent MinHash/LSH index of analyzed texts for near-duplicate lookup.
+
+    Texts are reduced to word shingles and a MinHash signature whose matching
+    positions estimate Jaccard similarity. Signatures are split into bands; a
+    lookup only compares documents sharing at least one band bucket, so query
+    time grows with the number of near matches rather than the corpus size.
+    """
+    
+    def __init__(self, path='duplicates.db', threshold=DUPLICATE_THRESHOLD, num_perm=DUPLICATE_NUM_PERM,
+                 shingle_words=DUPLICATE_SHINGLE_WORDS):
+        self.path = path
+        self.threshold = threshold
+        self.hits = 0
+        self.lookups = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "id INTEGER PRIMARY KEY, source TEXT, result TEXT NOT NULL, signature BLOB NOT NULL, "
+            "created REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS buckets (band INTEGER NOT NULL, bucket INTEGER NOT NULL, "
+            "document INTEGER NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS buckets_lookup ON buckets (band, bucket);"
+        )
+        
+        # İmza parametreleri dosyaya yazılır; var olan bir dizin her zaman kendi parametreleriyle açılır
+        bands, rows = self.optimal_bands(threshold, num_perm)
+        defaults = {'num_perm': num_perm, 'shingle_words': shingle_words, 'bands': bands, 'rows': rows}
+        stored = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+        if not stored:
+            self._conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)",
+                                   [(key, str(value)) for key, value in defaults.items()])
+            self._conn.commit()
+            stored = defaults
+        self.num_perm = int(stored['num_perm'])
+        self.shingle_words = int(stored['shingle_words'])
+        self.bands = int(stored['bands'])
+        self.rows = int(stored['rows'])
+        
+        generator = random.Random(self.num_perm)
+        self._permutations = [
+            (generator.randrange(1, _MINHASH_PRIME), generator.randrange(0, _MINHASH_PRIME))
+            for _ in range(self.num_perm)
+        ]
+        self._format = f"<{self.num_perm}I"
+        self._np_permutations = None
+    
+    @staticmethod
+    def optimal_bands(threshold, num_perm):
+        """Pick (bands, rows) whose S-curve threshold (1/b)^(1/r) sits just below `threshold`"""
+        def curve_threshold(option):
+            bands, rows = option
+            return (1 / bands) ** (1 / rows)
+        
+        options = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+        below = [option for option in options if curve_threshold(option) <= threshold]
+        if below:
+            return max(below, key=curve_threshold)
+        return min(options, key=lambda option: abs(curve_threshold(option) - threshold))
+    
+    def shingles(self, text):
+        words = DUPLICATE_WORD_RE.findall(turkish_casefold(unicodedata.normalize('NFC', text)))
+        size = self.shingle_words
+        if len(words) <= size:
+            return {' '.join(words)} if words else set()
+        return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    
+    def signature(self, text):
+        """MinHash signature (num_perm 32-bit values), or None for texts without words"""
+        hashes = [
+            int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=4).digest(), 'little')
+            for shingle in self.shingles(text)
+        ]
+        if not hashes:
+            return None
+        prime = _MINHASH_PRIME
+        if np.is_installed():
+            # numpy varsa aynı değerler vektörel hesaplanır; bellek için shingle'lar bloklar hâlinde işlenir
+            if self._np_permutations is None:
+                self._np_permutations = np.array(self._permutations, dtype=np.uint64).T[:, :, None]
+            a, b = self._np_permutations
+            values = np.array(hashes, dtype=np.uint64)
+            signature = np.full(self.num_perm, prime, dtype=np.uint64)
+            for start in range(0, len(values), 4096):
+                block = (a * values[None, start:start + 4096] + b) % np.uint64(prime)
+                signature = np.minimum(signature, block.min(axis=1))
+            return signature.tolist()
+        return [min((a * h + b) % prime for h in hashes) for a, b in self._permutations]
+    
+    def _band_keys(self, signature):
+        rows = self.rows
+        for band in range(self.bands):
+            values = struct.pack(f"<{rows}I", *signature[band * rows:(band + 1) * rows])
+            yield band, int.from_bytes(hashlib.blake2b(values, digest_size=8).digest(), 'little', signed=True)
+    
+    @staticmethod
+    def similarity(first, second):
+        return sum(a == b for a, b in zip(first, second)) / len(first)
+    
+    def query(self, text, signature=None):
+        """Best earlier document with estimated Jaccard >= threshold, as a dict, or None"""
+        signature = signature or self.signature(text)
+        if signature is None:
+            return None
+        
+        best = None
+        with self._lock:
+            self.lookups += 1
+            shared_bands = Counter()
+            for band, key in self._band_keys(signature):
+                shared_bands.update(row[0] for row in self._conn.execute(
+                    "SELECT document FROM buckets WHERE band = ? AND bucket = ?", (band, key)
+                ))
+            
+            # Çok bant paylaşan aday daha benzerdir; sınır kova sırasına göre değil bu sayıya göre uygulanır
+            for document, _ in shared_bands.most_common(DUPLICATE_MAX_CANDIDATES):
+                row = self._conn.execute(
+                    "SELECT source, result, signature FROM documents WHERE id = ?", (document,)
+                ).fetchone()
+                score = self.similarity(signature, struct.unpack(self._format, row[2]))
+                if score >= self.threshold and (best is None or score > best['similarity']):
+                    best = {'id': document, 'source': row[0], 'result': row[1], 'similarity': round(score, 3)}
+            if best:
+                self.hits += 1
+        return best
+    
+    def add(self, text, result, source=None, signature=None):
+        """Insert an analyzed text incrementally; returns its document id (None if it has no words)"""
+        signature = signature or self.signature(text)
+        if signature is None:
+            return None
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO documents (source, result, signature, created) VALUES (?, ?, ?, ?)",
+                (source, result, struct.pack(self._format, *signature), time.time())
+            )
+            document = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO buckets (band, bucket, document) VALUES (?, ?, ?)",
+                [(band, key, document) for band, key in self._band_keys(signature)]
+            )
+            self._conn.commit()
+        return document
+    
+    def stats(self):
+        with self._lock:
+            documents = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            return {'documents': documents, 'lookups': self.lookups, 'hits': self.hits,
+                    'bands': self.bands, 'rows': self.rows}
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Uzun belge modu: bu sınırın üzerindeki metinler bölümlere ayrılıp paralel analiz edilir
+LONG_DOCUMENT_TOKENS = 8000
+LONG_DOCUMENT_CHUNK_TOKENS = 4000
+LONG_DOCUMENT_WORKERS = 16
+
+# Paragraf modu: sonuçlar paragraf hash'i ile saklanır, yeniden analizde yalnızca değişen paragraflar gönderilir.
+# Başlık gibi çok kısa paragraflar bir sonrakiyle birleştirilir.
+PARAGRAPH_SPLIT_RE = re.compile(r'\n\s*\n')
+PARAGRAPH_MIN_WORDS = 8
+PARAGRAPH_CACHE_SIZE = 2000
+PARAGRAPH_TAGS = {'Yapay Zeka': 'paragraph_ai', 'İnsan': 'paragraph_human', 'Belirsiz': 'paragraph_unsure'}
+PARAGRAPH_TAG_COLORS = {'paragraph_ai': '#f8d0d0', 'paragraph_human': '#d0f0d8', 'paragraph_unsure': '#f3ecc2'}
+
+VERDICT_SCORES = {'Yapay Zeka': 1.0, 'İnsan': -1.0, 'Belirsiz': 0.0}
+CONFIDENCE_WEIGHTS = {'Düşük': 1.0, 'Orta': 2.0, 'Yüksek': 3.0}
+
+
+# Akış modunda sonuç kuyruğunun arayüz tarafından boşaltılma sıklığı (ms)
+ANALYSIS_POLL_MS = 50
+# Arayüzde tek analiz için süre sınırı (saniye) ve pencere başına aynı anda çalışabilecek analiz sayısı
+ANALYSIS_TIMEOUT = 120
+ANALYSIS_MAX_IN_FLIGHT = 2
+
+
+def response_text(response):
+    """Join the text of a (possibly multi-part) Gemini response or stream chunk"""
+    try:
+        if hasattr(response, 'parts'):
+            return ' '.join(part.text for part in response.parts)
+        if hasattr(response, 'candidates') and response.candidates and \
+                hasattr(response.candidates[0].content, 'parts'):
+            return ' '.join(part.text for part in response.candidates[0].content.parts)
+    except ValueError:
+        # Güvenlik filtresi vb. nedeniyle metni olmayan parça
+        return ''
+    # Fallback for simple responses
+    return str(response)
+
+
+def estimate_tokens(text):
+    """Rough local token estimate (about 4 characters per token)"""
+    return len(text) // 4 + 1
+
+
+def format_json_verdict(raw):
+    """Render a JSON verdict in the usual Sonuç / Güven Seviyesi / Nedenler layout"""
+    try:
+        data = json.loads(raw)
+        reasons = data.get('nedenler') or []
+        if isinstance(reasons, str):
+            reasons = [reasons]
+        return (
+            f"- Sonuç: {data.get('sonuc', 'Belirsiz')}\n"
+            f"- Güven Seviyesi: {data.get('guven', 'Düşük')}\n"
+            "- Nedenler:\n" + '\n'.join(f"  • {reason}" for reason in reasons)
+        )
+    except (ValueError, AttributeError):
+        # JSON değilse modelin yanıtını olduğu gibi göster
+        return raw
+
+
+def response_usage(response):
+    """Return {'input_tokens', 'output_tokens'} from a response's usage metadata"""
+    usage = getattr(response, 'usage_metadata', None)
+    return {
+        'input_tokens': getattr(usage, 'prompt_token_count', 0) or 0,
+        'output_tokens': getattr(usage, 'candidates_token_count', 0) or 0
+    }
+
+
+PACK_MAX_CHARS = 500
+PACK_TOKEN_BUDGET = 6000
+PACK_MAX_ITEMS = 50
+PACK_OUTPUT_TOKENS_PER_ITEM = 80
+PACK_RETRIES = 2
+# Paket istemiyle alınan sonuçlar tek metin istemiyle alınanlardan ayrı önbellek anahtarıyla saklanır
+PACKED_CACHE_VARIANT = f'packed:{PACK_OUTPUT_TOKENS_PER_ITEM}'
+
+
+def pack_texts(items, token_budget=PACK_TOKEN_BUDGET, max_items=PACK_MAX_ITEMS):
+    """Group (id, text) pairs greedily into packs that fit the token budget"""
+    packs = []
+    current = []
+    used = 0
+    for item_id, text in items:
+        tokens = estimate_tokens(text) + 8
+        if current and (used + tokens > token_budget or len(current) >= max_items):
+            packs.append(current)
+            current = []
+            used = 0
+        current.append((item_id, text))
+        used += tokens
+    if current:
+        packs.append(current)
+    return packs
+
+
+def parse_packed_verdicts(raw, expected_ids):
+    """Map id -> rendered verdict for every well-formed item in a packed JSON response, in any order"""
+    try:
+        items = json.loads(raw)
+    except ValueError:
+        return {}
+    if isinstance(items, dict):
+        items = items.get('items') or items.get('sonuclar') or [items]
+    
+    verdicts = {}
+    for item in items if isinstance(items, list) else []:
+        # Aynı id birden çok kez dönerse ilk geçerli kayıt kullanılır
+        if not isinstance(item, dict) or str(item.get('id')) not in expected_ids or str(item['id']) in verdicts:
+            continue
+        rendered = format_json_verdict(json.dumps(item, ensure_ascii=False))
+        if parse_verdict(rendered)[0] is not None:
+            verdicts[str(item['id'])] = rendered
+    return verdicts
+
+
+# Tek bir istek için token bütçesi; aşan metinler bölümlenir ('chunk') veya kırpılır ('trim')
+INPUT_TOKEN_BUDGET = LONG_DOCUMENT_TOKENS
+MAX_OUTPUT_TOKENS = 512
+# Kırpmada cümle sonu, sınırın en fazla bu oranı kadar gerisindeyse tercih edilir; değilse kelime sınırında kesilir
+TRIM_SENTENCE_SLACK = 0.1
+
+
+class TokenBudget:
+    """Input and output token limits for a single analysis request"""
+    
+    def __init__(self, input_tokens=INPUT_TOKEN_BUDGET, output_tokens=MAX_OUTPUT_TOKENS, overflow='chunk'):
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.overflow = overflow
+    
+    def count(self, text, model_name=None, client=None):
+        """Estimate tokens locally; ask count_tokens only when the estimate is near the limit"""
+        estimate = estimate_tokens(text)
+        if model_name and 0.8 * self.input_tokens <= estimate <= 1.25 * self.input_tokens:
+            try:
+                return (client or get_gemini_client()).model(model_name).count_tokens(text).total_tokens
+            except Exception as e:
+                print(f"Token sayımı yapılamadı, tahmin kullanılıyor: {str(e)}", file=sys.stderr)
+        return estimate
+    
+    def fits(self, text, model_name=None, client=None):
+        return self.count(text, model_name, client) <= self.input_tokens
+    
+    def trim(self, text):
+        """Cut text to the budget at the last sentence boundary near the limit, else at the last word boundary"""
+        limit = self.input_tokens * 4
+        if len(text) <= limit:
+            return text
+        # Arama sınırın bir karakter ötesine bakar: işaretten sonraki boşluk kesilen metne girmez
+        sentence_end = max(text.rfind(mark, 0, limit + 1) for mark in ('. ', '! ', '? ', '\n')) + 1
+        if sentence_end > 0 and sentence_end >= limit * (1 - TRIM_SENTENCE_SLACK):
+            cut = sentence_end
+        else:
+            cut = text.rfind(' ', 0, limit)
+        return text[:cut if cut > 0 else limit].rstrip()
+
+
+def split_into_chunks(text, max_tokens=LONG_DOCUMENT_CHUNK_TOKENS):
+    """Split text on paragraph, then sentence boundaries into token-bounded chunks"""
+    max_chars = max_tokens * 4
+    pieces = []
+    
+    for paragraph in re.split(r'\n\s*\n', text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        
+        for sentence in re.split(r'(?<=[.!?…])\s+', paragraph):
+            while len(sentence) > max_chars:
+                # Cümle tek başına sınırı aşıyorsa son boşluktan böl
+                cut = sentence.rfind(' ', 0, max_chars)
+                if cut <= 0:
+                    cut = max_chars
+                pieces.append(sentence[:cut])
+                sentence = sentence[cut:].lstrip()
+            if sentence:
+                pieces.append(sentence)
+    
+    chunks = []
+    current = ''
+    for piece in pieces:
+        if current and len(current) + len(piece) + 2 > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_paragraphs(text, min_words=PARAGRAPH_MIN_WORDS):
+    """Return (start, end) character spans of the blank-line separated paragraphs of text"""
+    spans = []
+    start = None
+    stop = 0
+    position = 0
+    for match in chain(PARAGRAPH_SPLIT_RE.finditer(text), [None]):
+        end = match.start() if match else len(text)
+        body = text[position:end]
+        if body.strip():
+            if start is None:
+                start = position + len(body) - len(body.lstrip())
+            stop = end - (len(body) - len(body.rstrip()))
+            if len(text[start:stop].split()) >= min_words:
+                spans.append((start, stop))
+                start = None
+        position = match.end() if match else len(text)
+    if start is not None:
+        # Sondaki kısa paragraf öncekine eklenir
+        spans[-1:] = [(spans[-1][0] if spans else start, stop)]
+    return spans
+
+
+def parse_verdict(result):
+    """Extract (Sonuç, Güven Seviyesi) from a model response, None when missing"""
+    verdict = None
+    confidence = None
+    
+    match = re.search(r'Sonuç\W*:?\s*\**\s*\[?([^\]\n*]+)', result)
+    if match:
+        value = turkish_casefold(match.group(1))
+        if 'yapay' in value:
+            verdict = 'Yapay Zeka'
+        elif 'insan' in value:
+            verdict = 'İnsan'
+        elif 'belirsiz' in value:
+            verdict = 'Belirsiz'
+    
+    match = re.search(r'Güven Seviyesi\W*:?\s*\**\s*\[?([^\]\n*]+)', result)
+    if match:
+        value = turkish_casefold(match.group(1))
+        if 'düşük' in value:
+            confidence = 'Düşük'
+        elif 'orta' in value:
+            confidence = 'Orta'
+        elif 'yüksek' in value:
+            confidence = 'Yüksek'
+    
+    return verdict, confidence
+
+
+def reduce_verdicts(sections):
+    """Combine per-section (chunk, result) pairs into one document-level report"""
+    total_weight = 0.0
+    score = 0.0
+    counts = {'Yapay Zeka': 0, 'İnsan': 0, 'Belirsiz': 0}
+    lines = []
+    offset = 0
+    
+    for number, (chunk, result) in enumerate(sections, 1):
+        verdict, confidence = parse_verdict(result)
+        span = f"{offset + 1}-{offset + len(chunk)}"
+        offset += len(chunk)
+        
+        if verdict is None:
+            lines.append(f"  • Bölüm {number} ({span} karakter): Değerlendirilemedi - {result[:120]}")
+            continue
+        
+        # Her bölüm uzunluğu ve güven seviyesi oranında oy verir
+        weight = len(chunk) * CONFIDENCE_WEIGHTS.get(confidence, 1.0)
+        score += VERDICT_SCORES[verdict] * weight
+        total_weight += weight
+        counts[verdict] += 1
+        lines.append(f"  • Bölüm {number} ({span} karakter): {verdict} ({confidence or 'Bilinmiyor'})")
+    
+    if not total_weight:
+        return "Analiz sırasında hata oluştu: Hiçbir bölüm değerlendirilemedi.\n" + '\n'.join(lines)
+    
+    score /= total_weight
+    if score > 0.2:
+        verdict = 'Yapay Zeka'
+    elif score < -0.2:
+        verdict = 'İnsan'
+    else:
+        verdict = 'Belirsiz'
+    
+    strength = abs(score)
+    if strength >= 0.6:
+        confidence = 'Yüksek'
+    elif strength >= 0.3:
+        confidence = 'Orta'
+    else:
+        confidence = 'Düşük'
+    
+    return (
+        f"- Sonuç: {verdict}\n"
+        f"- Güven Seviyesi: {confidence}\n"
+        "- Nedenler:\n"
+        f"  • Belge {len(sections)} bölüm halinde analiz edildi: "
+        f"{counts['Yapay Zeka']} Yapay Zeka, {counts['İnsan']} İnsan, {counts['Belirsiz']} Belirsiz\n"
+        f"  • Ağırlıklı skor: {score:+.2f} (-1 İnsan, +1 Yapay Zeka)\n"
+        "- Bölüm Sonuçları:\n" + '\n'.join(lines)
+    )
+
+
+# Yapılandırılmış sonuç kaydı: karar ve güven kodları VERDICTS / CONFIDENCES sırasındaki indekslerdir
+VERDICTS = ('Yapay Zeka', 'İnsan', 'Belirsiz')
+CONFIDENCES = ('Düşük', 'Orta', 'Yüksek')
+PRESCREEN_MODEL = 'indicators'
+# Tek başına yerel karar için yeterli öz-tanımlama ifadeleri; diğer göstergeler için en az bu kadar farklı ifade gerekir
+AI_SELF_REFERENCES = (
+    'olarak bir yapay zeka modeli',
+    'bir dil modeli olarak',
+    'bir yapay zeka olarak',
+)
+PRESCREEN_MIN_HITS = 2
+REASON_LINE_RE = re.compile(r'^\s*(?:[•*]|-|\d+[.)])\s*(.+?)\s*$')
+SECTION_HEADER_RE = re.compile(r'^\s*-\s*[^:•]{1,40}:\s*$')
+REASON_MAX_CHARS = 300
+
+
+class AnalysisResult:
+    """Typed outcome of one analysis, parsed once from the rendered verdict text.
+
+    verdict and confidence are None when the text has no verdict (errors,
+    cancellations). to_compact() is the storage form, a short JSON array:
+    [verdict code, confidence code, model, latency ms, input tokens, output tokens, reasons]
+    with -1 for a missing code or latency.
+    """
+    
+    __slots__ = ('verdict', 'confidence', 'reasons', 'model', 'latency', 'input_tokens', 'output_tokens')
+    
+    def __init__(self, verdict=None, confidence=None, reasons=(), model=None, latency=None,
+                 input_tokens=0, output_tokens=0):
+        self.verdict = verdict
+        self.confidence = confidence
+        self.reasons = list(reasons)
+        self.model = model
+        self.latency = latency
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+    
+    @classmethod
+    def parse(cls, text, model=None, latency=None, input_tokens=0, output_tokens=0):
+        """Build a record from the Sonuç / Güven Seviyesi / Nedenler layout"""
+        verdict, confidence = parse_verdict(text or '')
+        reasons = []
+        in_reasons = False
+        for line in (text or '').splitlines():
+            if 'Nedenler' in line:
+                in_reasons = True
+                continue
+            if not in_reasons:
+                continue
+            if SECTION_HEADER_RE.match(line):
+                # "- Bölüm Sonuçları:" gibi yeni bir başlık nedenleri bitirir
+                break
+            match = REASON_LINE_RE.match(line)
+            if match:
+                reasons.append(match.group(1)[:REASON_MAX_CHARS])
+        return cls(verdict, confidence, reasons, model, latency, input_tokens, output_tokens)
+    
+    def to_dict(self):
+        return {
+            'verdict': self.verdict,
+            'confidence': self.confidence,
+            'reasons': self.reasons,
+            'model': self.model,
+            'latency': None if self.latency is None else round(self.latency, 3),
+            'input_tokens': self.input_tokens,
+            'output_tokens': self.output_tokens
+        }
+    
+    def to_compact(self):
+        return [
+            VERDICTS.index(self.verdict) if self.verdict in VERDICTS else -1,
+            CONFIDENCES.index(self.confidence) if self.confidence in CONFIDENCES else -1,
+            self.model,
+            -1 if self.latency is None else round(self.latency * 1000),
+            self.input_tokens,
+            self.output_tokens,
+            self.reasons
+        ]
+    
+    @classmethod
+    def from_compact(cls, values):
+        verdict, confidence, model, latency, input_tokens, output_tokens, reasons = values
+        return cls(
+            VERDICTS[verdict] if verdict >= 0 else None,
+            CONFIDENCES[confidence] if confidence >= 0 else None,
+            reasons, model, None if latency < 0 else latency / 1000, input_tokens, output_tokens
+        )
+    
+    @classmethod
+    def from_record(cls, record):
+        """Read a batch / pipe output record: compact ('r'), structured fields or the raw 'result' text"""
+        if 'r' in record:
+            return cls.from_compact(record['r'])
+        latency = record.get('latency', record.get('elapsed'))
+        usage = (record.get('input_tokens', 0) or 0, record.get('output_tokens', 0) or 0)
+        if 'verdict' in record:
+            return cls(record['verdict'], record.get('confidence'), record.get('reasons') or (),
+                       record.get('model'), latency, *usage)
+        return cls.parse(record.get('result'), record.get('model'), latency, *usage)
+
+
+# Yerel (çevrimdışı) stilometrik analiz
+STYLOMETRY_WORD_RE = re.compile(r"[^\W\d_]+")
+STYLOMETRY_SENTENCE_RE = re.compile(r"[.!?…]+(?=\s|$)|\n\s*\n")
+STYLOMETRY_MIN_WORDS = 30
+FUNCTION_WORDS = (
+    've', 'bir', 'bu', 'da', 'de', 'için', 'ile', 'gibi', 'daha', 'çok', 'ama', 'ise', 'ki',
+    'mi', 'ne', 'o', 'şu', 'her', 'en', 'kadar', 'sonra', 'önce', 'hem', 'veya', 'ya', 'göre',
+    'çünkü', 'eğer', 'hiç', 'bile', 'sadece', 'artık', 'aynı', 'diğer', 'tüm', 'bütün'
+)
+# Yapay zeka metinlerinde sık görülen bağlaçlar / geçiş ifadeleri
+CONNECTIVE_WORDS = (
+    'ayrıca', 'özellikle', 'böylece', 'dolayısıyla', 'ancak', 'bununla', 'birlikte', 'öte',
+    'yandan', 'sonuç', 'olarak', 'önemli', 'genel', 'nitekim', 'kapsamında'
+)
+STYLOMETRY_FEATURES = (
+    'sentence_mean', 'burstiness', 'guiraud_ttr', 'function_word_rate', 'connective_rate',
+    'comma_rate', 'question_exclamation_rate', 'other_punctuation_rate', 'repeated_bigram_rate',
+    'mean_word_length'
+)
+# El ile ayarlanmış doğrusal model (eğitilmiş bir sınıflandırıcı değil): (merkez, ağırlık).
+# İşlev kelimesi oranı: kendiliğinden yazılan Türkçe metinde 'da/de', 'ki', 'mi', 'bile', 'hiç' gibi
+# ilgeç ve pekiştirmeler sıktır; model metinleri içerik kelimesi yoğunluğu yüksek, resmi bir dil kurar.
+# Oranın tipik aralığı (~0.08-0.16) içinde 0.04'lük fark, bağlaç oranındaki benzer bir sapma kadar
+# (~0.3 logit) etki eder. Ağırlıklar henüz etiketli veriyle doğrulanmadı.
+STYLOMETRY_WEIGHTS = {
+    'sentence_mean': (15.0, 0.05),
+    'burstiness': (-0.2, -4.0),
+    'guiraud_ttr': (7.0, 0.1),
+    'function_word_rate': (0.12, -8.0),
+    'connective_rate': (0.03, 15.0),
+    'comma_rate': (0.06, 8.0),
+    'question_exclamation_rate': (0.05, -6.0),
+    'other_punctuation_rate': (0.02, -5.0),
+    'repeated_bigram_rate': (0.02, -5.0),
+    'mean_word_length': (6.0, 0.6)
+}
+
+
+class StylometricDetector:
+    """Offline detector that scores stylometric features of whole batches with NumPy.
+
+    Tokenization is per text (compiled regexes); every feature after that is
+    computed for the whole batch at once on flattened token arrays.
+    """
+    
+    name = 'stylometry'
+    
+    def __init__(self):
+        self.centers = np.array([STYLOMETRY_WEIGHTS[f][0] for f in STYLOMETRY_FEATURES])
+        self.weights = np.array([STYLOMETRY_WEIGHTS[f][1] for f in STYLOMETRY_FEATURES])
+    
+    def features(self, texts):
+        """Return an (n, len(STYLOMETRY_FEATURES)) feature matrix and per-text word counts"""
+        n = len(texts)
+        folded = [turkish_casefold(text) for text in texts]
+        tokens = [STYLOMETRY_WORD_RE.findall(text) for text in folded]
+        counts = np.fromiter((len(words) for words in tokens), dtype=np.int64, count=n)
+        safe_counts = np.maximum(counts, 1)
+        
+        vocab = {}
+        flat = list(chain.from_iterable(tokens))
+        ids = np.fromiter((vocab.setdefault(word, len(vocab)) for word in flat), dtype=np.int64, count=len(flat))
+        doc = np.repeat(np.arange(n), counts)
+        size = max(len(vocab), 1)
+        
+        # Farklı kelime sayısı: (belge, kelime) çiftlerinin tekilleri
+        types = np.bincount(np.unique(doc * size + ids) // size, minlength=n)
+        guiraud = types / np.sqrt(safe_counts)
+        
+        def rate(words):
+            mask = np.zeros(size, dtype=bool)
+            mask[[vocab[word] for word in words if word in vocab]] = True
+            return np.bincount(doc, weights=mask[ids], minlength=n) / safe_counts
+        
+        word_lengths = np.fromiter((len(word) for word in vocab), dtype=np.float64, count=len(vocab))
+        mean_word_length = np.bincount(doc, weights=word_lengths[ids], minlength=n) / safe_counts \
+            if len(vocab) else np.zeros(n)
+        
+        # Aynı belgede tekrar eden kelime ikilileri
+        same_doc = doc[1:] == doc[:-1]
+        bigram_doc = doc[:-1][same_doc]
+        bigrams = ids[:-1][same_doc] * size + ids[1:][same_doc]
+        order = np.lexsort((bigrams, bigram_doc))
+        bigram_doc, bigrams = bigram_doc[order], bigrams[order]
+        repeated = (bigram_doc[1:] == bigram_doc[:-1]) & (bigrams[1:] == bigrams[:-1])
+        repeated_bigram_rate = np.bincount(bigram_doc[1:][repeated], minlength=n) / \
+            np.maximum(np.bincount(bigram_doc, minlength=n), 1)
+        
+        # Cümle uzunlukları (kelime) -> ortalama ve patlamalılık (burstiness)
+        sentences = [
+            [len(part.split()) for part in STYLOMETRY_SENTENCE_RE.split(text) if part.strip()]
+            for text in texts
+        ]
+        sentence_counts = np.fromiter((len(lengths) for lengths in sentences), dtype=np.int64, count=n)
+        lengths = np.fromiter(chain.from_iterable(sentences), dtype=np.float64, count=int(sentence_counts.sum()))
+        sentence_doc = np.repeat(np.arange(n), sentence_counts)
+        safe_sentences = np.maximum(sentence_counts, 1)
+        sentence_mean = np.bincount(sentence_doc, weights=lengths, minlength=n) / safe_sentences
+        sentence_square = np.bincount(sentence_doc, weights=lengths ** 2, minlength=n) / safe_sentences
+        sentence_std = np.sqrt(np.maximum(sentence_square - sentence_mean ** 2, 0))
+        burstiness = (sentence_std - sentence_mean) / np.maximum(sentence_std + sentence_mean, 1e-9)
+        
+        punctuation = np.array([[text.count(c) for c in ',?!;:-()"'] for text in texts], dtype=np.float64)
+        punctuation = punctuation.reshape(n, 9)
+        
+        matrix = np.column_stack((
+            sentence_mean,
+            burstiness,
+            guiraud,
+            rate(FUNCTION_WORDS),
+            rate(CONNECTIVE_WORDS),
+            punctuation[:, 0] / safe_counts,
+            punctuation[:, 1:3].sum(axis=1) / safe_sentences,
+            punctuation[:, 3:].sum(axis=1) / safe_counts,
+            repeated_bigram_rate,
+            mean_word_length
+        ))
+        return matrix, counts
+    
+    def analyze_batch(self, texts):
+        """Return (verdict, confidence, ai_probability) for every text in one array pass"""
+        if not texts:
+            return []
+        return self.score(*self.features(texts))
+    
+    def score(self, matrix, counts):
+        """Turn a feature matrix from features() into (verdict, confidence, ai_probability) rows"""
+        logits = (matrix - self.centers) @ self.weights
+        probabilities = 1.0 / (1.0 + np.exp(-logits))
+        
+        verdicts = np.where(probabilities >= 0.65, 'Yapay Zeka', np.where(probabilities <= 0.35, 'İnsan', 'Belirsiz'))
+        margin = np.abs(probabilities - 0.5)
+        confidences = np.where(margin >= 0.35, 'Yüksek', np.where(margin >= 0.2, 'Orta', 'Düşük'))
+        
+        # Çok kısa metinlerde stilometri güvenilir değil
+        short = counts < STYLOMETRY_MIN_WORDS
+        verdicts[short] = 'Belirsiz'
+        confidences[short] = 'Düşük'
+        return list(zip(verdicts.tolist(), confidences.tolist(), probabilities.round(3).tolist()))
+    
+    def analyze_text(self, text, reason=None):
+        """Analyze a single text and render the usual Sonuç / Güven Seviyesi layout"""
+        matrix, counts = self.features([text])
+        (verdict, confidence, probability), = self.score(matrix, counts)
+        values = dict(zip(STYLOMETRY_FEATURES, matrix[0].round(3).tolist()))
+        lines = [
+            f"  • Yapay zeka olasılığı (yerel tahmin): %{probability * 100:.0f}",
+            f"  • Cümle uzunluğu ortalaması: {values['sentence_mean']}, değişkenlik (burstiness): {values['burstiness']}",
+            f"  • Kelime çeşitliliği (Guiraud): {values['guiraud_ttr']}, bağlaç oranı: {values['connective_rate']}, "
+            f"işlev kelimesi oranı: {values['function_word_rate']}",
+            "  • Sonuç çevrimdışı stilometrik analizle üretildi (API çağrısı yapılmadı)"
+        ]
+        if reason:
+            lines.append(f"  • {reason}")
+        return (
+            f"- Sonuç: {verdict}\n"
+            f"- Güven Seviyesi: {confidence}\n"
+            "- Nedenler:\n" + '\n'.join(lines)
+        )
+
+
+_local_detector = None
+
+
+def get_local_detector():
+    """Return the shared StylometricDetector, or None when numpy is not installed"""
+    global _local_detector
+    if _local_detector is None and np.is_installed():
+        _local_detector = StylometricDetector()
+    return _local_detector
+
+
+# API anahtarları: 'api_key' birincil anahtardır, 'api_keys' varsa havuzun tamamını tutar
+CONFIG_FILE = 'config.json'
+
+
+def load_api_keys(path=CONFIG_FILE):
+    """Load the key pool from the config file, primary key first"""
+    try:
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                config = json.load(f)
+            keys = [config.get('api_key')] + list(config.get('api_keys') or [])
+            return [key.strip() for key in dict.fromkeys(keys) if isinstance(key, str) and key.strip()]
+    except Exception as e:
+        print(f"API key yüklenirken hata: {str(e)}", file=sys.stderr)
+    return []
+
+
+def save_api_key(api_key, path=CONFIG_FILE):
+    """Save `api_key` as the primary key, keeping the rest of the pool"""
+    try:
+        keys = list(dict.fromkeys([api_key] + load_api_keys(path)))
+        config = {'api_key': api_key}
+        if len(keys) > 1:
+            config['api_keys'] = keys
+        with open(path, 'w') as f:
+            json.dump(config, f)
+        return True
+    except Exception as e:
+        print(f"API key kaydedilirken hata: {str(e)}", file=sys.stderr)
+        return False
+
+
+class GeminiClient:
+    """Thread-safe shared Gemini client: configures once and pools model instances.
+
+    `backend` stands in for the google.generativeai module (fake_genai.FakeGenAI
+    in tests); every SDK call made for this client goes through it.
+    """
+    
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.api_key = None
+        self.extra_keys = []
+        self.calls = {}
+        self.errors = {}
+        self._configured = False
+        self._models = {}
+        self._key_clients = {}
+        self._lock = threading.Lock()
+    
+    def configure(self, api_key, extra_keys=None):
+        """Remember the primary API key; the SDK's configure runs lazily and only when the key changes.
+
+        `extra_keys` replaces the rest of the key pool; when omitted the pool is kept.
+        """
+        with self._lock:
+            if extra_keys is not None:
+                self.extra_keys = [key for key in dict.fromkeys(extra_keys) if key]
+            if api_key != self.api_key:
+                self.api_key = api_key
+                self._configured = False
+                # Eski anahtara bağlı istemcileri tutan model nesneleri artık kullanılmaz
+                self._models.clear()
+    
+    @property
+    def sdk(self):
+        return self.backend or genai
+    
+    @property
+    def transport(self):
+        return self.backend.transport if self.backend else glm
+    
+    def use_backend(self, backend):
+        """Send every later SDK call to `backend` (None: the real SDK); pooled models are dropped"""
+        with self._lock:
+            self.backend = backend
+            self._configured = False
+            self._models.clear()
+            self._key_clients.clear()
+    
+    def generation_config(self, **kwargs):
+        return self.sdk.types.GenerationConfig(**kwargs)
+    
+    def keys(self):
+        """All configured keys, primary first"""
+        with self._lock:
+            return [key for key in dict.fromkeys([self.api_key] + self.extra_keys) if key]
+    
+    def _ensure_configured(self):
+        # Kilit tutulurken çağrılır
+        if not self._configured:
+            if not self.api_key:
+                raise Exception("API anahtarı gerekli.")
+            self.sdk.configure(api_key=self.api_key)
+            self._configured = True
+    
+    def _bind_key(self, instance, api_key):
+        # Kilit tutulurken çağrılır. genai.configure tek bir genel anahtar tutar ve SDK model başına anahtar
+        # seçeneği sunmaz; havuzdaki diğer anahtarlar için GenerativeModel'in tembel oluşturduğu özel
+        # _client/_async_client alanlarına client_options ile o anahtara kurulmuş istemciler yazılır
+        missing = [name for name in ('_client', '_async_client') if not hasattr(instance, name)]
+        if missing:
+            # SDK bu alanları kaldırdıysa istek sessizce birincil anahtarla gitmesin
+            raise RuntimeError(
+                f"Bu google-generativeai sürümünde GenerativeModel.{', '.join(missing)} yok; "
+                "ek API anahtarları kullanılamıyor (yalnızca birincil anahtarı kullanın)."
+            )
+        clients = self._key_clients.get(api_key)
+        if clients is None:
+            options = {'api_key': api_key}
+            clients = self._key_clients[api_key] = (
+                self.transport.GenerativeServiceClient(client_options=options),
+                self.transport.GenerativeServiceAsyncClient(client_options=options)
+            )
+        instance._client, instance._async_client = clients
+    
+    def model(self, name, api_key=None):
+        """Return the pooled GenerativeModel for `name`, bound to `api_key` (default: primary key).
+
+        Model instances keep their underlying transport client (and its open
+        connection) after the first call, so reusing them avoids per-request setup.
+        """
+        with self._lock:
+            self._ensure_configured()
+            api_key = api_key or self.api_key
+            instance = self._models.get((name, api_key))
+            if instance is None:
+                instance = self.sdk.GenerativeModel(name)
+                if api_key != self.api_key:
+                    self._bind_key(instance, api_key)
+                self._models[(name, api_key)] = instance
+            return instance
+    
+    def list_models(self):
+        with self._lock:
+            self._ensure_configured()
+        return self.sdk.list_models()
+    
+    def caching(self):
+        """The SDK's caching module, configured for the primary key"""
+        with self._lock:
+            self._ensure_configured()
+        return self.sdk.caching
+    
+    def record_call(self, name, error=False):
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+            if error:
+                self.errors[name] = self.errors.get(name, 0) + 1
+    
+    def stats(self):
+        """Per-model call and error counters"""
+        with self._lock:
+            return {
+                name: {'calls': count, 'errors': self.errors.get(name, 0)}
+                for name, count in self.calls.items()
+            }
+
+
+_gemini_client = None
+_gemini_client_lock = threading.Lock()
+
+
+def get_gemini_client():
+    """Return the process-wide GeminiClient"""
+    global _gemini_client
+    with _gemini_client_lock:
+        if _gemini_client is None:
+            _gemini_client = GeminiClient()
+        return _gemini_client
+
+
+# Bağlam önbelleği (cached content): sabit talimat öneki model başına bir kez yüklenir, istekler yalnızca metni gönderir.
+# API'nin kabul ettiği en küçük önbellek boyutu model ailesine göre değişir; daha kısa önekler için hiç denenmez.
+CONTEXT_CACHE_TTL = 3600
+CONTEXT_CACHE_REFRESH_MARGIN = 60
+CONTEXT_CACHE_MIN_TOKENS = 1024
+# Geçici hatalarda (kota, zaman aşımı, sunucu hatası) önbellek bu süre sonra yeniden denenir
+CONTEXT_CACHE_RETRY_DELAY = 300
+CONTEXT_CACHE_DISPLAY_PREFIX = 'ai-detector-'
+
+
+def prefix_cache_name(prefix):
+    """Display name of the cache holding `prefix`; PROMPT_VERSION is part of it so template changes invalidate"""
+    digest = hashlib.sha256(prefix.encode('utf-8')).hexdigest()[:16]
+    return f"{CONTEXT_CACHE_DISPLAY_PREFIX}v{PROMPT_VERSION}-{digest}"
+
+
+def is_cache_miss_error(error):
+    """Return True when a request referenced a cached content that expired or was deleted"""
+    message = str(error).lower()
+    return ('cachedcontent' in message or 'cached content' in message) \
+        and ('not found' in message or 'expired' in message or getattr(error, 'code', None) == 404)
+
+
+def is_cache_unsupported_error(error):
+    """Return True when the API definitively refuses to cache a prefix for a model (too short, unsupported)"""
+    message = str(error).lower()
+    return getattr(error, 'code', None) in (400, 403, 404) \
+        or any(marker in message for marker in ('too small', 'min_total_token_count', 'not supported', 'çok kısa'))
+
+
+class ContextCache:
+    """Gemini cached-content entries for fixed instruction prefixes, one per (model, prefix).
+
+    The prefix is uploaded once as the cache's system instruction and requests
+    then send only the document, so cached and uncached calls see the same
+    instruction. Entries are refreshed shortly before their TTL runs out; caches
+    left over from an older PROMPT_VERSION are deleted. Prefixes below the API's
+    minimum size are never uploaded and models the API refuses to cache fall
+    back to the full prompt for good; transient failures are retried after
+    CONTEXT_CACHE_RETRY_DELAY. Caches belong to the primary key's project, so
+    other pool keys send the full prompt.
+    """
+    
+    def __init__(self, client, ttl=CONTEXT_CACHE_TTL, min_tokens=CONTEXT_CACHE_MIN_TOKENS):
+        self.client = client
+        self.enabled = False
+        self.ttl = ttl
+        self.min_tokens = min_tokens
+        self.unsupported = {}
+        self._retry_at = {}
+        self._entries = {}
+        self._locks = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+    
+    def _count(self, model_name, name, delta=1):
+        with self._lock:
+            counters = self._stats.setdefault(model_name, {
+                'cached_requests': 0, 'full_requests': 0, 'prefix_tokens_saved': 0,
+                'created': 0, 'refreshed': 0, 'invalidated': 0
+            })
+            counters[name] += delta
+    
+    async def model(self, model_name, api_key, prefix):
+        """Return (model bound to the cached prefix, prefix tokens), or (None, 0) to send the full prompt"""
+        if not self.enabled or not prefix or api_key != self.client.api_key:
+            return None, 0
+        key = (model_name, prefix_cache_name(prefix))
+        if key in self.unsupported:
+            return None, 0
+        
+        entry = self._entries.get(key)
+        if entry is None or entry['expires'] - time.time() < CONTEXT_CACHE_REFRESH_MARGIN:
+            if time.time() < self._retry_at.get(key, 0):
+                return self._usable(entry)
+            lock = self._locks.setdefault(key, asyncio.Lock())
+            # Aynı önek için eşzamanlı istekler tek bir önbellek oluşturur
+            async with lock:
+                entry = self._entries.get(key)
+                if entry is None or entry['expires'] - time.time() < CONTEXT_CACHE_REFRESH_MARGIN:
+                    if time.time() < self._retry_at.get(key, 0) or key in self.unsupported:
+                        return self._usable(entry)
+                    loop = asyncio.get_running_loop()
+                    try:
+                        entry = await loop.run_in_executor(None, self._prepare, model_name, prefix, key[1], entry)
+                    except Exception as e:
+                        self._failed(key, e)
+                        return self._usable(entry)
+                    with self._lock:
+                        self._entries[key] = entry
+                        self._retry_at.pop(key, None)
+        return entry['model'], entry['tokens']
+    
+    @staticmethod
+    def _usable(entry):
+        """(model, tokens) of an entry that has not expired yet, else (None, 0)"""
+        if entry is not None and entry['expires'] > time.time():
+            return entry['model'], entry['tokens']
+        return None, 0
+    
+    def _failed(self, key, error):
+        """Give up on a cache the API refuses; transient failures are retried after CONTEXT_CACHE_RETRY_DELAY"""
+        model_name = key[0]
+        with self._lock:
+            if is_cache_unsupported_error(error):
+                self.unsupported[key] = str(error)[:200]
+                self._entries.pop(key, None)
+                notice = "kullanılamıyor, tam istem gönderilecek"
+            else:
+                self._retry_at[key] = time.time() + CONTEXT_CACHE_RETRY_DELAY
+                notice = f"şu an oluşturulamadı, {CONTEXT_CACHE_RETRY_DELAY} saniye sonra yeniden denenecek"
+        print(f"{model_name}: bağlam önbelleği {notice} ({str(error)[:200]})", file=sys.stderr)
+    
+    def _prepare(self, model_name, prefix, display_name, entry):
+        """Refresh, reuse or create the cache for one prefix (blocking SDK calls, run in an executor)"""
+        tokens = estimate_tokens(prefix)
+        if tokens < self.min_tokens:
+            raise ValueError(f"önek önbellek için çok kısa ({tokens} < {self.min_tokens} token)")
+        caching = self.client.caching()
+        ttl = datetime.timedelta(seconds=self.ttl)
+        
+        cache = None
+        if entry is not None:
+            try:
+                entry['cache'].update(ttl=ttl)
+                self._count(model_name, 'refreshed')
+                cache = entry['cache']
+            except Exception:
+                # Süresi dolmuş ya da silinmiş: yenisi oluşturulur
+                pass
+        if cache is None:
+            cache = self._adopt(caching, model_name, display_name)
+        if cache is None:
+            cache = caching.CachedContent.create(
+                model=model_name, display_name=display_name, system_instruction=prefix, ttl=ttl
+            )
+            self._count(model_name, 'created')
+        
+        usage = getattr(cache, 'usage_metadata', None)
+        return {
+            'cache': cache,
+            'model': self.client.sdk.GenerativeModel.from_cached_content(cached_content=cache),
+            'expires': time.time() + self.ttl,
+            'tokens': getattr(usage, 'total_token_count', None) or tokens
+        }
+    
+    def _adopt(self, caching, model_name, display_name):
+        """Reuse a live cache from an earlier run and delete ones built from an older template"""
+        found = None
+        current_version = f"{CONTEXT_CACHE_DISPLAY_PREFIX}v{PROMPT_VERSION}-"
+        for cache in caching.CachedContent.list():
+            name = getattr(cache, 'display_name', '') or ''
+            if not name.startswith(CONTEXT_CACHE_DISPLAY_PREFIX) or not cache.model.endswith(model_name):
+                continue
+            if not name.startswith(current_version):
+                try:
+                    cache.delete()
+                    self._count(model_name, 'invalidated')
+                except Exception:
+                    pass
+            elif name == display_name and found is None:
+                found = cache
+        if found is not None:
+            found.update(ttl=datetime.timedelta(seconds=self.ttl))
+        return found
+    
+    def invalidate(self, model_name, prefix):
+        """Forget a cache the API no longer knows; the next request recreates it"""
+        with self._lock:
+            self._entries.pop((model_name, prefix_cache_name(prefix)), None)
+    
+    def record(self, model_name, cached_tokens):
+        """Count one request; cached_tokens is 0 when the full prompt was sent"""
+        if not self.enabled:
+            return
+        if cached_tokens:
+            self._count(model_name, 'cached_requests')
+            self._count(model_name, 'prefix_tokens_saved', cached_tokens)
+            METRICS.increment('context_cache_saved_tokens_total', cached_tokens, model=model_name)
+        else:
+            self._count(model_name, 'full_requests')
+    
+    def stats(self):
+        """Per-model cached/full request counts, prefix tokens not re-sent and cache lifecycle counters"""
+        with self._lock:
+            report = {name: dict(counters) for name, counters in self._stats.items()}
+            for (model_name, _), reason in self.unsupported.items():
+                report.setdefault(model_name, {})['unsupported'] = reason
+            return report
+
+
+# Model başına dakikalık istek (RPM) ve token (TPM) kotaları; MODEL_RATE_LIMITS ile modele özel ayarlanabilir
+DEFAULT_RPM = 15
+DEFAULT_TPM = 1000000
+MODEL_RATE_LIMITS = {}
+ENGINE_MAX_CONCURRENCY = 64
+RATE_LIMIT_RETRIES = 5
+
+# Anahtar havuzu: anahtar başına günlük istek kotası (RPD, None ise sınırsız) ve rotasyon dışı kalma süreleri
+DEFAULT_RPD = None
+KEY_RATE_LIMIT_COOLDOWN = 1
+KEY_MAX_COOLDOWN = 60
+KEY_INVALID_COOLDOWN = 3600
+
+# Yedekli (hedged) istekler: yanıt p95 süresini aşarsa ikinci bir kopya gönderilir
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_SAMPLES = 20
+HEDGE_DEFAULT_DELAY = 10.0
+HEDGE_MIN_DELAY = 0.5
+HEDGE_MAX_RATIO = 0.1
+HEDGE_LATENCY_SAMPLES = 200
+
+# Devre kesici: art arda hatalardan sonra model bir süre kullanılmaz, sonra tek bir deneme yapılır
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_RECOVERY_TIMEOUT = 30
+CIRCUIT_MAX_RECOVERY_TIMEOUT = 600
+
+
+class AnalysisError(Exception):
+    """Analysis failure raised instead of an error string when AIDetector.raise_errors is set"""
+    
+    def __init__(self, message, retryable=False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the API while a model's circuit breaker is open"""
+    
+    code = 503
+    
+    def __init__(self, model_name, retry_in):
+        super().__init__(
+            f"{model_name} art arda hatalar nedeniyle geçici olarak devre dışı (unavailable); "
+            f"{retry_in:.0f} sn sonra yeniden denenecek."
+        )
+        self.model_name = model_name
+
+
+class CancelScope:
+    """Cancellation handle for one analysis: an optional deadline plus the engine calls it started.
+
+    cancel() cancels every pending call at once, so the waiting thread is
+    released and the event loop stops reading the response or stream.
+    """
+    
+    def __init__(self, timeout=None):
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.cancelled = False
+        self._futures = set()
+        self._lock = threading.Lock()
+    
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            futures = list(self._futures)
+        for future in futures:
+            future.cancel()
+    
+    def add(self, future):
+        with self._lock:
+            cancelled = self.cancelled
+            if not cancelled:
+                self._futures.add(future)
+        if cancelled:
+            future.cancel()
+            return
+        # Kilit dışında: bitmiş bir future'da geri çağırma hemen, bu thread'de çalışır ve kilidi ister
+        future.add_done_callback(self._discard)
+    
+    def _discard(self, future):
+        with self._lock:
+            self._futures.discard(future)
+    
+    def remaining(self):
+        return None if self.deadline is None else self.deadline - time.monotonic()
+    
+    def check(self):
+        """Raise before starting new work if the scope was cancelled or its deadline passed"""
+        if self.cancelled:
+            raise concurrent.futures.CancelledError()
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise TimeoutError("Analiz süresi doldu (deadline).")
+
+
+def is_retryable_error(error):
+    """Return True for errors worth retrying later (quota, timeouts, server-side failures)"""
+    if is_rate_limit_error(error) or getattr(error, 'code', None) in (500, 502, 503, 504):
+        return True
+    message = str(error).lower()
+    return any(word in message for word in (
+        'timeout', 'timed out', 'deadline', 'unavailable', 'connection', 'internal', '503', '500'
+    ))
+
+
+def is_rate_limit_error(error):
+    """Return True for 429 / quota exhausted errors from the Gemini API"""
+    if getattr(error, 'code', None) == 429:
+        return True
+    message = str(error).lower()
+    return '429' in message or 'resource exhausted' in message or 'resourceexhausted' in message \
+        or 'quota' in message or 'rate limit' in message
+
+
+def is_invalid_key_error(error):
+    """Return True when the API rejected the key itself (invalid, expired or revoked)"""
+    if getattr(error, 'code', None) == 401:
+        return True
+    message = str(error).lower()
+    return 'api key not valid' in message or 'api_key_invalid' in message or 'invalid api key' in message \
+        or 'api key expired' in message
+
+
+def error_type(error):
+    """Short error category used as a metrics label"""
+    message = str(error).lower()
+    if is_rate_limit_error(error):
+        return 'rate_limit'
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError)) or 'deadline' in message or 'timed out' in message:
+        return 'timeout'
+    if is_invalid_key_error(error) or 'api key' in message or 'api_key' in message:
+        return 'invalid_key'
+    code = getattr(error, 'code', None)
+    if isinstance(code, int) and code >= 500:
+        return 'server'
+    return type(error).__name__
+
+
+class TokenBucket:
+    """Budget of `per_minute` units that refills continuously"""
+    
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def wait_time(self, amount):
+        """Seconds until `amount` units are available (0 if available now)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+    
+    def consume(self, amount):
+        self.tokens -= min(amount, self.capacity)
+    
+    def used(self):
+        """Fraction of the budget currently spent; read-only, so safe to call from other threads"""
+        tokens = min(self.capacity, self.tokens + (time.monotonic() - self.updated) * self.rate)
+        return 1 - max(0.0, tokens) / self.capacity
+    
+    def drain(self):
+        """Empty the bucket, e.g. after the server reported a 429"""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+class RateLimiter:
+    """Per-model RPM and TPM token buckets; callers wait instead of failing"""
+    
+    def __init__(self, rpm=DEFAULT_RPM, tpm=DEFAULT_TPM, model_limits=None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.model_limits = dict(MODEL_RATE_LIMITS if model_limits is None else model_limits)
+        self._buckets = {}
+        self._locks = {}
+    
+    def _get(self, model_name):
+        if model_name not in self._buckets:
+            rpm, tpm = self.model_limits.get(model_name, (self.rpm, self.tpm))
+            self._buckets[model_name] = (TokenBucket(rpm), TokenBucket(tpm))
+            self._locks[model_name] = asyncio.Lock()
+        return self._buckets[model_name], self._locks[model_name]
+    
+    async def acquire(self, model_name, tokens):
+        """Wait until one request and `tokens` tokens fit in the model's budget"""
+        (requests, token_bucket), lock = self._get(model_name)
+        # Kilit sayesinde bekleyen istekler geliş sırasına göre kota alır
+        async with lock:
+            while True:
+                delay = max(requests.wait_time(1), token_bucket.wait_time(tokens))
+                if delay <= 0:
+                    requests.consume(1)
+                    token_bucket.consume(tokens)
+                    return
+                await asyncio.sleep(delay)
+    
+    def penalize(self, model_name):
+        """Empty a model's request budget after a 429 so queued work backs off"""
+        (requests, _), _ = self._get(model_name)
+        requests.drain()
+
+
+def mask_api_key(api_key):
+    """Short form of a key that is safe to show in logs and reports"""
+    return f"{api_key[:4]}…{api_key[-6:]}" if api_key and len(api_key) > 12 else '***'
+
+
+class ApiKeyPool:
+    """Quota bookkeeping for several API keys; each request goes to the key with the most headroom.
+
+    Every key has its own per-model RPM/TPM buckets and a daily request count.
+    A key that gets a 429 leaves the rotation for a short, growing cooldown; a
+    key the API rejects is parked for KEY_INVALID_COOLDOWN. Keys are never
+    forgotten, so one bad key does not stop the others.
+    """
+    
+    def __init__(self, rpm=DEFAULT_RPM, tpm=DEFAULT_TPM, rpd=DEFAULT_RPD, model_limits=None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.rpd = rpd
+        self.model_limits = model_limits
+        self._limiters = {}
+        self._state = {}
+        self._lock = threading.Lock()
+    
+    def _get(self, api_key):
+        # Kilit tutulurken çağrılır
+        state = self._state.get(api_key)
+        if state is None:
+            self._limiters[api_key] = RateLimiter(self.rpm, self.tpm, self.model_limits)
+            state = self._state[api_key] = {
+                'day': None, 'daily_requests': 0, 'requests': 0, 'waiting': 0,
+                'input_tokens': 0, 'output_tokens': 0, 'rate_limited': 0, 'errors': 0,
+                'strikes': 0, 'disabled_until': 0.0, 'reason': None, 'error': None
+            }
+        today = time.strftime('%Y-%m-%d')
+        if state['day'] != today:
+            state['day'] = today
+            state['daily_requests'] = 0
+        return state
+    
+    def _headroom(self, api_key, state, model_name, tokens):
+        # Kilit tutulurken çağrılır: (tahmini bekleme, boş kota oranı)
+        (requests, token_bucket), _ = self._limiters[api_key]._get(model_name)
+        wait = max(requests.wait_time(1), token_bucket.wait_time(tokens))
+        # Bu anahtarda zaten sırada bekleyen istekler de beklemeye eklenir
+        wait += state['waiting'] / requests.rate
+        free = min(requests.tokens / requests.capacity, token_bucket.tokens / token_bucket.capacity)
+        if self.rpd:
+            free = min(free, 1 - state['daily_requests'] / self.rpd)
+        return wait, free
+    
+    def _choose(self, keys, model_name, tokens):
+        """Return (key, None) for the best usable key, or (None, seconds until one may come back)"""
+        now = time.monotonic()
+        best = None
+        comeback = None
+        with self._lock:
+            for api_key in keys:
+                state = self._get(api_key)
+                if state['disabled_until'] > now:
+                    if state['reason'] == 'rate_limit':
+                        comeback = min(comeback or KEY_MAX_COOLDOWN, state['disabled_until'] - now)
+                    continue
+                if self.rpd and state['daily_requests'] >= self.rpd:
+                    continue
+                wait, free = self._headroom(api_key, state, model_name, tokens)
+                # Eşitlikte (ör. kotalar dolu değilken) en az kullanılan anahtar seçilir
+                rank = (wait, -free, state['requests'])
+                if best is None or rank < best[0]:
+                    best = (rank, api_key)
+            if best is not None:
+                self._state[best[1]]['waiting'] += 1
+                return best[1], None
+            if comeback is None:
+                errors = [self._state[key]['error'] for key in keys if self._state[key]['error'] is not None]
+                if errors:
+                    raise errors[-1]
+                raise AnalysisError("Tüm API anahtarlarının günlük kotası doldu.", retryable=True)
+            return None, comeback
+    
+    async def acquire(self, keys, model_name, tokens):
+        """Wait for quota on the key with the most headroom and return that key"""
+        if not keys:
+            raise Exception("API anahtarı gerekli.")
+        while True:
+            api_key, delay = self._choose(keys, model_name, tokens)
+            if api_key is not None:
+                break
+            await asyncio.sleep(delay)
+        try:
+            await self._limiters[api_key].acquire(model_name, tokens)
+        finally:
+            with self._lock:
+                self._state[api_key]['waiting'] -= 1
+        with self._lock:
+            state = self._get(api_key)
+            state['requests'] += 1
+            state['daily_requests'] += 1
+        return api_key
+    
+    def record(self, api_key, usage):
+        """Count a successful call's tokens and clear the key's 429 streak"""
+        with self._lock:
+            state = self._get(api_key)
+            state['input_tokens'] += usage['input_tokens']
+            state['output_tokens'] += usage['output_tokens']
+            state['strikes'] = 0
+    
+    def penalize(self, api_key, model_name):
+        """Take a key out of rotation after a 429; the cooldown doubles with each consecutive 429"""
+        with self._lock:
+            state = self._get(api_key)
+            state['rate_limited'] += 1
+            state['strikes'] += 1
+            cooldown = min(KEY_MAX_COOLDOWN, KEY_RATE_LIMIT_COOLDOWN * 2 ** (state['strikes'] - 1))
+        self._limiters[api_key].penalize(model_name)
+        self.disable(api_key, cooldown, 'rate_limit')
+    
+    def disable(self, api_key, seconds, reason, error=None):
+        """Keep a key out of rotation for `seconds`"""
+        with self._lock:
+            state = self._get(api_key)
+            state['disabled_until'] = max(state['disabled_until'], time.monotonic() + seconds)
+            state['reason'] = reason
+            if error is not None:
+                state['errors'] += 1
+                state['error'] = error
+    
+    def available(self, keys):
+        """True if any of `keys` can still be used now or after a 429 cooldown"""
+        now = time.monotonic()
+        with self._lock:
+            for api_key in keys:
+                state = self._get(api_key)
+                if (state['disabled_until'] <= now or state['reason'] == 'rate_limit') \
+                        and not (self.rpd and state['daily_requests'] >= self.rpd):
+                    return True
+        return False
+    
+    def utilization(self):
+        """Per-key usage: current minute load, daily usage, tokens and rotation status"""
+        now = time.monotonic()
+        report = {}
+        with self._lock:
+            for api_key, state in self._state.items():
+                buckets = list(self._limiters[api_key]._buckets.values())
+                disabled = state['disabled_until'] > now
+                report[mask_api_key(api_key)] = {
+                    'requests': state['requests'],
+                    'daily_requests': state['daily_requests'],
+                    'daily_utilization': round(state['daily_requests'] / self.rpd, 4) if self.rpd else None,
+                    'rpm_utilization': round(max((requests.used() for requests, _ in buckets), default=0.0), 4),
+                    'tpm_utilization': round(max((tokens.used() for _, tokens in buckets), default=0.0), 4),
+                    'input_tokens': state['input_tokens'],
+                    'output_tokens': state['output_tokens'],
+                    'rate_limited': state['rate_limited'],
+                    'errors': state['errors'],
+                    'status': state['reason'] if disabled else 'active',
+                    'retry_in': round(state['disabled_until'] - now, 1) if disabled else 0.0
+                }
+        return report
+
+
+class CircuitBreaker:
+    """Per-model breaker: closed -> open after consecutive failures -> half-open trial -> closed.
+
+    While open every call is refused locally. Once the recovery timeout has
+    passed a single trial request is let through; success closes the circuit,
+    failure reopens it with a doubled timeout.
+    """
+    
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, recovery_timeout=CIRCUIT_RECOVERY_TIMEOUT,
+                 max_recovery_timeout=CIRCUIT_MAX_RECOVERY_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.base_recovery_timeout = recovery_timeout
+        self.recovery_timeout = recovery_timeout
+        self.max_recovery_timeout = max_recovery_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+    
+    def _ready(self):
+        # Kilit tutulurken çağrılır
+        return time.monotonic() - self.opened_at >= self.recovery_timeout
+    
+    def allow(self):
+        """Return True if a call may proceed; in half-open state only one trial at a time"""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open':
+                if not self._ready():
+                    return False
+                self.state = 'half_open'
+            if self._trial:
+                return False
+            self._trial = True
+            return True
+    
+    def ready_for_trial(self):
+        with self._lock:
+            return self.state != 'closed' and not self._trial and (self.state == 'half_open' or self._ready())
+    
+    def retry_in(self):
+        with self._lock:
+            return max(0.0, self.opened_at + self.recovery_timeout - time.monotonic())
+    
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self.recovery_timeout = self.base_recovery_timeout
+            self._trial = False
+    
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open':
+                self.recovery_timeout = min(self.max_recovery_timeout, self.recovery_timeout * 2)
+                self._open()
+            elif self.failures >= self.failure_threshold:
+                self._open()
+    
+    def trip(self):
+        """Open the circuit immediately (e.g. after a failed availability check)"""
+        with self._lock:
+            self._open()
+    
+    def release(self):
+        """Give up a half-open trial without an outcome (the call was cancelled)"""
+        with self._lock:
+            self._trial = False
+    
+    def _open(self):
+        self.state = 'open'
+        self.opened_at = time.monotonic()
+        self._trial = False
+
+
+class AnalysisEngine:
+    """Asyncio scheduler for Gemini calls running on its own event loop thread"""
+    
+    _instances = count(1)
+    
+    def __init__(self, rpm=DEFAULT_RPM, tpm=DEFAULT_TPM, max_concurrency=ENGINE_MAX_CONCURRENCY, rpd=DEFAULT_RPD,
+                 client=None):
+        self.client = client or get_gemini_client()
+        # RPM/TPM/RPD kotaları anahtar başınadır; her istek en çok boş kotası olan anahtara gider
+        self.key_pool = ApiKeyPool(rpm, tpm, rpd)
+        self.context_cache = ContextCache(self.client)
+        self.max_concurrency = max_concurrency
+        self.started = time.time()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rate_limited = 0
+        self.queued = 0
+        self.in_flight = 0
+        self.rate_limited_per_model = {}
+        self.tokens_per_model = {}
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.hedge_eligible = 0
+        self.circuit_rejected = 0
+        self.breakers = {}
+        self._latencies = {}
+        self._recent = deque()
+        self._stats_lock = threading.Lock()
+        
+        # Her motor kendi etiketiyle kaydolur; ikinci bir motor ilkinin göstergelerini ezmez
+        engine = str(next(self._instances))
+        METRICS.register_gauge('engine_queue_depth', lambda: self.queued, engine=engine)
+        METRICS.register_gauge('engine_in_flight', lambda: self.in_flight, engine=engine)
+        METRICS.register_gauge('circuit_state', lambda: {
+            (('model', name),): ('closed', 'half_open', 'open').index(breaker.state)
+            for name, breaker in list(self.breakers.items())
+        }, engine=engine)
+        METRICS.register_gauge('api_key_rpm_utilization', lambda: {
+            (('key', key),): usage['rpm_utilization'] for key, usage in self.key_pool.utilization().items()
+        }, engine=engine)
+        
+        self.loop = asyncio.new_event_loop()
+        self._semaphore = None
+        self._thread = threading.Thread(target=self._run_loop, name="AnalysisEngine", daemon=True)
+        self._thread.start()
+    
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.loop.run_forever()
+    
+    def submit(self, model_name, prompt, scope=None, **kwargs):
+        """Schedule a call from any thread; returns a concurrent.futures.Future.
+
+        With a CancelScope the call carries the scope's deadline down to the
+        API request and is cancelled together with the scope.
+        """
+        if scope is not None:
+            scope.check()
+            kwargs['deadline'] = scope.deadline
+        with self._stats_lock:
+            self.submitted += 1
+        future = asyncio.run_coroutine_threadsafe(self._generate(model_name, prompt, **kwargs), self.loop)
+        if scope is not None:
+            scope.add(future)
+        return future
+    
+    def generate(self, model_name, prompt, timeout=None, **kwargs):
+        """Blocking wrapper around submit() for synchronous callers"""
+        return self.submit(model_name, prompt, **kwargs).result(timeout)
+    
+    def breaker(self, model_name):
+        with self._stats_lock:
+            breaker = self.breakers.get(model_name)
+            if breaker is None:
+                breaker = self.breakers[model_name] = CircuitBreaker()
+            return breaker
+    
+    def is_healthy(self, model_name):
+        """True while the model's circuit is closed"""
+        return self.breaker(model_name).state == 'closed'
+    
+    def recover(self, model_name):
+        """Send a one-token recovery probe when an open circuit is due for its trial"""
+        if self.breaker(model_name).ready_for_trial():
+            config = self.client.generation_config(max_output_tokens=1, temperature=0)
+            self.submit(model_name, "test", generation_config=config)
+    
+    def hedge_delay(self, model_name):
+        """p95 of recent end-to-end latencies, or a conservative default until enough samples exist"""
+        with self._stats_lock:
+            samples = sorted(self._latencies.get(model_name, ()))
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        index = min(len(samples) - 1, int(len(samples) * HEDGE_PERCENTILE / 100))
+        return max(HEDGE_MIN_DELAY, samples[index])
+    
+    def generate_hedged(self, model_name, prompt, hedge_model=None, timeout=None, scope=None, **kwargs):
+        """Blocking call that hedges slow requests; returns (response, model that answered).
+
+        If the first request has not answered by the model's p95 deadline, a
+        duplicate goes to hedge_model (or the same model) and whichever succeeds
+        first wins; the other is cancelled. Hedges are capped at HEDGE_MAX_RATIO
+        of requests so a slow period cannot double the quota spent. When the
+        hedge wins, the time so far is still recorded for the primary model as a
+        lower bound of its latency, so slow periods raise the p95 deadline.
+        """
+        started = time.perf_counter()
+        primary = self.submit(model_name, prompt, scope=scope, **kwargs)
+        futures = {primary: model_name}
+        
+        done, _ = concurrent.futures.wait([primary], timeout=self.hedge_delay(model_name))
+        with self._stats_lock:
+            self.hedge_eligible += 1
+            may_hedge = not done and self.hedged < self.hedge_eligible * HEDGE_MAX_RATIO \
+                and not (scope and scope.cancelled)
+            if may_hedge:
+                self.hedged += 1
+        if may_hedge:
+            hedge_model = hedge_model or model_name
+            METRICS.increment('hedged_requests_total', model=model_name)
+            futures[self.submit(hedge_model, prompt, scope=scope, **kwargs)] = hedge_model
+        
+        pending = set(futures)
+        error = None
+        primary_failed = False
+        while pending:
+            remaining = None if timeout is None else max(0.0, started + timeout - time.perf_counter())
+            done, pending = concurrent.futures.wait(
+                pending, timeout=remaining, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            if not done:
+                for future in pending:
+                    future.cancel()
+                raise TimeoutError(f"{model_name} {timeout:g} saniyede yanıt vermedi.")
+            
+            for future in done:
+                if future.cancelled() or future.exception() is not None:
+                    error = error or (future.exception() if not future.cancelled() else None)
+                    primary_failed = primary_failed or future is primary
+                    continue
+                for other in pending:
+                    other.cancel()
+                answered_by = futures[future]
+                if not primary_failed:
+                    # Yedek kazandıysa birincil en az bu kadar sürerdi (sansürlü örnek); atlanırsa p95
+                    # yalnızca hızlı yanıtlardan hesaplanır ve yavaş dönemde eşik düşük kalır
+                    with self._stats_lock:
+                        samples = self._latencies.setdefault(model_name, deque(maxlen=HEDGE_LATENCY_SAMPLES))
+                        samples.append(time.perf_counter() - started)
+                if future is not primary:
+                    self._count('hedge_wins', 1)
+                    METRICS.increment('hedge_wins_total', model=answered_by)
+                return future.result(), answered_by
+        raise error or concurrent.futures.CancelledError()
+    
+    async def _generate(self, model_name, prompt, on_chunk=None, should_stop=None,
+                        generation_config=None, deadline=None, prefix=None):
+        breaker = self.breaker(model_name)
+        if not breaker.allow():
+            self._count('circuit_rejected', 1)
+            raise CircuitOpenError(model_name, breaker.retry_in())
+        try:
+            call = self._generate_with_retries(
+                model_name, prompt, on_chunk, should_stop, generation_config, deadline, prefix
+            )
+            if deadline is None:
+                response = await call
+            else:
+                try:
+                    response = await asyncio.wait_for(call, max(0.0, deadline - time.monotonic()))
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"{model_name}: analiz süresi doldu (deadline).") from None
+        except asyncio.CancelledError:
+            # İptal edildi (kullanıcı ya da kazanan yedek istek): modelin sağlığı hakkında bilgi yok
+            breaker.release()
+            raise
+        except Exception as e:
+            if is_rate_limit_error(e) or is_invalid_key_error(e) or isinstance(e, TimeoutError):
+                # Kota, anahtar ya da süre sorunu modelin sağlığı hakkında bilgi vermez
+                breaker.release()
+            else:
+                breaker.record_failure()
+            raise
+        breaker.record_success()
+        return response
+    
+    async def _generate_with_retries(self, model_name, prompt, on_chunk, should_stop, generation_config,
+                                     deadline=None, prefix=None):
+        tokens = estimate_tokens(prompt)
+        keys = self.client.keys()
+        if prefix and not prompt.startswith(prefix):
+            prefix = None
+        
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            self._count('queued', 1)
+            queued_at = time.perf_counter()
+            try:
+                api_key = await self.key_pool.acquire(keys, model_name, tokens)
+                await self._semaphore.acquire()
+            finally:
+                self._count('queued', -1)
+            METRICS.observe('queue_wait_seconds', time.perf_counter() - queued_at, queue='engine')
+            
+            self._count('in_flight', 1)
+            cached_tokens = 0
+            try:
+                with METRICS.timer('analysis_stage_seconds', stage='client_setup'):
+                    # Önbelleğe alınmış talimat önekiyle yalnızca metin gönderilir
+                    model, cached_tokens = await self.context_cache.model(model_name, api_key, prefix)
+                    contents = prompt[len(prefix):] if model is not None else prompt
+                    if model is None:
+                        model = self.client.model(model_name, api_key)
+                kwargs = {'generation_config': generation_config} if generation_config else {}
+                if deadline is not None:
+                    # İstemci tarafı süre sınırı API isteğine de iletilir
+                    kwargs['request_options'] = {'timeout': max(1.0, deadline - time.monotonic())}
+                
+                call_started = time.perf_counter()
+                if on_chunk is None:
+                    response = await model.generate_content_async(contents, **kwargs)
+                else:
+                    response = await model.generate_content_async(contents, stream=True, **kwargs)
+                    async for chunk in response:
+                        if should_stop and should_stop():
+                            break
+                        piece = response_text(chunk)
+                        if piece:
+                            on_chunk(piece)
+                
+                if METRICS.enabled:
+                    elapsed = time.perf_counter() - call_started
+                    METRICS.observe('analysis_stage_seconds', elapsed, stage='network')
+                    METRICS.observe('gemini_request_seconds', elapsed, model=model_name)
+                self.client.record_call(model_name)
+                self._count('completed', 1)
+                usage = response_usage(response)
+                self.key_pool.record(api_key, usage)
+                if prefix:
+                    metadata = getattr(response, 'usage_metadata', None)
+                    self.context_cache.record(
+                        model_name, cached_tokens and (getattr(metadata, 'cached_content_token_count', 0) or cached_tokens)
+                    )
+                with self._stats_lock:
+                    self._recent.append(time.time())
+                    totals = self.tokens_per_model.setdefault(model_name, {'input_tokens': 0, 'output_tokens': 0})
+                    totals['input_tokens'] += usage['input_tokens']
+                    totals['output_tokens'] += usage['output_tokens']
+                return response
+            
+            except Exception as e:
+                self.client.record_call(model_name, error=True)
+                if METRICS.enabled:
+                    METRICS.increment('gemini_errors_total', model=model_name, type=error_type(e))
+                if is_rate_limit_error(e) and attempt < RATE_LIMIT_RETRIES:
+                    # 429: hata döndürmek yerine anahtarı kısa süre rotasyondan çıkar; yeniden deneme
+                    # başka bir anahtara gider ya da tek anahtar varsa bekleme süresi dolana kadar bekler
+                    self._count('rate_limited', 1)
+                    with self._stats_lock:
+                        self.rate_limited_per_model[model_name] = self.rate_limited_per_model.get(model_name, 0) + 1
+                    self.key_pool.penalize(api_key, model_name)
+                    continue
+                if cached_tokens and is_cache_miss_error(e) and attempt < RATE_LIMIT_RETRIES:
+                    # Önbellek API tarafında silinmiş ya da süresi dolmuş: yeniden oluşturulup denenir
+                    self.context_cache.invalidate(model_name, prefix)
+                    continue
+                if is_invalid_key_error(e):
+                    # Geçersiz anahtar silinmez, rotasyondan çıkarılır; başka anahtar varsa onunla denenir
+                    self.key_pool.disable(api_key, KEY_INVALID_COOLDOWN, 'invalid', e)
+                    if attempt < RATE_LIMIT_RETRIES and self.key_pool.available(keys):
+                        continue
+                self._count('failed', 1)
+                raise
+            finally:
+                self._count('in_flight', -1)
+                self._semaphore.release()
+    
+    def _count(self, name, delta):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + delta)
+    
+    def stats(self):
+        """Return throughput, queue depth and per-model counters"""
+        with self._stats_lock:
+            now = time.time()
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+            uptime = now - self.started
+            per_model = self.client.stats()
+            for name, count in self.rate_limited_per_model.items():
+                per_model.setdefault(name, {'calls': 0, 'errors': 0})['rate_limited'] = count
+            for name, totals in self.tokens_per_model.items():
+                per_model.setdefault(name, {'calls': 0, 'errors': 0}).update(totals)
+            return {
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rate_limited': self.rate_limited,
+                'queue_depth': self.queued,
+                'in_flight': self.in_flight,
+                'throughput_per_min': len(self._recent),
+                'average_throughput_per_min': self.completed / uptime * 60 if uptime else 0.0,
+                'hedged': self.hedged,
+                'hedge_wins': self.hedge_wins,
+                'circuit_rejected': self.circuit_rejected,
+                'circuits': {name: breaker.state for name, breaker in self.breakers.items()},
+                'per_model': per_model,
+                'per_key': self.key_pool.utilization(),
+                'context_cache': self.context_cache.stats()
+            }
+
+
+_analysis_engine = None
+_analysis_engine_lock = threading.Lock()
+
+
+def get_analysis_engine(**kwargs):
+    """Return the process-wide AnalysisEngine shared by the GUI and batch paths"""
+    global _analysis_engine
+    with _analysis_engine_lock:
+        if _analysis_engine is None:
+            _analysis_engine = AnalysisEngine(**kwargs)
+        return _analysis_engine
+
+
+# Model kayıt defteri: model erişilebilirliği diske yazılır, TTL dolana kadar tekrar denenmez
+MODEL_REGISTRY_TTL = 6 * 3600
+MODEL_PROBE_TIMEOUT = 10
+# Zaman aşımı ya da geçici hata modelin durumu hakkında kesin bilgi vermez: kayıt "bilinmiyor" olur ve kısa sürede yeniden denenir
+MODEL_UNKNOWN_TTL = 300
+
+
+def is_model_unavailable_error(error):
+    """Return True for definitive model errors (not found / no permission) worth caching for the full TTL"""
+    if getattr(error, 'code', None) in (403, 404):
+        return True
+    message = str(error).lower()
+    return 'not found' in message or 'permission' in message or 'not supported' in message \
+        or '404' in message or '403' in message
+
+
+class ModelRegistry:
+    """Disk-backed model health registry with parallel, cached availability probes.
+
+    With `path` None the registry lives only in memory. Probes go through
+    `engine` (the shared engine by default).
+    """
+    
+    def __init__(self, path='model_registry.json', ttl=MODEL_REGISTRY_TTL, probe_timeout=MODEL_PROBE_TIMEOUT,
+                 engine=None):
+        self.path = path
+        self.engine = engine
+        self.ttl = ttl
+        self.probe_timeout = probe_timeout
+        self.probe_calls = 0
+        self.models = []
+        self.listed = 0
+        self.entries = {}
+        self._lock = threading.Lock()
+        self.load()
+    
+    def load(self):
+        try:
+            if self.path and os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.models = data.get('models', [])
+                self.listed = data.get('listed', 0)
+                self.entries = data.get('entries', {})
+        except Exception as e:
+            print(f"Model kayıtları yüklenirken hata: {str(e)}", file=sys.stderr)
+    
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = {'models': self.models, 'listed': self.listed, 'entries': self.entries}
+        try:
+            # Yarım yazılmış dosya kalmaması için önce geçici dosyaya yaz
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"Model kayıtları kaydedilirken hata: {str(e)}", file=sys.stderr)
+    
+    def is_stale(self, name):
+        entry = self.entries.get(name)
+        return entry is None or time.time() - entry.get('checked', 0) > entry.get('ttl', self.ttl)
+    
+    def is_available(self, name):
+        """Cached availability: True/False, or None when unknown (last probe inconclusive) or stale"""
+        if self.is_stale(name):
+            return None
+        return self.entries[name]['available']
+    
+    def available_models(self):
+        return [name for name in self.models if self.entries.get(name, {}).get('available')]
+    
+    def record(self, name, available, latency=None, error=None, ttl=None):
+        with self._lock:
+            self.entries[name] = {
+                'available': available,
+                'latency': round(latency, 3) if latency is not None else None,
+                'last_error': error,
+                'checked': time.time()
+            }
+            if ttl is not None:
+                self.entries[name]['ttl'] = ttl
+    
+    def invalidate(self, name, error=None):
+        """Mark an entry stale after a real call failed so it gets re-probed"""
+        with self._lock:
+            entry = self.entries.setdefault(name, {'available': True, 'latency': None})
+            entry['checked'] = 0
+            entry['last_error'] = error
+        self.save()
+    
+    def discover(self, force=False):
+        """Refresh the Gemini model list from list_models() when stale"""
+        if not force and self.models and time.time() - self.listed <= self.ttl:
+            return self.models
+        models = []
+        for model in (self.engine or get_analysis_engine()).client.list_models():
+            methods = getattr(model, 'supported_generation_methods', None)
+            if 'gemini' in model.name.lower() and (methods is None or 'generateContent' in methods):
+                models.append(model.name)
+        with self._lock:
+            self.models = models
+            self.listed = time.time()
+        return models
+    
+    def probe(self, names):
+        """Probe the given models in parallel through the shared engine, with a timeout"""
+        if not names:
+            return {}
+        engine = self.engine or get_analysis_engine()
+        config = engine.client.generation_config(max_output_tokens=1, temperature=0)
+        started = time.monotonic()
+        finished = {}
+        futures = {}
+        for name in names:
+            future = engine.submit(name, "test", generation_config=config)
+            future.add_done_callback(lambda _, name=name: finished.setdefault(name, time.monotonic()))
+            futures[future] = name
+            self.probe_calls += 1
+        
+        done, not_done = concurrent.futures.wait(futures, timeout=self.probe_timeout)
+        for future in not_done:
+            # Yerel hız sınırlayıcı kuyruğundan da kaynaklanabilir: model kapalı sayılmaz
+            future.cancel()
+            self.record(futures[future], None, error="Zaman aşımı", ttl=MODEL_UNKNOWN_TTL)
+        for future in done:
+            name = futures[future]
+            try:
+                future.result()
+                self.record(name, True, latency=finished.get(name, time.monotonic()) - started)
+            except Exception as e:
+                if is_model_unavailable_error(e):
+                    self.record(name, False, error=str(e))
+                else:
+                    self.record(name, None, error=str(e), ttl=MODEL_UNKNOWN_TTL)
+        
+        self.save()
+        return {name: self.entries[name] for name in names}
+    
+    def refresh(self, names=None, force=False):
+        """Discover models if needed and probe only stale entries; returns available models"""
+        if names is None:
+            names = self.discover(force)
+        stale = [name for name in names if force or self.is_stale(name)]
+        if stale:
+            self.probe(stale)
+        elif names is self.models:
+            self.save()
+        return [name for name in names if self.entries.get(name, {}).get('available')]
+    
+    def ensure(self, name):
+        """Return the entry for one model, probing it only when stale"""
+        if self.is_stale(name):
+            self.probe([name])
+        return self.entries[name]
+
+
+# Kademeli analiz ayarları: bu sonuç/güven seviyeleri bir üst kademeye aktarılır
+CASCADE_ESCALATE_VERDICTS = ('Belirsiz',)
+CASCADE_ESCALATE_CONFIDENCES = ('Düşük',)
+# Stilometri ağırlıkları etiketli veriyle kalibre edilmediğinden yerel tahmin varsayılan olarak kesin sonuç
+# sayılmaz: boş demet stilometrik kademeyi kapatır. --cascade-local-accept ile kabul edilecek güven seviyeleri verilir
+CASCADE_LOCAL_ACCEPT_CONFIDENCES = ()
+
+
+class CascadeScheduler:
+    """Tiered analysis: local screen, then a fast model, then a strong model only if unsure"""
+    
+    TIERS = ('local', 'fast', 'strong')
+    
+    def __init__(self, detector, fast_model=None, strong_model=None,
+                 escalate_verdicts=CASCADE_ESCALATE_VERDICTS,
+                 escalate_confidences=CASCADE_ESCALATE_CONFIDENCES,
+                 local_accept_confidences=CASCADE_LOCAL_ACCEPT_CONFIDENCES):
+        self.detector = detector
+        self.fast_model = fast_model
+        self.strong_model = strong_model
+        self.escalate_verdicts = tuple(escalate_verdicts)
+        self.escalate_confidences = tuple(escalate_confidences)
+        self.local_accept_confidences = tuple(local_accept_confidences)
+        self.counts = {tier: 0 for tier in self.TIERS}
+        self.latency = {tier: 0.0 for tier in self.TIERS}
+        self._lock = threading.Lock()
+    
+    def models(self):
+        """Resolve (fast, strong) models from available_models unless set explicitly"""
+        available = self.detector.available_models or [self.detector.current_model]
+        fast = self.fast_model or next((m for m in available if 'flash' in m), self.detector.current_model)
+        strong = self.strong_model or next(
+            (m for m in available if 'pro' in m and 'flash' not in m), self.detector.current_model
+        )
+        return fast, strong
+    
+    def needs_escalation(self, result):
+        verdict, confidence = parse_verdict(result)
+        return verdict is None or verdict in self.escalate_verdicts or confidence in self.escalate_confidences
+    
+    def record_tier(self, tier, started):
+        with self._lock:
+            self.counts[tier] += 1
+            self.latency[tier] += time.perf_counter() - started
+    
+    def analyze(self, text, on_chunk=None):
+        """Run the model tiers for a text that already passed the indicator prescreen.
+
+        The prescreen in AIDetector._analyze_text is the first local step and
+        is recorded there; here the local tier only adds stylometry, and only
+        for confidences listed in local_accept_confidences (none by default).
+        """
+        # 1. kademe: stilometri (numpy varsa ve kabul edilen güven seviyesi tanımlıysa)
+        started = time.perf_counter()
+        local = get_local_detector() if self.local_accept_confidences else None
+        if local is not None:
+            result = local.analyze_text(text)
+            verdict, confidence = parse_verdict(result)
+            if verdict != 'Belirsiz' and confidence in self.local_accept_confidences:
+                self.detector.call_state.model = local.name
+                self.record_tier('local', started)
+                return result
+        
+        # 2. kademe: hızlı model
+        fast, strong = self.models()
+        started = time.perf_counter()
+        result = self.detector.analyze_single(text, on_chunk, model_name=fast, fallback=False)
+        self.record_tier('fast', started)
+        if fast == strong or not self.needs_escalation(result):
+            return result + f"\n  • Kademe: hızlı model ({fast})"
+        
+        # 3. kademe: güçlü model (yalnızca emin olunamayan metinler)
+        started = time.perf_counter()
+        usage = self.detector.last_usage()
+        strong_result = self.detector.analyze_single(text, model_name=strong)
+        self.record_tier('strong', started)
+        strong_usage = self.detector.last_usage()
+        self.detector.call_state.usage = {
+            key: usage[key] + strong_usage[key] for key in ('input_tokens', 'output_tokens')
+        }
+        return strong_result + f"\n  • Kademe: güçlü model ({strong}); hızlı model emin olamadı"
+    
+    def stats(self):
+        """Per-tier call counts and mean latency in seconds"""
+        with self._lock:
+            return {
+                tier: {
+                    'count': self.counts[tier],
+                    'mean_latency': round(self.latency[tier] / self.counts[tier], 3) if self.counts[tier] else 0.0
+                }
+                for tier in self.TIERS
+            }
+
 
 class AIDetector:
-    def __init__(self, content_frame):
+    def __init__(self, content_frame=None, api_key=None, use_cache=True, start_validation=True,
+                 local_fallback=True, engine=None, model_registry=None):
         self.content_frame = content_frame
+        # content_frame verilmezse arayüz kurulmaz (batch / headless mod)
+        self.headless = content_frame is None
         
-        # API key configuration
-        self.config_file = 'config.json'
-        self.api_key = self.load_api_key()
+        # API key configuration: tek anahtar ya da anahtar havuzu (liste) verilebilir
+        if api_key:
+            self.api_keys = [api_key] if isinstance(api_key, str) else list(api_key)
+        else:
+            self.api_keys = load_api_keys()
+        self.api_key = self.api_keys[0] if self.api_keys else None
         
         # Initialize Gemini models
         self.available_models = ['gemini-pro']  # Start with basic model
@@ -25,71 +2874,111 @@ class AIDetector:
         self.model_var = None
         self.model_dropdown = None
         
+        # Tüm Gemini çağrıları ortak istemci ve kota sınırlayıcılı ortak motordan geçer
+        # (servis ve testler kendi motorlarını verebilir)
+        self.engine = engine or get_analysis_engine()
+        self.client = self.engine.client
+        if self.api_key:
+            self.client.configure(self.api_key, self.api_keys[1:])
+        
+        # Önceki çalıştırmalardan kalan model kayıtları: dolu ise başlangıçta hiç deneme çağrısı yapılmaz
+        self.model_registry = model_registry or ModelRegistry(engine=engine)
+        if self.model_registry.available_models():
+            self.available_models = self.model_registry.available_models()
+            if self.current_model not in self.available_models:
+                self.current_model = self.available_models[0]
+        
         # AI özellikleri için JSON dosyası
         self.ai_features_path = 'ai_features.json'
         self.ai_features = self.load_ai_features()
+        self_references = self.ai_features.get('ai_self_references', AI_SELF_REFERENCES)
+        self.self_references = {' '.join(turkish_casefold(phrase).split()) for phrase in self_references}
+        self.indicator_matcher = IndicatorMatcher(
+            list(self.ai_features.get('ai_indicators', [])) + list(self_references)
+        )
         
         # Analiz durumu için değişkenler
         self.is_analyzing = False
-        self.cancel_analysis = False
+        self.analysis_scope = None
+        self.analysis_slots = threading.BoundedSemaphore(ANALYSIS_MAX_IN_FLIGHT)
         self.analysis_thread = None
         self.analysis_queue = queue.Queue()
+        # Kuyruktaki mesajlar (analiz no, tür, içerik) şeklindedir; eski analizlerin mesajları atlanır
+        self.analysis_id = 0
+        self.stream_results = True
+        self.result_streaming = False
+        
+        # Token bütçesi; son çağrının token kullanımı thread'e özel tutulur (batch worker'ları için)
+        self.token_budget = TokenBudget()
+        self.json_unsupported_models = set()
+        self.call_state = threading.local()
+        
+        # Anahtar yoksa veya Gemini'ye ulaşılamazsa çevrimdışı stilometrik analiz kullanılır
+        self.local_fallback = local_fallback
+        # True ise hatalar metin yerine AnalysisError olarak yükseltilir (iş kuyruğu için)
+        self.raise_errors = False
+        
+        # Yavaş yanıtlarda p95 süresinden sonra ikinci bir modele yedek istek gönderilir
+        self.hedge_requests = True
+        
+        # Yakın kopya dizini (NearDuplicateIndex): 'reuse' önceki sonucu API'ye gitmeden kullanır,
+        # 'flag' yine analiz eder ama sonuca eşleşen belgeyi ekler
+        self.duplicate_index = None
+        self.duplicate_mode = 'reuse'
+        
+        # Paragraf modu: paragraf hash'i -> sonuç; düzenlemeden sonra yalnızca değişen paragraflar analiz edilir
+        self.paragraph_mode = False
+        self.paragraph_results = OrderedDict()
+        
+        # Kademeli analiz: yerel tarama -> hızlı model -> güçlü model
+        self.use_cascade = False
+        self.cascade = CascadeScheduler(
+            self,
+            escalate_confidences=self.ai_features.get('cascade_escalate_confidences', CASCADE_ESCALATE_CONFIDENCES),
+            local_accept_confidences=self.ai_features.get(
+                'cascade_local_accept_confidences', CASCADE_LOCAL_ACCEPT_CONFIDENCES
+            )
+        )
+        
+        # Aynı metin + model için tekrar API çağrısı yapmamak için sonuç önbelleği
+        self.result_cache = None
+        if use_cache:
+            try:
+                self.result_cache = ResultCache()
+            except Exception as e:
+                print(f"Sonuç önbelleği açılamadı: {str(e)}", file=sys.stderr)
+        
+        if self.headless:
+            return
         
         self.setup_ui()
         
         # If API key exists, start background model validation
-        if self.api_key:
+        if self.api_key and start_validation:
             self.start_background_model_validation()
 
-    def load_api_key(self):
-        """Load API key from config file"""
-        try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    config = json.load(f)
-                    return config.get('api_key')
-        except Exception as e:
-            print(f"API key yüklenirken hata: {str(e)}")
-        return None
-
-    def save_api_key(self, api_key):
-        """Save API key to config file"""
-        try:
-            config = {'api_key': api_key}
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f)
-            return True
-        except Exception as e:
-            print(f"API key kaydedilirken hata: {str(e)}")
-            return False
-
     def validate_and_initialize_api(self):
         """Validate API key and initialize available models"""
         try:
             if not self.api_key or len(self.api_key.strip()) < 10:
                 return False
                 
-            genai.configure(api_key=self.api_key)
+            self.client.configure(self.api_key)
             
-            # Quick test with minimal configuration
-            model = genai.GenerativeModel('gemini-pro')
-            response = model.generate_content(
-                "test",
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=1,
-                    temperature=0
-                )
-            )
+            # Model kaydı tazeyse ağ çağrısı yapılmaz
+            entry = self.model_registry.ensure(self.current_model)
+            if entry['available'] is False:
+                raise Exception(entry.get('last_error') or "Model kullanılamıyor.")
             
             # API key geçerliyse kaydet ve arka planda model doğrulamasını başlat
-            self.save_api_key(self.api_key)
+            save_api_key(self.api_key)
             self.start_background_model_validation()
             return True
             
         except Exception as e:
-            self.api_key = None
-            if os.path.exists(self.config_file):
-                os.remove(self.config_file)
+            # config.json silinmez: geçersiz anahtar havuzda geçici olarak devre dışı bırakılır
+            if self.api_key and is_invalid_key_error(e):
+                self.engine.key_pool.disable(self.api_key, KEY_INVALID_COOLDOWN, 'invalid', e)
             self.show_api_error(str(e))
             return False
 
@@ -110,43 +2999,67 @@ class AIDetector:
         self.api_key = None
 
     def check_model_availability(self):
-        """Check if current model is available and working"""
+        """Check if current model is available using the cached registry"""
         if not self.current_model or not self.api_key:
             return False
-            
-        try:
-            # Quick test with minimal configuration
-            model = genai.GenerativeModel(self.current_model)
-            response = model.generate_content(
-                "test",
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=1,
-                    temperature=0
-                )
-            )
-            return True
-        except Exception as e:
-            print(f"Model availability check failed: {str(e)}")
+        
+        if not self.engine.is_healthy(self.current_model):
+            # Devre açık: iyileşme denemesi zamanı geldiyse arka planda yapılır
+            self.engine.recover(self.current_model)
             return False
+        
+        available = self.model_registry.is_available(self.current_model)
+        if available is None:
+            # Bilinmeyen / eski kayıt: arayüzü bekletmeden arka planda dene
+            name = self.current_model
+            threading.Thread(target=self.model_registry.ensure, args=(name,), daemon=True).start()
+            return True
+        if not available:
+            print(
+                f"Model availability check failed: {self.model_registry.entries[self.current_model].get('last_error')}",
+                file=sys.stderr
+            )
+        return available
 
     def switch_to_available_model(self):
-        """Switch to another available model if current one fails"""
+        """Switch to another healthy model if the current one fails.
+
+        The failing model stays in available_models: its circuit breaker is
+        opened instead, so it returns once a recovery probe succeeds.
+        """
         if not self.available_models:
             self.validate_and_initialize_api()
             
         if self.available_models:
-            # Remove current model from available models if it's not working
-            if self.current_model in self.available_models:
-                self.available_models.remove(self.current_model)
+            self.model_registry.invalidate(self.current_model, "Model çalışmıyor")
+            self.engine.breaker(self.current_model).trip()
             
-            # Try to switch to the next available model
-            if self.available_models:
-                self.current_model = self.available_models[0]
-                if hasattr(self, 'model_var') and self.model_var:
-                    self.model_var.set(self.current_model)
-                return True
+            # Try to switch to the next healthy model
+            for name in self.available_models:
+                if name != self.current_model and self.engine.is_healthy(name):
+                    self.current_model = name
+                    if hasattr(self, 'model_var') and self.model_var:
+                        self.model_var.set(self.current_model)
+                    return True
         
         return False
+    
+    def healthy_model(self, preferred):
+        """preferred while its circuit is closed, else the first healthy available model"""
+        if self.engine.is_healthy(preferred):
+            return preferred
+        self.engine.recover(preferred)
+        for name in self.available_models:
+            if name != preferred and self.engine.is_healthy(name):
+                return name
+        return preferred
+    
+    def hedge_model(self, primary):
+        """Second healthy model for hedged requests; the same model when there is none"""
+        for name in self.available_models:
+            if name != primary and self.engine.is_healthy(name):
+                return name
+        return primary
 
     def on_model_change(self, selection):
         """Handle model selection change"""
@@ -184,32 +3097,33 @@ class AIDetector:
             
         try:
             # Configure API
-            genai.configure(api_key=api_key)
-            
-            # Create test function
-            def test_api():
-                model = genai.GenerativeModel('gemini-pro')
-                return model.generate_content(
-                    "test",
-                    generation_config=genai.types.GenerationConfig(
-                        max_output_tokens=1,
-                        temperature=0
-                    )
+            self.client.configure(api_key)
+            
+            # Test through the shared engine with a timeout
+            started = time.monotonic()
+            future = self.engine.submit(
+                'gemini-pro',
+                "test",
+                generation_config=self.client.generation_config(
+                    max_output_tokens=1,
+                    temperature=0
                 )
-
-            # Test with timeout using ThreadPoolExecutor
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(test_api)
-                try:
-                    future.result(timeout=5)  # 5 second timeout
-                except concurrent.futures.TimeoutError:
-                    return False, "API doğrulama zaman aşımına uğradı."
-                except Exception as e:
-                    return False, str(e)
+            )
+            try:
+                future.result(timeout=5)  # 5 second timeout
+            except concurrent.futures.TimeoutError:
+                future.cancel()
+                return False, "API doğrulama zaman aşımına uğradı."
+            except Exception as e:
+                return False, str(e)
+            
+            # Sonraki doğrulamalar bu denemeyi tekrar yapmasın
+            self.model_registry.record('gemini-pro', True, latency=time.monotonic() - started)
+            self.model_registry.save()
             
             # API key valid, save and return
             self.api_key = api_key
-            self.save_api_key(api_key)
+            save_api_key(api_key)
             return True, ""
             
         except Exception as e:
@@ -407,7 +3321,7 @@ Kaybederseniz yeni bir anahtar oluşturmanız gerekir.
             
             if is_valid:
                 self.api_key = new_api_key
-                if self.save_api_key(new_api_key):
+                if save_api_key(new_api_key):
                     if self.validate_and_initialize_api():
                         messagebox.showinfo("Başarılı", "API anahtarı başarıyla doğrulandı ve kaydedildi.")
                         return True
@@ -496,6 +3410,27 @@ Kaybederseniz yeni bir anahtar oluşturmanız gerekir.
             command=self.on_model_change
         )
         self.model_dropdown.pack(side="left", padx=5)
+        
+        self.cascade_var = ctk.BooleanVar(value=self.use_cascade)
+        cascade_checkbox = ctk.CTkCheckBox(
+            api_frame,
+            text="Kademeli Analiz",
+            variable=self.cascade_var,
+            command=lambda: setattr(self, 'use_cascade', self.cascade_var.get())
+        )
+        cascade_checkbox.pack(side="left", padx=5)
+        
+        self.paragraph_var = ctk.BooleanVar(value=self.paragraph_mode)
+        paragraph_checkbox = ctk.CTkCheckBox(
+            api_frame,
+            text="Paragraf Modu",
+            variable=self.paragraph_var,
+            command=lambda: setattr(self, 'paragraph_mode', self.paragraph_var.get())
+        )
+        paragraph_checkbox.pack(side="left", padx=5)
+        
+        self.status_label = ctk.CTkLabel(api_frame, text="")
+        self.status_label.pack(side="right", padx=5)
 
         # Sol taraf - Metin girişi
         self.input_frame = ctk.CTkFrame(main_frame)
@@ -519,6 +3454,11 @@ Kaybederseniz yeni bir anahtar oluşturmanız gerekir.
         self.result_text.pack(fill="both", expand=True, padx=5, pady=5)
         self.result_text.config(state='disabled')
         
+        # Paragraf modunda her paragraf ve sonucu kararına göre renklendirilir
+        for widget in (self.input_text, self.result_text):
+            for tag, color in PARAGRAPH_TAG_COLORS.items():
+                widget.tag_configure(tag, background=color)
+        
         # Butonlar
         self.button_frame = ctk.CTkFrame(main_frame)
         self.button_frame.pack(side="top", fill="x", padx=5, pady=5)
@@ -529,6 +3469,11 @@ Kaybederseniz yeni bir anahtar oluşturmanız gerekir.
         self.clear_button = ctk.CTkButton(self.button_frame, text="Temizle", command=self.clear_text)
         self.clear_button.pack(side="left", padx=5)
 
+    def set_status(self, text):
+        """Show a short status message next to the model selector"""
+        if getattr(self, 'status_label', None):
+            self.status_label.configure(text=text)
+
     def load_ai_features(self):
         default_features = {
             'ai_indicators': [
@@ -540,7 +3485,9 @@ Kaybederseniz yeni bir anahtar oluşturmanız gerekir.
                 'nesnellik ve tarafsızlık',
                 'etik sınırlar içinde',
                 'yasal ve ahlaki standartlara uygun'
-            ]
+            ],
+            'ai_self_references': list(AI_SELF_REFERENCES),
+            'prescreen_min_hits': PRESCREEN_MIN_HITS
         }
         
         try:
@@ -548,59 +3495,483 @@ Kaybederseniz yeni bir anahtar oluşturmanız gerekir.
                 with open(self.ai_features_path, 'r', encoding='utf-8') as f:
                     return json.load(f)
         except Exception as e:
-            print(f"AI özellikleri yüklenirken hata: {e}")
+            print(f"AI özellikleri yüklenirken hata: {e}", file=sys.stderr)
         
         return default_features
 
-    def analyze_text(self, text):
+    def prescreen(self, text):
+        """Return (local_result, hint_phrases) from the indicator scan.
+
+        A self-identification phrase or prescreen_min_hits distinct indicators
+        decide locally; weaker matches are only returned as hints for the model.
+        """
+        min_hits = self.ai_features.get('prescreen_min_hits', PRESCREEN_MIN_HITS)
+        if not min_hits:
+            return None, ()
+        
+        hits = self.indicator_matcher.scan(text)
+        distinct = {phrase for _, _, phrase in hits}
+        strong = distinct & self.self_references
+        if not strong and len(distinct) < min_hits:
+            return None, tuple(sorted(distinct))
+        
+        reasons = '\n'.join(
+            f'  • "{" ".join(text[start:end].split())}" ifadesi bulundu (konum {start})'
+            for start, end, _ in hits[:10]
+        )
+        return (
+            "- Sonuç: Yapay Zeka\n"
+            f"- Güven Seviyesi: {'Yüksek' if strong or len(distinct) > 1 else 'Orta'}\n"
+            "- Nedenler:\n"
+            f"{reasons}\n"
+            "  • Tespit yerel gösterge taramasıyla yapıldı (API çağrısı yapılmadı)"
+        ), ()
+    
+    def prescreen_text(self, text):
+        """Flag texts containing known AI boilerplate locally, without an API call"""
+        return self.prescreen(text)[0]
+    
+    def analyze_text(self, text, on_chunk=None, source=None):
+        """Analyze text; on_chunk receives partial output when the response is streamed.
+
+        source (e.g. a file path) is stored with the result in the near-duplicate index.
+        The parsed AnalysisResult of the call is available from last_result().
+        """
+        started = time.perf_counter()
+        self.call_state.usage = {'input_tokens': 0, 'output_tokens': 0}
+        self.call_state.model = None
+        try:
+            with METRICS.timer('analysis_seconds'):
+                result = self._analyze_with_duplicates(text, on_chunk, source)
+        finally:
+            self.call_state.hint = ()
+        self.call_state.result = AnalysisResult.parse(
+            result, self.call_state.model or self.current_model, time.perf_counter() - started, **self.last_usage()
+        )
+        return result
+    
+    def last_result(self):
+        """AnalysisResult of the last analyze_text call on the calling thread"""
+        return getattr(self.call_state, 'result', None)
+    
+    def _analyze_with_duplicates(self, text, on_chunk, source):
+        if self.duplicate_index is None:
+            return self._analyze_text(text, on_chunk)
+        
+        signature = self.duplicate_index.signature(text)
+        duplicate = self.duplicate_index.query(text, signature)
+        self.call_state.duplicate = duplicate
+        if duplicate and self.duplicate_mode == 'reuse':
+            self.call_state.usage = {'input_tokens': 0, 'output_tokens': 0}
+            return self.annotate_duplicate(duplicate['result'], duplicate)
+        
+        result = self._analyze_text(text, on_chunk)
+        # Birebir aynı imza dizine yeni bilgi eklemez
+        if parse_verdict(result)[0] and not (duplicate and duplicate['similarity'] >= 1.0):
+            self.duplicate_index.add(text, result, source, signature)
+        return self.annotate_duplicate(result, duplicate) if duplicate else result
+    
+    @staticmethod
+    def annotate_duplicate(result, duplicate):
+        reference = duplicate['source'] or f"belge #{duplicate['id']}"
+        return (
+            f"{result}\n"
+            f"  • Yakın kopya: {reference} (benzerlik %{duplicate['similarity'] * 100:.0f})"
+        )
+    
+    def last_duplicate(self):
+        """Near-duplicate match found by the last analyze_text call on the calling thread"""
+        return getattr(self.call_state, 'duplicate', None)
+    
+    def _analyze_text(self, text, on_chunk=None):
+        started = time.perf_counter()
+        local_result, self.call_state.hint = self.prescreen(text)
+        if local_result:
+            self.call_state.model = PRESCREEN_MODEL
+            if self.use_cascade:
+                # Gösterge taraması kademenin yerel basamağıdır; kademe aynı taramayı tekrarlamaz
+                self.cascade.record_tier('local', started)
+            return local_result
+        
         if not self.api_key:
-            if not self.setup_api_key_dialog():
-                return "API anahtarı gerekli."
+            if self.headless or not self.setup_api_key_dialog():
+                return self.analyze_locally(text, "API anahtarı olmadığı için yerel analiz yapıldı") \
+                    or "API anahtarı gerekli."
         
+        if not self.token_budget.fits(text, self.current_model, self.client):
+            if self.token_budget.overflow == 'trim':
+                text = self.token_budget.trim(text)
+            else:
+                return self.analyze_long_text(text)
+        return self.dispatch_analysis(text, on_chunk)
+    
+    def dispatch_analysis(self, text, on_chunk=None):
+        """Analyze one prompt-sized text through the cascade when enabled, else the current model"""
+        if self.use_cascade:
+            return self.cascade.analyze(text, on_chunk)
+        return self.analyze_single(text, on_chunk)
+    
+    def analyze_locally(self, text, reason=None):
+        """Offline stylometric verdict; None when disabled or numpy is missing"""
+        detector = get_local_detector() if self.local_fallback else None
+        if detector is None:
+            return None
+        self.call_state.usage = {'input_tokens': 0, 'output_tokens': 0}
+        self.call_state.model = detector.name
+        return detector.analyze_text(text, reason)
+    
+    def last_usage(self):
+        """Input/output tokens of the last analysis made on the calling thread"""
+        return getattr(self.call_state, 'usage', {'input_tokens': 0, 'output_tokens': 0})
+    
+    @contextmanager
+    def cancel_scope(self, scope):
+        """Run Gemini calls made on this thread under scope (deadline + cancellation)"""
+        previous = getattr(self.call_state, 'scope', None)
+        self.call_state.scope = scope
         try:
-            model = genai.GenerativeModel(self.current_model)
-            prompt = f"""Aşağıdaki metnin yapay zeka tarafından mı yoksa insan tarafından mı yazıldığını analiz et. 
-            Yanıtını şu formatta ver:
-            - Sonuç: [Yapay Zeka / İnsan / Belirsiz]
-            - Güven Seviyesi: [Düşük / Orta / Yüksek]
-            - Nedenler: [Madde madde açıklamalar]
+            yield scope
+        finally:
+            self.call_state.scope = previous
+    
+    def current_scope(self):
+        return getattr(self.call_state, 'scope', None)
+    
+    def analyze_paragraphs(self, text, model_name=None):
+        """Analyze text paragraph by paragraph, sending only paragraphs not seen before.
 
-            Metin:
-            {text}"""
-            
-            response = model.generate_content(prompt)
+        Verdicts are kept per paragraph hash, so after a small edit only the
+        changed paragraphs go out (packed into one request where possible) and
+        the document verdict is recomputed from the stored parts.
+        Returns (document result, [(start, end, result, reused)]).
+        """
+        model_name = model_name or self.current_model
+        spans = split_paragraphs(text)
+        if not spans:
+            return self.analyze_text(text), []
+        
+        keys = [ResultCache.make_key(text[start:end], model_name) for start, end in spans]
+        results = [self.paragraph_results.get(key) for key in keys]
+        changed = [index for index, result in enumerate(results) if result is None]
+        usage = {'input_tokens': 0, 'output_tokens': 0}
+        if changed:
+            fresh = self.analyze_packed([text[slice(*spans[index])] for index in changed], model_name)
+            usage = self.last_usage()
+            for index, result in zip(changed, fresh):
+                results[index] = result
+                # Hatalı ya da iptal edilmiş sonuçlar saklanmaz; sonraki analizde yeniden denenir
+                if parse_verdict(result)[0] is not None:
+                    self.paragraph_results[keys[index]] = result
+        for key in keys:
+            if key in self.paragraph_results:
+                self.paragraph_results.move_to_end(key)
+        while len(self.paragraph_results) > PARAGRAPH_CACHE_SIZE:
+            self.paragraph_results.popitem(last=False)
+        
+        self.call_state.usage = usage
+        sections = [(text[start:end], result) for (start, end), result in zip(spans, results)]
+        document = sections[0][1] if len(sections) == 1 else reduce_verdicts(sections)
+        reused = set(range(len(spans))) - set(changed)
+        return document, [
+            (start, end, result, index in reused) for index, ((start, end), result) in enumerate(zip(spans, results))
+        ]
+    
+    def analyze_long_text(self, text, workers=LONG_DOCUMENT_WORKERS):
+        """Analyze token-bounded chunks in parallel and reduce them to one verdict"""
+        chunks = split_into_chunks(text, min(LONG_DOCUMENT_CHUNK_TOKENS, self.token_budget.input_tokens))
+        if len(chunks) == 1:
+            return self.dispatch_analysis(chunks[0])
+        
+        scope = self.current_scope()
+        
+        def analyze_chunk(chunk):
+            # Worker thread'leri çağıranın iptal/süre sınırını devralır
+            with self.cancel_scope(scope):
+                return self.dispatch_analysis(chunk), self.last_usage()
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            outcomes = list(executor.map(analyze_chunk, chunks))
+        
+        self.call_state.usage = {
+            'input_tokens': sum(usage['input_tokens'] for _, usage in outcomes),
+            'output_tokens': sum(usage['output_tokens'] for _, usage in outcomes)
+        }
+        return reduce_verdicts([(chunk, result) for chunk, (result, _) in zip(chunks, outcomes)])
+    
+    def build_request(self, text, model_name, stream=False):
+        """Return (prompt, generation_config, json_mode, prefix) for one analysis call.
+
+        `prefix` is the fixed instruction block at the start of the prompt that
+        the engine may serve from the context cache. Weak indicator hits of the
+        current analyze_text call follow the text as a hint.
+        """
+        json_mode = self.uses_json(model_name, stream)
+        config = {'max_output_tokens': self.token_budget.output_tokens, 'temperature': 0}
+        if json_mode:
+            config['response_mime_type'] = 'application/json'
+            config['response_schema'] = ANALYSIS_RESPONSE_SCHEMA
+            prefix = ANALYSIS_PROMPT_JSON
+        else:
+            prefix = ANALYSIS_PROMPT_TEXT
+        hint = getattr(self.call_state, 'hint', ())
+        if hint:
+            text += PRESCREEN_HINT.format(phrases=', '.join(f'"{phrase}"' for phrase in hint))
+        return prefix + text, self.client.generation_config(**config), json_mode, prefix
+    
+    def uses_json(self, model_name, stream=False):
+        """True when a request goes out with the JSON template and response schema"""
+        return not stream and model_name not in self.json_unsupported_models
+    
+    def cache_variant(self, json_mode):
+        """Result-cache variant of a single-text request: template, output token limit and hint"""
+        variant = f"{'json' if json_mode else 'text'}:{self.token_budget.output_tokens}"
+        hint = getattr(self.call_state, 'hint', ())
+        return f"{variant}:{'|'.join(hint)}" if hint else variant
+    
+    def analyze_single(self, text, on_chunk=None, model_name=None, fallback=True):
+        """Send one prompt-sized text to a model (the current one by default), cached"""
+        model_name = self.healthy_model(model_name or self.current_model)
+        self.call_state.usage = {'input_tokens': 0, 'output_tokens': 0}
+        if self.result_cache:
+            variant = self.cache_variant(self.uses_json(model_name, on_chunk is not None))
+            cached = self.result_cache.get(ResultCache.make_key(text, model_name, variant))
+            if cached is not None:
+                self.call_state.model = model_name
+                return cached
+        
+        scope = self.current_scope()
+        answered_by = model_name
+        try:
+            with METRICS.timer('analysis_stage_seconds', stage='prompt_build'):
+                prompt, config, json_mode, prefix = self.build_request(text, model_name, stream=on_chunk is not None)
             
-            # Handle multi-part responses
-            if hasattr(response, 'parts'):
-                return ' '.join(part.text for part in response.parts)
-            elif hasattr(response, 'candidates') and response.candidates:
-                if hasattr(response.candidates[0].content, 'parts'):
-                    return ' '.join(part.text for part in response.candidates[0].content.parts)
+            if on_chunk is None:
+                try:
+                    if self.hedge_requests:
+                        response, answered_by = self.engine.generate_hedged(
+                            model_name, prompt, self.hedge_model(model_name), scope=scope, generation_config=config,
+                            prefix=prefix
+                        )
+                    else:
+                        response = self.engine.generate(
+                            model_name, prompt, scope=scope, generation_config=config, prefix=prefix
+                        )
+                except Exception as e:
+                    if not json_mode or ('json' not in str(e).lower() and 'mime' not in str(e).lower()):
+                        raise
+                    # Model JSON yanıt şemasını desteklemiyor: bir daha denemeden metin şablonuna geç
+                    self.json_unsupported_models.add(model_name)
+                    prompt, config, json_mode, prefix = self.build_request(text, model_name)
+                    response = self.engine.generate(
+                        model_name, prompt, scope=scope, generation_config=config, prefix=prefix
+                    )
+                
+                with METRICS.timer('analysis_stage_seconds', stage='response_join'):
+                    result = response_text(response)
+                    if json_mode:
+                        result = format_json_verdict(result)
+            else:
+                pieces = []
+                
+                def collect(piece):
+                    pieces.append(piece)
+                    on_chunk(piece)
+                
+                # İptalde akış görevi olay döngüsünde hemen durdurulur; yarım sonuç önbelleğe yazılmaz
+                response = self.engine.generate(
+                    model_name, prompt, scope=scope, generation_config=config, on_chunk=collect, prefix=prefix
+                )
+                with METRICS.timer('analysis_stage_seconds', stage='response_join'):
+                    result = ''.join(pieces)
             
-            # Fallback for simple responses
-            return str(response)
+            self.call_state.usage = response_usage(response)
+            self.call_state.model = answered_by
+            # Çözümlenemeyen (ör. max_output_tokens ile kesilmiş) yanıt önbelleğe yazılmaz; yedek (hedge)
+            # model yanıtladıysa sonuç o modelin, JSON desteklenmediyse metin şablonunun anahtarıyla saklanır
+            if self.result_cache and parse_verdict(result)[0] is not None:
+                self.result_cache.put(ResultCache.make_key(text, answered_by, self.cache_variant(json_mode)), result)
+            return result
 
+        except concurrent.futures.CancelledError:
+            if self.raise_errors:
+                raise AnalysisError("Analiz iptal edildi.", retryable=True)
+            return "Analiz iptal edildi."
+        except (TimeoutError, asyncio.TimeoutError) as e:
+            # Kullanıcının süre sınırı doldu: model sağlıklı olabilir, kaydı geçersiz kılınmaz
+            if self.raise_errors:
+                raise AnalysisError(str(e), retryable=True) from e
+            raise
         except Exception as e:
-            if "invalid api key" in str(e).lower():
+            if not is_rate_limit_error(e) and not is_invalid_key_error(e) and not isinstance(e, CircuitOpenError):
+                # Gerçek çağrı başarısız: model kaydı bir sonraki yenilemede tekrar denenir
+                self.model_registry.invalidate(model_name, str(e))
+            if is_invalid_key_error(e) and not self.headless:
                 self.api_key = None  # Reset invalid API key
                 messagebox.showerror("API Hatası", "Geçersiz API anahtarı. Lütfen yeni bir API anahtarı girin.")
                 if self.setup_api_key_dialog():
-                    return self.analyze_text(text)  # Retry with new API key
-            return f"Analiz sırasında hata oluştu: {str(e)}"
+                    return self.analyze_single(text, model_name=model_name)  # Retry with new API key
+            if self.raise_errors:
+                raise AnalysisError(str(e), is_retryable_error(e)) from e
+            if not fallback:
+                return f"Analiz sırasında hata oluştu: {str(e)}"
+            return self.analyze_locally(text, f"Gemini'ye ulaşılamadı ({str(e)[:200]}); yerel analiz yapıldı") \
+                or f"Analiz sırasında hata oluştu: {str(e)}"
+
+    def analyze_packed(self, texts, model_name=None):
+        """Analyze many short texts with few requests; returns one result per input, in order.
+
+        Texts are bundled with stable ids into token-bounded packs, and the model
+        answers with one JSON verdict per id. Ids that come back missing or
+        malformed are re-packed and re-sent; whatever is still missing after
+        PACK_RETRIES rounds is analyzed on its own. The answering model and token
+        usage of every item (a pack's usage split by text length) are left in
+        last_packed() as (model, usage) pairs.
+        """
+        model_name = model_name or self.current_model
+        results = [None] * len(texts)
+        items = [(model_name, {'input_tokens': 0, 'output_tokens': 0}) for _ in texts]
+        pending = {}
+        
+        for index, text in enumerate(texts):
+            local_result = self.prescreen_text(text)
+            if local_result:
+                results[index] = local_result
+                items[index] = (PRESCREEN_MODEL, items[index][1])
+                continue
+            if self.result_cache:
+                cached = self.result_cache.get(ResultCache.make_key(text, model_name, PACKED_CACHE_VARIANT))
+                if cached is not None:
+                    results[index] = cached
+                    continue
+            pending[f"t{index}"] = text
+        
+        usage = {'input_tokens': 0, 'output_tokens': 0}
+        for _ in range(PACK_RETRIES + 1):
+            if not pending or model_name in self.json_unsupported_models:
+                break
+            
+            futures = {}
+            for pack in pack_texts(pending.items()):
+                prompt = PACKED_PROMPT + ''.join(f"[{item_id}]\n{text}\n" for item_id, text in pack)
+                config = self.client.generation_config(
+                    max_output_tokens=PACK_OUTPUT_TOKENS_PER_ITEM * len(pack) + 100,
+                    temperature=0,
+                    response_mime_type='application/json',
+                    response_schema=PACKED_RESPONSE_SCHEMA
+                )
+                try:
+                    future = self.engine.submit(
+                        model_name, prompt, scope=self.current_scope(), generation_config=config, prefix=PACKED_PROMPT
+                    )
+                except (concurrent.futures.CancelledError, TimeoutError):
+                    break
+                futures[future] = pack
+            
+            for future in concurrent.futures.as_completed(futures):
+                pack = futures[future]
+                try:
+                    response = future.result()
+                except Exception as e:
+                    if 'json' in str(e).lower() or 'mime' in str(e).lower():
+                        self.json_unsupported_models.add(model_name)
+                    print(f"Paket analizi başarısız ({len(pack)} metin): {str(e)}", file=sys.stderr)
+                    continue
+                
+                pack_usage = response_usage(response)
+                pack_chars = sum(len(text) for _, text in pack) or 1
+                for item_id, text in pack:
+                    item_usage = items[int(item_id[1:])][1]
+                    for key, value in pack_usage.items():
+                        item_usage[key] += round(value * len(text) / pack_chars)
+                for key, value in pack_usage.items():
+                    usage[key] += value
+                verdicts = parse_packed_verdicts(response_text(response), {item_id for item_id, _ in pack})
+                for item_id, rendered in verdicts.items():
+                    text = pending.pop(item_id)
+                    results[int(item_id[1:])] = rendered
+                    if self.result_cache:
+                        self.result_cache.put(ResultCache.make_key(text, model_name, PACKED_CACHE_VARIANT), rendered)
+        
+        # Paketle alınamayan metinler tek tek analiz edilir
+        for item_id, text in pending.items():
+            index = int(item_id[1:])
+            self.call_state.model = None
+            results[index] = self.analyze_single(text, model_name=model_name)
+            item_usage = items[index][1]
+            for key, value in self.last_usage().items():
+                usage[key] += value
+                item_usage[key] += value
+            items[index] = (self.call_state.model or model_name, item_usage)
+        
+        self.call_state.usage = usage
+        self.call_state.packed = items
+        return results
+    
+    def last_packed(self):
+        """(model, usage) of every item of the last analyze_packed call on the calling thread"""
+        return getattr(self.call_state, 'packed', [])
+    
+    def analyze_texts_packed(self, texts, sources=None):
+        """Packed counterpart of analyze_text for a block of short texts.
+
+        Goes through the near-duplicate index the same way and returns
+        [(result, AnalysisResult, duplicate)] in input order.
+        """
+        started = time.perf_counter()
+        sources = sources or [None] * len(texts)
+        results = [None] * len(texts)
+        duplicates = [None] * len(texts)
+        signatures = [None] * len(texts)
+        pending = []
+        for index, text in enumerate(texts):
+            if self.duplicate_index is not None:
+                signatures[index] = self.duplicate_index.signature(text)
+                duplicates[index] = self.duplicate_index.query(text, signatures[index])
+                if duplicates[index] and self.duplicate_mode == 'reuse':
+                    results[index] = self.annotate_duplicate(duplicates[index]['result'], duplicates[index])
+                    continue
+            pending.append(index)
+        
+        items = [(self.current_model, {'input_tokens': 0, 'output_tokens': 0}) for _ in texts]
+        if pending:
+            fresh = self.analyze_packed([texts[index] for index in pending])
+            for index, result, item in zip(pending, fresh, self.last_packed()):
+                items[index] = item
+                duplicate = duplicates[index]
+                if self.duplicate_index is not None and parse_verdict(result)[0] \
+                        and not (duplicate and duplicate['similarity'] >= 1.0):
+                    self.duplicate_index.add(texts[index], result, sources[index], signatures[index])
+                results[index] = self.annotate_duplicate(result, duplicate) if duplicate else result
+        
+        elapsed = time.perf_counter() - started
+        return [
+            (result, AnalysisResult.parse(result, model, elapsed, **usage), duplicate)
+            for result, (model, usage), duplicate in zip(results, items, duplicates)
+        ]
 
     def start_analysis(self):
         if self.is_analyzing:
-            self.cancel_analysis = True
+            # Bekleyen Gemini çağrıları iptal edilir; worker thread hemen serbest kalır
+            self.analysis_scope.cancel()
+            self.is_analyzing = False
             self.analyze_button.configure(text="Analiz Et")
             return
 
-        text = self.input_text.get("1.0", tk.END).strip()
+        raw_text = self.input_text.get("1.0", "end-1c")
+        text = raw_text.strip()
         if not text:
             messagebox.showwarning("Uyarı", "Lütfen analiz edilecek bir metin girin.")
             return
+        
+        if not self.analysis_slots.acquire(blocking=False):
+            # İptal edilen analizler henüz kapanmadı: thread birikmesin
+            self.set_status("Önceki analiz sonlandırılıyor, lütfen bekleyin...")
+            return
 
         self.is_analyzing = True
-        self.cancel_analysis = False
+        self.analysis_scope = CancelScope(ANALYSIS_TIMEOUT)
+        self.result_streaming = False
+        self.analysis_id += 1
         self.analyze_button.configure(text="İptal")
         
         self.result_text.config(state='normal')
@@ -608,31 +3979,109 @@ Kaybederseniz yeni bir anahtar oluşturmanız gerekir.
         self.result_text.insert("1.0", "Analiz yapılıyor...\n")
         self.result_text.config(state='disabled')
         
-        self.analysis_thread = threading.Thread(target=self.run_analysis, args=(text,))
+        # Paragraf modunda konumlar giriş alanındaki metne göre hesaplanır, bu yüzden metin kırpılmaz
+        if self.paragraph_mode:
+            text = raw_text
+        self.analysis_thread = threading.Thread(
+            target=self.run_analysis, args=(text, self.analysis_id, self.analysis_scope, self.paragraph_mode),
+            daemon=True
+        )
         self.analysis_thread.start()
+        analysis_id = self.analysis_id
+        self.content_frame.after(ANALYSIS_POLL_MS, lambda: self.update_result(analysis_id))
 
-    def run_analysis(self, text):
+    def run_analysis(self, text, analysis_id, scope=None, paragraphs=False):
+        """Worker thread: push partial chunks and the final result through analysis_queue.
+
+        is_analyzing is owned by the Tk thread; this only releases the in-flight slot.
+        """
+        on_chunk = None
+        if self.stream_results and not paragraphs:
+            on_chunk = lambda chunk: self.analysis_queue.put((analysis_id, 'chunk', chunk))
+        
         try:
-            result = self.analyze_text(text)
-            if not self.cancel_analysis:
-                self.analysis_queue.put(result)
-                self.content_frame.after(100, self.update_result)
+            with self.cancel_scope(scope):
+                if paragraphs:
+                    result = (text,) + self.analyze_paragraphs(text)
+                else:
+                    result = self.analyze_text(text, on_chunk)
+            if scope is not None and scope.cancelled:
+                self.analysis_queue.put((analysis_id, 'cancelled', None))
+            else:
+                self.analysis_queue.put((analysis_id, 'paragraphs' if paragraphs else 'done', result))
         except Exception as e:
-            self.analysis_queue.put(f"Hata: {str(e)}")
-            self.content_frame.after(100, self.update_result)
+            self.analysis_queue.put((analysis_id, 'done', f"Hata: {str(e)}"))
         finally:
-            self.is_analyzing = False
-            self.content_frame.after(100, lambda: self.analyze_button.configure(text="Analiz Et"))
+            self.analysis_slots.release()
 
-    def update_result(self):
+    def update_result(self, analysis_id=None):
+        """Drain analysis_queue on the Tk thread and reschedule until the analysis ends"""
+        if analysis_id is not None and analysis_id != self.analysis_id:
+            # Yeni bir analiz başladı; eski analizin yoklama döngüsü burada biter
+            return
+        finished = False
+        self.result_text.config(state='normal')
         try:
-            result = self.analysis_queue.get_nowait()
-            self.result_text.config(state='normal')
-            self.result_text.delete("1.0", tk.END)
-            self.result_text.insert("1.0", result)
-            self.result_text.config(state='disabled')
+            while True:
+                message_id, kind, payload = self.analysis_queue.get_nowait()
+                if message_id != self.analysis_id:
+                    continue
+                
+                if kind == 'chunk':
+                    if self.analysis_scope.cancelled:
+                        continue
+                    if not self.result_streaming:
+                        # İlk parça geldiğinde "Analiz yapılıyor..." yazısını kaldır
+                        self.result_text.delete("1.0", tk.END)
+                        self.result_streaming = True
+                    self.result_text.insert(tk.END, payload)
+                    self.result_text.see(tk.END)
+                elif kind == 'done':
+                    # Akışla gelmiş sonuç zaten ekranda; yalnızca akışsız sonuçları yaz
+                    if not self.result_streaming or payload != self.result_text.get("1.0", "end-1c"):
+                        self.result_text.delete("1.0", tk.END)
+                        self.result_text.insert("1.0", payload)
+                    finished = True
+                elif kind == 'paragraphs':
+                    self.show_paragraph_results(*payload)
+                    finished = True
+                elif kind == 'cancelled':
+                    self.result_text.insert(tk.END, "\n\nAnaliz iptal edildi.")
+                    finished = True
         except queue.Empty:
             pass
+        finally:
+            self.result_text.config(state='disabled')
+        
+        if finished:
+            self.is_analyzing = False
+            self.analyze_button.configure(text="Analiz Et")
+        else:
+            self.content_frame.after(ANALYSIS_POLL_MS, lambda: self.update_result(analysis_id))
+
+    def show_paragraph_results(self, source_text, document, paragraphs):
+        """Write per-paragraph verdicts and color the matching input paragraphs (Tk thread)"""
+        for widget in (self.input_text, self.result_text):
+            for tag in PARAGRAPH_TAGS.values():
+                widget.tag_remove(tag, "1.0", tk.END)
+        
+        reused = sum(1 for *_, cached in paragraphs if cached)
+        self.result_text.delete("1.0", tk.END)
+        self.result_text.insert(tk.END, f"{document}\n\n")
+        self.result_text.insert(
+            tk.END, f"Paragraflar: {len(paragraphs) - reused} yeni analiz, {reused} önceki sonuç kullanıldı\n"
+        )
+        # Analiz sürerken metin düzenlendiyse konumlar artık tutmaz; giriş alanı renklendirilmez
+        same_input = self.input_text.get("1.0", "end-1c") == source_text
+        for number, (start, end, result, cached) in enumerate(paragraphs, 1):
+            verdict, confidence = parse_verdict(result)
+            tag = PARAGRAPH_TAGS.get(verdict)
+            preview = ' '.join(source_text[start:end].split())
+            line = f"¶{number}: {verdict or 'Değerlendirilemedi'} ({confidence or 'Bilinmiyor'})"
+            self.result_text.insert(tk.END, line + (" - önceki sonuç" if cached else "") + "\n", tag or ())
+            self.result_text.insert(tk.END, f"   {preview[:80]}{'…' if len(preview) > 80 else ''}\n")
+            if tag and same_input:
+                self.input_text.tag_add(tag, f"1.0 + {start} chars", f"1.0 + {end} chars")
 
     def clear_text(self):
         self.input_text.delete("1.0", tk.END)
@@ -644,39 +4093,19 @@ Kaybederseniz yeni bir anahtar oluşturmanız gerekir.
         self.content_frame.pack(fill="both", expand=True)
 
     def get_available_models(self):
-        """Fetch available models directly from Gemini API"""
+        """Return available models from the registry, probing stale ones in parallel"""
         try:
-            # Get all available models from Gemini API
-            models = genai.list_models()
-            available_models = []
-            
-            # Filter for Gemini models and test their availability
-            for model in models:
-                if 'gemini' in model.name.lower():
-                    try:
-                        model_instance = genai.GenerativeModel(model.name)
-                        response = model_instance.generate_content(
-                            "test",
-                            generation_config=genai.types.GenerationConfig(
-                                max_output_tokens=1,
-                                temperature=0
-                            )
-                        )
-                        available_models.append(model.name)
-                        print(f"Model {model.name} is available")
-                    except Exception as e:
-                        print(f"Model {model.name} is not available: {str(e)}")
-                        continue
+            available_models = self.model_registry.refresh()
             
             if not available_models:
-                print("No models available, falling back to gemini-pro")
+                print("No models available, falling back to gemini-pro", file=sys.stderr)
                 return ['gemini-pro']
                 
-            print(f"Available models: {available_models}")
+            print(f"Available models: {available_models}", file=sys.stderr)
             return available_models
             
         except Exception as e:
-            print(f"Error fetching models from API: {str(e)}")
+            print(f"Error fetching models from API: {str(e)}", file=sys.stderr)
             return ['gemini-pro']  # Fallback to default model
 
     def start_background_model_validation(self):
@@ -687,27 +4116,21 @@ Kaybederseniz yeni bir anahtar oluşturmanız gerekir.
     def validate_models_in_background(self):
         """Validate and update models in background"""
         try:
-            # Configure API
-            genai.configure(api_key=self.api_key)
-            
-            # Get models from API
-            models = genai.list_models()
-            new_models = []
+            # Configure API (no-op when the key is unchanged)
+            self.client.configure(self.api_key)
             
-            # Filter Gemini models
-            for model in models:
-                if 'gemini' in model.name.lower():
-                    new_models.append(model.name)
+            # Only stale registry entries are probed; a warm registry makes no calls
+            new_models = self.model_registry.refresh()
             
             if new_models:
                 # Update available models
                 self.available_models = new_models
                 # Update dropdown on main thread
                 self.content_frame.after(0, self.update_model_dropdown)
-                print("Models updated successfully")
+                print("Models updated successfully", file=sys.stderr)
             
         except Exception as e:
-            print(f"Background model validation error: {str(e)}")
+            print(f"Background model validation error: {str(e)}", file=sys.stderr)
 
     def update_model_dropdown(self):
         """Update the model dropdown with new models"""
@@ -721,65 +4144,1251 @@ Kaybederseniz yeni bir anahtar oluşturmanız gerekir.
                 self.model_var.set(self.available_models[0])
 
 class AIDetectionApp:
-    def __init__(self):
-        self.app = ctk.CTk()
-        self.app.title("Yapay Zeka Metin Tespit Etme Aracı")
-        self.app.geometry("1000x800")
+    def __init__(self, startup_report=False):
+        self.startup_report = startup_report
         
-        # Ana tema ayarları
-        ctk.set_appearance_mode("dark")
-        ctk.set_default_color_theme("blue")
+        # API key yükleme (ağ çağrısı yok; doğrulama pencere açıldıktan sonra arka planda yapılır)
+        with STARTUP_TIMER.measure('config load'):
+            api_keys = load_api_keys()
+            self.api_key = api_keys[0] if api_keys else None
         
-        # API key yükleme
-        self.config_file = 'config.json'
-        self.api_key = self.load_api_key()
+        with STARTUP_TIMER.measure('ui build'):
+            self.app = ctk.CTk()
+            self.app.title("Yapay Zeka Metin Tespit Etme Aracı")
+            self.app.geometry("1000x800")
+            
+            # Ana tema ayarları
+            ctk.set_appearance_mode("dark")
+            ctk.set_default_color_theme("blue")
+            
+            # Ana içerik frame'i
+            self.content_frame = ctk.CTkFrame(self.app)
+            self.content_frame.pack(fill="both", expand=True, padx=10, pady=10)
+            
+            # AI Detector'ı başlat
+            self.ai_detector = AIDetector(self.content_frame, start_validation=False)
         
-        if not self.api_key or not self.verify_api_key(self.api_key):
+        if self.api_key:
+            self.ai_detector.set_status("API anahtarı doğrulanıyor...")
+            threading.Thread(target=self.verify_api_key_in_background, daemon=True).start()
+        elif self.startup_report:
+            self.print_startup_report()
+
+    def verify_api_key(self, api_key):
+        """Verify if the API key is valid"""
+        try:
+            client = get_gemini_client()
+            client.configure(api_key)
+            client.list_models()
+            return True
+        except Exception:
+            return False
+
+    def verify_api_key_in_background(self):
+        """Verify the saved key off the UI thread, then start model validation"""
+        started = time.perf_counter()
+        is_valid = self.verify_api_key(self.api_key)
+        STARTUP_TIMER.record('first network call', time.perf_counter() - started)
+        self.content_frame.after(0, lambda: self.on_api_key_verified(is_valid))
+
+    def on_api_key_verified(self, is_valid):
+        """Update the UI once background key verification has finished"""
+        if is_valid:
+            self.ai_detector.set_status("Hazır")
+            self.ai_detector.start_background_model_validation()
+        else:
             self.api_key = None
+            self.ai_detector.set_status("API anahtarı doğrulanamadı")
+        if self.startup_report:
+            self.print_startup_report()
+
+    def print_startup_report(self):
+        print(json.dumps(STARTUP_TIMER.report(), ensure_ascii=False), file=sys.stderr)
+
+    def run(self):
+        self.app.mainloop()
+
+
+def use_fake_backend(backend=None):
+    """Point the shared GeminiClient (and the engine and detectors built on it) at a fake backend.
+
+    fake_genai.FakeGenAI is used by default. Clients created with their own
+    backend, like the one make_server(fake_backend=True) builds, are not affected.
+    """
+    if backend is None:
+        from fake_genai import FakeGenAI
+        backend = FakeGenAI()
+    get_gemini_client().use_backend(backend)
+    return backend
+
+
+# Yerel HTTP servis modu
+SERVER_WORKERS = 8
+SERVER_QUEUE_SIZE = 64
+SERVER_REQUEST_TIMEOUT = 60
+# Toplu istek kuyruğa metin başına bir yer kaplar: en fazla kuyruk kapasitesi kadar metin kabul edilir
+SERVER_MAX_BATCH = 64
+SERVER_MAX_BODY = 5 * 1024 * 1024
+
+
+class AnalysisService:
+    """Bounded worker pool with a bounded queue in front of AIDetector.analyze_text"""
+    
+    def __init__(self, detector, workers=SERVER_WORKERS, queue_size=SERVER_QUEUE_SIZE,
+                 request_timeout=SERVER_REQUEST_TIMEOUT):
+        self.detector = detector
+        self.workers = workers
+        self.request_timeout = request_timeout
+        self.queue = queue.Queue(queue_size)
+        self.rejected = 0
+        self.timed_out = 0
+        self.completed = 0
+        self._lock = threading.Lock()
+        for number in range(workers):
+            threading.Thread(target=self._worker, name=f"AnalysisWorker-{number}", daemon=True).start()
+    
+    def max_batch(self):
+        """Largest batch an idle service can admit at once"""
+        return min(SERVER_MAX_BATCH, self.queue.maxsize) if self.queue.maxsize > 0 else SERVER_MAX_BATCH
+    
+    def submit(self, text, timeout=None):
+        """Queue one text; raises queue.Full when the service is saturated.
+
+        The returned future carries a CancelScope whose deadline bounds the
+        Gemini calls; cancelling it frees the worker immediately.
+        """
+        future = concurrent.futures.Future()
+        future.scope = CancelScope(timeout or self.request_timeout)
+        try:
+            self.queue.put_nowait((future, text, time.perf_counter()))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise
+        return future
+    
+    def _worker(self):
+        while True:
+            future, text, queued_at = self.queue.get()
+            # İstek zaman aşımına uğrayıp iptal edildiyse hiç başlama
+            if not future.set_running_or_notify_cancel():
+                continue
+            started = time.perf_counter()
+            METRICS.observe('queue_wait_seconds', started - queued_at, queue='service')
+            try:
+                with self.detector.cancel_scope(future.scope):
+                    result = self.detector.analyze_text(text)
+                analysis = self.detector.last_result()
+                future.set_result({
+                    'result': result,
+                    'verdict': analysis.verdict,
+                    'confidence': analysis.confidence,
+                    'model': analysis.model,
+                    'elapsed': round(time.perf_counter() - started, 3),
+                    'input_tokens': analysis.input_tokens,
+                    'output_tokens': analysis.output_tokens
+                })
+                with self._lock:
+                    self.completed += 1
+            except Exception as e:
+                future.set_exception(e)
+    
+    def wait(self, futures, timeout):
+        """Wait for futures up to timeout; unfinished ones are cancelled and counted"""
+        done, not_done = concurrent.futures.wait(futures, timeout=timeout)
+        for future in not_done:
+            future.cancel()
+            future.scope.cancel()
+        if not_done:
+            with self._lock:
+                self.timed_out += len(not_done)
+        return not_done
+    
+    def health(self):
+        registry = self.detector.model_registry
+        with self._lock:
+            counters = {'completed': self.completed, 'rejected': self.rejected, 'timed_out': self.timed_out}
+        return {
+            'status': 'ok' if self.detector.api_key else 'no_api_key',
+            'current_model': self.detector.current_model,
+            'models': {
+                name: {
+                    'available': entry.get('available'),
+                    'latency': entry.get('latency'),
+                    'last_error': entry.get('last_error'),
+                    'stale': registry.is_stale(name)
+                }
+                for name, entry in list(registry.entries.items())
+            },
+            'workers': self.workers,
+            'queue_depth': self.queue.qsize(),
+            'queue_capacity': self.queue.maxsize,
+            'requests': counters,
+            'engine': self.detector.engine.stats()
+        }
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """JSON API: POST /analyze, POST /analyze/batch, GET /health and GET /metrics (with --metrics)"""
+    
+    server_version = "YapayZekaTespit/1.0"
+    
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def read_json(self):
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            self.send_json(400, {'error': "Geçersiz Content-Length."})
+            return None
+        if length > SERVER_MAX_BODY:
+            self.send_json(413, {'error': "İstek gövdesi çok büyük."})
+            return None
+        try:
+            return json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self.send_json(400, {'error': "Geçersiz JSON."})
+            return None
+    
+    def do_GET(self):
+        path = self.path.rstrip('/')
+        if path == '/health':
+            self.send_json(200, self.server.service.health())
+        elif path == '/metrics' and METRICS.enabled:
+            body = METRICS.render_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
         else:
-            # API anahtarını Gemini için ayarla
-            genai.configure(api_key=self.api_key)
+            self.send_json(404, {'error': "Bulunamadı."})
+    
+    def do_POST(self):
+        path = self.path.rstrip('/')
+        if path not in ('/analyze', '/analyze/batch'):
+            self.send_json(404, {'error': "Bulunamadı."})
+            return
         
-        # Ana içerik frame'i
-        self.content_frame = ctk.CTkFrame(self.app)
-        self.content_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        payload = self.read_json()
+        if payload is None:
+            return
+        if not isinstance(payload, dict):
+            self.send_json(400, {'error': "İstek gövdesi bir JSON nesnesi olmalı."})
+            return
+        service = self.server.service
+        timeout = payload.get('timeout')
+        if timeout is None:
+            timeout = service.request_timeout
+        elif isinstance(timeout, bool) or not isinstance(timeout, (int, float)) \
+                or not math.isfinite(timeout) or timeout <= 0:
+            self.send_json(400, {'error': "'timeout' pozitif bir sayı olmalı."})
+            return
+        timeout = min(float(timeout), service.request_timeout)
         
-        # AI Detector'ı başlat
-        self.ai_detector = AIDetector(self.content_frame)
-
-    def load_api_key(self):
-        """Load API key from config file"""
+        if path == '/analyze':
+            texts = [payload.get('text')]
+        else:
+            texts = payload.get('texts')
+            if not isinstance(texts, list):
+                self.send_json(400, {'error': "'texts' bir liste olmalı."})
+                return
+            max_batch = service.max_batch()
+            if len(texts) > max_batch:
+                self.send_json(413, {'error': f"Toplu istekte en fazla {max_batch} metin olabilir."})
+                return
+        if not texts or not all(isinstance(text, str) and text.strip() for text in texts):
+            self.send_json(400, {'error': "Analiz edilecek metin boş olamaz."})
+            return
+        
+        futures = []
         try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    config = json.load(f)
-                    return config.get('api_key')
-        except Exception:
-            return None
+            for text in texts:
+                futures.append(service.submit(text.strip(), timeout))
+        except queue.Full:
+            # Kuyruk dolu: sınırsız beklemek yerine istemciye daha sonra denemesini söyle
+            for future in futures:
+                future.cancel()
+                future.scope.cancel()
+            self.send_json(503, {'error': "Servis meşgul, daha sonra tekrar deneyin."}, {'Retry-After': '1'})
+            return
+        
+        if service.wait(futures, timeout):
+            self.send_json(504, {'error': f"Analiz {timeout:g} saniyede tamamlanamadı."})
+            return
+        
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({'error': str(e)})
+        
+        if path == '/analyze':
+            status = 502 if 'error' in results[0] else 200
+            self.send_json(status, results[0])
+        else:
+            self.send_json(200, {'results': results})
+
+
+def make_server(host='127.0.0.1', port=8080, workers=SERVER_WORKERS, queue_size=SERVER_QUEUE_SIZE,
+                request_timeout=SERVER_REQUEST_TIMEOUT, api_key=None, model=None, fake_backend=False,
+                context_cache=False, rpm=DEFAULT_RPM, tpm=DEFAULT_TPM, rpd=DEFAULT_RPD):
+    """Build the HTTP server around an AnalysisService; None when there is no API key"""
+    registry = None
+    if fake_backend:
+        # Sahte arka uç yalnızca bu sunucunun istemcisine ve motoruna bağlanır; süreçteki diğer
+        # istemciler gerçek SDK'yı kullanmaya devam eder. Model kayıtları bellekte tutulur
+        from fake_genai import FakeGenAI
+        engine = AnalysisEngine(rpm=rpm, tpm=tpm, rpd=rpd, client=GeminiClient(FakeGenAI()))
+        registry = ModelRegistry(None, engine=engine)
+        api_key = api_key or 'fake-api-key'
+    else:
+        engine = get_analysis_engine(rpm=rpm, tpm=tpm, rpd=rpd)
+    # Sahte yanıtlar gerçek sonuç önbelleğine karışmasın
+    detector = AIDetector(api_key=api_key, use_cache=not fake_backend, local_fallback=False, engine=engine,
+                          model_registry=registry)
+    if not detector.api_key:
         return None
+    if model:
+        detector.current_model = model
+    detector.raise_errors = True
+    detector.engine.context_cache.enabled = context_cache
+    # /health model durumunu gösterebilsin diye kayıtları arka planda tazele
+    threading.Thread(target=detector.model_registry.refresh, daemon=True).start()
+    
+    server = ThreadingHTTPServer((host, port), AnalysisRequestHandler)
+    server.daemon_threads = True
+    server.service = AnalysisService(detector, workers, queue_size, request_timeout)
+    return server
 
-    def save_api_key(self, api_key):
-        """Save API key to config file"""
+
+def run_server(host='127.0.0.1', port=8080, workers=SERVER_WORKERS, queue_size=SERVER_QUEUE_SIZE,
+               request_timeout=SERVER_REQUEST_TIMEOUT, api_key=None, model=None, fake_backend=False,
+               context_cache=False, rpm=DEFAULT_RPM, tpm=DEFAULT_TPM, rpd=DEFAULT_RPD):
+    """Serve analyze_text over a local HTTP/JSON API until interrupted"""
+    server = make_server(host, port, workers, queue_size, request_timeout, api_key, model, fake_backend,
+                         context_cache, rpm, tpm, rpd)
+    if server is None:
+        print("API anahtarı gerekli (config.json veya --api-key).", file=sys.stderr)
+        return 1
+    print(f"Servis http://{host}:{server.server_address[1]} adresinde çalışıyor.", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+BATCH_FILE_EXTENSIONS = ('.txt', '.md')
+
+
+def collect_input_files(inputs):
+    """Expand file paths, glob patterns and directories into a sorted file list"""
+    files = []
+    seen = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = []
+            for root, _, names in os.walk(item):
+                for name in names:
+                    if name.lower().endswith(BATCH_FILE_EXTENSIONS):
+                        matches.append(os.path.join(root, name))
+        elif glob.has_magic(item):
+            matches = glob.glob(item, recursive=True)
+        else:
+            matches = [item]
+        
+        for path in sorted(matches):
+            if path not in seen and not os.path.isdir(path):
+                seen.add(path)
+                files.append(path)
+    return files
+
+
+def file_record(path, result, analysis, duplicate=None, compact=False):
+    """Result record of one analyzed file.
+
+    With `compact` the verdict is stored as AnalysisResult.to_compact() under 'r'
+    instead of the rendered text and separate fields.
+    """
+    if compact:
+        record = {'path': path, 'r': analysis.to_compact()}
+    else:
+        record = {'path': path, 'result': result}
+        record.update(analysis.to_dict())
+    if duplicate:
+        record['duplicate_of'] = duplicate['source'] or duplicate['id']
+        record['similarity'] = duplicate['similarity']
+    return record
+
+
+def analyze_file(detector, path, compact=False):
+    """Analyze a single file and return a JSON-serializable result record (see file_record)"""
+    started = time.time()
+    record = {'path': path, 'model': detector.current_model}
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read().strip()
+        if not text:
+            record['error'] = "Boş dosya"
+        else:
+            result = detector.analyze_text(text, source=path)
+            record = file_record(path, result, detector.last_result(), detector.last_duplicate(), compact)
+    except AnalysisError as e:
+        record['error'] = str(e)
+        record['retryable'] = e.retryable
+    except Exception as e:
+        record['error'] = str(e)
+    record['elapsed'] = round(time.time() - started, 3)
+    return record
+
+
+LOCAL_BATCH_SIZE = 1024
+
+
+def run_local_batch(files, output=None):
+    """Score files with the offline stylometric detector, LOCAL_BATCH_SIZE texts per array pass"""
+    detector = get_local_detector()
+    if detector is None:
+        print("Yerel analiz için numpy gerekli.", file=sys.stderr)
+        return 1
+    
+    out = open(output, 'w', encoding='utf-8') if output else sys.stdout
+    started = time.time()
+    try:
+        for offset in range(0, len(files), LOCAL_BATCH_SIZE):
+            paths = files[offset:offset + LOCAL_BATCH_SIZE]
+            texts = []
+            for path in paths:
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    texts.append(f.read().strip())
+            for path, (verdict, confidence, probability) in zip(paths, detector.analyze_batch(texts)):
+                record = {
+                    'path': path, 'model': detector.name, 'verdict': verdict,
+                    'confidence': confidence, 'ai_probability': probability
+                }
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    
+    elapsed = time.time() - started
+    print(f"{len(files)} dosya {elapsed:.2f} saniyede yerel olarak analiz edildi.", file=sys.stderr)
+    return 0
+
+
+def run_jobs(detector, store, workers, emit_record, compact=False, stop=None):
+    """Process jobs from a JobStore on `workers` threads until none are left or `stop` is set"""
+    stop = stop or threading.Event()
+    
+    def worker():
+        while not stop.is_set():
+            job = store.claim()
+            if job is None:
+                delay = store.next_retry_delay()
+                if delay is None:
+                    return
+                time.sleep(min(max(delay, 0.1), 5))
+                continue
+            
+            job_id, path = job
+            record = analyze_file(detector, path, compact)
+            if 'error' not in record:
+                store.complete(job_id, json.dumps(record, ensure_ascii=False))
+                emit_record(record)
+            elif store.fail(job_id, record['error'], record.get('retryable', False)) == 'failed':
+                emit_record(record)
+            else:
+                print(f"{path}: geçici hata, daha sonra tekrar denenecek ({record['error'][:100]})", file=sys.stderr)
+    
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def split_short_files(files, max_chars=PACK_MAX_CHARS):
+    """Split paths into (long files, short files) using the on-disk size as an upper bound"""
+    long_files = []
+    short_files = []
+    for path in files:
         try:
-            config = {'api_key': api_key}
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f)
-            return True
-        except Exception:
-            return False
+            # UTF-8'de Türkçe karakterler 2 bayt olabilir; bayt sınırı karakter sınırının iki katı
+            size = os.path.getsize(path)
+        except OSError:
+            size = None
+        (short_files if size is not None and size <= max_chars * 2 else long_files).append(path)
+    return long_files, short_files
 
-    def verify_api_key(self, api_key):
-        """Verify if the API key is valid"""
+
+def analyze_packed_files(detector, paths, compact=False):
+    """Analyze a block of short files through AIDetector.analyze_texts_packed, same records as analyze_file"""
+    started = time.time()
+    texts = []
+    records = []
+    for path in paths:
+        record = {'path': path, 'model': detector.current_model}
         try:
-            genai.configure(api_key=api_key)
-            genai.list_models()
-            return True
-        except Exception:
-            return False
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                text = f.read().strip()
+            if text:
+                texts.append((path, text))
+            else:
+                record['error'] = "Boş dosya"
+        except Exception as e:
+            record['error'] = str(e)
+        records.append(record)
+    
+    try:
+        outcomes = iter(detector.analyze_texts_packed(
+            [text for _, text in texts], [path for path, _ in texts]
+        ) if texts else [])
+    except Exception as e:
+        outcomes = None
+        for record in records:
+            record.setdefault('error', str(e))
+    elapsed = round(time.time() - started, 3)
+    for index, record in enumerate(records):
+        if 'error' not in record:
+            records[index] = record = file_record(record['path'], *next(outcomes), compact=compact)
+        record['elapsed'] = elapsed
+    return records
 
-    def run(self):
-        self.app.mainloop()
 
-if __name__ == "__main__":
-    app = AIDetectionApp()
+def run_batch(inputs, workers=4, output=None, model=None, api_key=None, use_cache=True,
+              rpm=DEFAULT_RPM, tpm=DEFAULT_TPM, token_budget=None, local=False, local_fallback=False,
+              cascade=False, pack=False, jobs=None, retry_failed=False, dedupe=None,
+              dedupe_threshold=DUPLICATE_THRESHOLD, dedupe_mode='reuse', rpd=DEFAULT_RPD, context_cache=False,
+              context_cache_ttl=CONTEXT_CACHE_TTL, compact=False,
+              cascade_escalate=None, cascade_local_accept=None):
+    """Analyze many files on a bounded worker pool without any GUI"""
+    files = collect_input_files(inputs)
+    if not files:
+        print("Analiz edilecek dosya bulunamadı.", file=sys.stderr)
+        return 1
+    if local:
+        return run_local_batch(files, output)
+    
+    engine = get_analysis_engine(rpm=rpm, tpm=tpm, rpd=rpd)
+    engine.context_cache.enabled = context_cache
+    engine.context_cache.ttl = context_cache_ttl
+    detector = AIDetector(api_key=api_key, use_cache=use_cache, local_fallback=local_fallback)
+    if not detector.api_key:
+        print("API anahtarı gerekli (config.json veya --api-key).", file=sys.stderr)
+        return 1
+    if model:
+        detector.current_model = model
+    if token_budget:
+        detector.token_budget = token_budget
+    detector.use_cascade = cascade
+    if cascade_escalate is not None:
+        detector.cascade.escalate_confidences = tuple(cascade_escalate)
+    if cascade_local_accept is not None:
+        detector.cascade.local_accept_confidences = tuple(cascade_local_accept)
+    if dedupe:
+        detector.duplicate_index = NearDuplicateIndex(dedupe, dedupe_threshold)
+        detector.duplicate_mode = dedupe_mode
+    
+    workers = max(1, workers)
+    job_store = None
+    if jobs:
+        # Yeniden başlatılan çalıştırma önceki sonuçları silmesin diye çıktıya eklenir
+        job_store = JobStore(jobs)
+        if retry_failed:
+            job_store.retry_failed()
+        job_store.add(files)
+        detector.raise_errors = True
+    out = open(output, 'a' if jobs else 'w', encoding='utf-8') if output else sys.stdout
+    started = time.time()
+    stats = {'done': 0, 'failed': 0}
+    total = len(files)
+    emit_lock = threading.Lock()
+    # Çıktıyı okuyan süreç kapandığında (ör. `| head`) yeni iş başlatılmaz
+    output_closed = threading.Event()
+    
+    def emit(future):
+        emit_record(future.result())
+    
+    def emit_record(record):
+        with emit_lock:
+            if output_closed.is_set():
+                return
+            try:
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                out.flush()
+            except BrokenPipeError:
+                output_closed.set()
+                if out is sys.stdout:
+                    os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+                return
+            stats['done'] += 1
+            stats['failed'] += 'error' in record
+            print(f"[{stats['done']}/{total}] {record['path']} ({record['elapsed']}s)", file=sys.stderr)
+    
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+    try:
+        if job_store:
+            run_jobs(detector, job_store, workers, emit_record, compact, stop=output_closed)
+            files = []
+        
+        pending = set()
+        if pack and files:
+            # Kısa dosyalar paketlenerek analiz edilir; uzun dosyalar normal yoldan devam eder
+            files, short_files = split_short_files(files)
+            for offset in range(0, len(short_files), PACK_MAX_ITEMS * workers):
+                if output_closed.is_set():
+                    break
+                block = short_files[offset:offset + PACK_MAX_ITEMS * workers]
+                for record in analyze_packed_files(detector, block, compact):
+                    emit_record(record)
+        
+        # Keep at most 2 * workers submissions in flight so huge file lists stay bounded
+        for path in files:
+            if output_closed.is_set():
+                break
+            pending.add(executor.submit(analyze_file, detector, path, compact))
+            if len(pending) >= workers * 2:
+                finished, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in finished:
+                    emit(future)
+        
+        for future in concurrent.futures.as_completed(pending):
+            if output_closed.is_set():
+                break
+            emit(future)
+    finally:
+        executor.shutdown(wait=not output_closed.is_set(), cancel_futures=output_closed.is_set())
+        if out is not sys.stdout:
+            out.close()
+    
+    done, failed = stats['done'], stats['failed']
+    elapsed = time.time() - started
+    print(
+        f"{done} dosya {elapsed:.1f} saniyede analiz edildi "
+        f"({done / elapsed if elapsed else 0:.2f} dosya/sn, {failed} hata).",
+        file=sys.stderr
+    )
+    engine_stats = engine.stats()
+    print(
+        f"API: {engine_stats['completed']} istek, {engine_stats['rate_limited']} kota beklemesi (429), "
+        f"{engine_stats['failed']} hata.",
+        file=sys.stderr
+    )
+    if len(engine_stats['per_key']) > 1:
+        for key, usage in engine_stats['per_key'].items():
+            print(
+                f"  Anahtar {key}: {usage['requests']} istek, {usage['rate_limited']} kota beklemesi, "
+                f"{usage['input_tokens'] + usage['output_tokens']} token, durum: {usage['status']}",
+                file=sys.stderr
+            )
+    if context_cache:
+        for name, values in engine_stats['context_cache'].items():
+            if 'unsupported' in values:
+                print(f"Bağlam önbelleği ({name}): kullanılamadı, tam istem gönderildi ({values['unsupported']})",
+                      file=sys.stderr)
+            if values.get('cached_requests'):
+                print(
+                    f"Bağlam önbelleği ({name}): {values['cached_requests']} istek önbellekten, "
+                    f"{values['prefix_tokens_saved']} önek tokenı tekrar gönderilmedi.",
+                    file=sys.stderr
+                )
+    if job_store:
+        counts = job_store.counts()
+        print(
+            f"İş kuyruğu: {counts['done']} tamamlandı, {counts['failed']} başarısız, "
+            f"{counts['pending']} bekliyor.",
+            file=sys.stderr
+        )
+        job_store.close()
+    if cascade:
+        tiers = detector.cascade.stats()
+        print(
+            "Kademeler: " + ', '.join(
+                f"{tier} {values['count']} ({values['mean_latency']}s)" for tier, values in tiers.items()
+            ),
+            file=sys.stderr
+        )
+    if detector.duplicate_index:
+        duplicate_stats = detector.duplicate_index.stats()
+        print(
+            f"Yakın kopya: {duplicate_stats['hits']}/{duplicate_stats['lookups']} eşleşme, "
+            f"dizinde {duplicate_stats['documents']} belge.",
+            file=sys.stderr
+        )
+        detector.duplicate_index.close()
+    if detector.result_cache:
+        cache_stats = detector.result_cache.stats()
+        print(
+            f"Önbellek: {cache_stats['hits']} isabet, {cache_stats['misses']} ıska "
+            f"(%{cache_stats['hit_rate'] * 100:.0f}), {cache_stats['entries']} kayıt.",
+            file=sys.stderr
+        )
+    return 0 if not failed else 2
+
+
+# NDJSON akış (pipeline) modu: girdi satır satır okunur, bellekte yalnızca sınırlı sayıda kayıt tutulur
+PIPE_TEXT_FIELD = 'text'
+PIPE_REORDER_WINDOW = 256
+
+
+def iter_ndjson(paths):
+    """Lazily yield (line number, parsed value) from NDJSON files ('-' or none: stdin, .gz files are decompressed).
+
+    Blank lines are skipped; a line that is not valid JSON yields its ValueError as the value.
+    """
+    number = 0
+    for path in paths or ['-']:
+        if path == '-':
+            f = sys.stdin
+        elif path.endswith('.gz'):
+            f = gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+        else:
+            f = open(path, 'r', encoding='utf-8', errors='replace')
+        try:
+            for line in f:
+                number += 1
+                if not line.strip():
+                    continue
+                try:
+                    yield number, json.loads(line)
+                except ValueError as e:
+                    yield number, e
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+def read_ndjson(paths, text_field=PIPE_TEXT_FIELD):
+    """Lazily yield (line number, record) for the analysis pipeline.
+
+    A record is a dict with the text under `text_field`; a bare JSON string is
+    taken as the text. Lines that cannot be used yield a record with 'error'.
+    """
+    for number, record in iter_ndjson(paths):
+        if isinstance(record, ValueError):
+            yield number, {'error': f"Geçersiz JSON: {str(record)}"}
+            continue
+        if isinstance(record, str):
+            record = {text_field: record}
+        if not isinstance(record, dict) or not isinstance(record.get(text_field), str):
+            yield number, {'error': f"'{text_field}' alanı bulunamadı"}
+            continue
+        yield number, record
+
+
+def analyze_record(detector, number, record, text_field=PIPE_TEXT_FIELD, compact=False):
+    """Analyze one NDJSON record; the output carries the line number, id and source of the record, not its text"""
+    started = time.time()
+    output = {'line': number}
+    for field in ('id', 'source'):
+        if field in record:
+            output[field] = record[field]
+    if 'error' in record:
+        output['error'] = record['error']
+        return output
+    output['model'] = detector.current_model
+    try:
+        text = record[text_field].strip()
+        if not text:
+            output['error'] = "Boş metin"
+        else:
+            result = detector.analyze_text(text, source=str(record.get('id', number)))
+            if compact:
+                del output['model']
+                output['r'] = detector.last_result().to_compact()
+            else:
+                output['result'] = result
+                output.update(detector.last_result().to_dict())
+    except AnalysisError as e:
+        output['error'] = str(e)
+        output['retryable'] = e.retryable
+    except Exception as e:
+        output['error'] = str(e)
+    output['elapsed'] = round(time.time() - started, 3)
+    return output
+
+
+def run_pipe(inputs, workers=4, output=None, model=None, api_key=None, use_cache=True,
+             rpm=DEFAULT_RPM, tpm=DEFAULT_TPM, rpd=DEFAULT_RPD, token_budget=None, local_fallback=False,
+             cascade=False, in_flight=None, ordered=False, reorder_window=PIPE_REORDER_WINDOW,
+             text_field=PIPE_TEXT_FIELD, compact=False, dedupe=None, dedupe_threshold=DUPLICATE_THRESHOLD,
+             dedupe_mode='reuse', context_cache=False, context_cache_ttl=CONTEXT_CACHE_TTL,
+             cascade_escalate=None, cascade_local_accept=None):
+    """Stream NDJSON records through analyze_text with bounded memory, writing NDJSON results.
+
+    At most `in_flight` records (default 2 * workers) are being analyzed at any
+    time and each result is written as soon as it is ready. With `ordered`,
+    results follow input order; a slow record holds back later ones, and
+    reading pauses once `reorder_window` records are waiting behind it.
+    """
+    engine = get_analysis_engine(rpm=rpm, tpm=tpm, rpd=rpd)
+    engine.context_cache.enabled = context_cache
+    engine.context_cache.ttl = context_cache_ttl
+    detector = AIDetector(api_key=api_key, use_cache=use_cache, local_fallback=local_fallback)
+    if not detector.api_key:
+        print("API anahtarı gerekli (config.json veya --api-key).", file=sys.stderr)
+        return 1
+    if model:
+        detector.current_model = model
+    if token_budget:
+        detector.token_budget = token_budget
+    detector.use_cascade = cascade
+    if cascade_escalate is not None:
+        detector.cascade.escalate_confidences = tuple(cascade_escalate)
+    if cascade_local_accept is not None:
+        detector.cascade.local_accept_confidences = tuple(cascade_local_accept)
+    if dedupe:
+        # Kaydın id'si (yoksa satır numarası) dizinde kaynak olarak saklanır
+        detector.duplicate_index = NearDuplicateIndex(dedupe, dedupe_threshold)
+        detector.duplicate_mode = dedupe_mode
+    
+    workers = max(1, workers)
+    in_flight = max(1, in_flight or workers * 2)
+    reorder_window = max(in_flight, reorder_window)
+    out = open(output, 'w', encoding='utf-8') if output else sys.stdout
+    started = time.time()
+    # 'next': sıralı modda yazılacak sıradaki kaydın sıra numarası
+    stats = {'done': 0, 'failed': 0, 'next': 0}
+    buffered = {}
+    
+    def write(record):
+        stats['done'] += 1
+        stats['failed'] += 'error' in record
+        out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        out.flush()
+    
+    def collect(finished):
+        for future in finished:
+            sequence, record = future.result()
+            if not ordered:
+                write(record)
+                continue
+            buffered[sequence] = record
+        # Sıralı modda yalnızca baştan kesintisiz tamamlanan kayıtlar yazılır
+        while stats['next'] in buffered:
+            write(buffered.pop(stats['next']))
+            stats['next'] += 1
+    
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+    pending = set()
+    try:
+        for sequence, (number, record) in enumerate(read_ndjson(inputs, text_field)):
+            pending.add(executor.submit(
+                lambda sequence=sequence, number=number, record=record:
+                    (sequence, analyze_record(detector, number, record, text_field, compact))
+            ))
+            # Girdi, işlenen ve sıra bekleyen kayıtlar sınırın altına inene kadar okunmaz
+            while len(pending) >= in_flight or (ordered and len(pending) + len(buffered) >= reorder_window):
+                finished, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                collect(finished)
+        while pending:
+            finished, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            collect(finished)
+    except BrokenPipeError:
+        # Çıktıyı okuyan süreç kapandı (ör. `| head`): kalan işler iptal edilir, sessizce çıkılır
+        for future in pending:
+            future.cancel()
+        if out is sys.stdout:
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        if out is not sys.stdout:
+            out.close()
+    
+    done, failed = stats['done'], stats['failed']
+    elapsed = time.time() - started
+    engine_stats = engine.stats()
+    print(
+        f"{done} kayıt {elapsed:.1f} saniyede analiz edildi "
+        f"({done / elapsed if elapsed else 0:.2f} kayıt/sn, {failed} hata); "
+        f"API: {engine_stats['completed']} istek, {engine_stats['rate_limited']} kota beklemesi (429).",
+        file=sys.stderr
+    )
+    if context_cache:
+        saved = sum(values.get('prefix_tokens_saved', 0) for values in engine_stats['context_cache'].values())
+        print(f"Bağlam önbelleği: {saved} önek tokenı tekrar gönderilmedi.", file=sys.stderr)
+    if detector.duplicate_index:
+        duplicate_stats = detector.duplicate_index.stats()
+        print(
+            f"Yakın kopya: {duplicate_stats['hits']}/{duplicate_stats['lookups']} eşleşme, "
+            f"dizinde {duplicate_stats['documents']} belge.",
+            file=sys.stderr
+        )
+        detector.duplicate_index.close()
+    return 0 if not failed else 2
+
+
+# Derlem raporu: sonuç kayıtları tek geçişte, küçük gruplar halinde numpy sayaçlarına katlanır
+REPORT_BATCH_SIZE = 4096
+REPORT_LATENCY_MIN = 0.001
+REPORT_LATENCY_MAX = 600.0
+REPORT_LATENCY_BINS = 200
+REPORT_PERCENTILES = (50, 95, 99)
+
+
+class CorpusReport:
+    """One-pass aggregate over analysis result records with NumPy counters.
+
+    Records are parsed into AnalysisResult, buffered in batches of
+    REPORT_BATCH_SIZE and folded into arrays: verdict counts per group (folder
+    of 'path', else 'source'), a verdict x confidence matrix, per-model
+    latency histograms on log-spaced bins (percentiles need no raw samples)
+    and token totals. For per-model disagreement only (document hash, model,
+    verdict) triples are kept, 11 bytes each, and joined when the report is built.
+    Code len(VERDICTS) / len(CONFIDENCES) stands for "no verdict" / "unknown".
+    """
+    
+    def __init__(self):
+        self.records = 0
+        self.errors = 0
+        self.groups = {}
+        self.models = {}
+        self.group_counts = np.zeros((0, len(VERDICTS) + 1), dtype=np.int64)
+        self.confidence_counts = np.zeros((len(VERDICTS) + 1, len(CONFIDENCES) + 1), dtype=np.int64)
+        self.latency_edges = np.geomspace(REPORT_LATENCY_MIN, REPORT_LATENCY_MAX, REPORT_LATENCY_BINS)
+        self.latency_counts = np.zeros((0, REPORT_LATENCY_BINS + 1), dtype=np.int64)
+        self.token_totals = np.zeros((0, 2), dtype=np.int64)
+        self.model_counts = np.zeros((0, len(VERDICTS) + 1), dtype=np.int64)
+        self.documents = np.zeros(1024, dtype=[('document', '<u8'), ('model', '<u2'), ('verdict', 'i1')])
+        self.documents_used = 0
+        self._batch = []
+    
+    @staticmethod
+    def _index(mapping, name):
+        index = mapping.get(name)
+        if index is None:
+            index = mapping[name] = len(mapping)
+        return index
+    
+    @staticmethod
+    def _grow(array, rows):
+        if rows <= len(array):
+            return array
+        grown = np.zeros((max(rows, len(array) * 2),) + array.shape[1:], dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+    
+    def add(self, record):
+        """Add one batch / pipe output record (rendered, structured or compact form)"""
+        self.records += 1
+        if 'error' in record:
+            self.errors += 1
+        result = AnalysisResult.from_record(record)
+        path = record.get('path')
+        group = (os.path.dirname(path) or '.') if path else str(record.get('source', '-'))
+        document = path or record.get('id')
+        if document is not None:
+            document = int.from_bytes(hashlib.blake2b(str(document).encode('utf-8'), digest_size=8).digest(), 'little')
+        self._batch.append((
+            self._index(self.groups, group),
+            self._index(self.models, result.model or '-'),
+            VERDICTS.index(result.verdict) if result.verdict in VERDICTS else len(VERDICTS),
+            CONFIDENCES.index(result.confidence) if result.confidence in CONFIDENCES else len(CONFIDENCES),
+            -1.0 if result.latency is None else float(result.latency),
+            result.input_tokens or 0,
+            result.output_tokens or 0,
+            document
+        ))
+        if len(self._batch) >= REPORT_BATCH_SIZE:
+            self.flush()
+    
+    def flush(self):
+        """Fold the buffered records into the counters"""
+        if not self._batch:
+            return
+        batch = self._batch
+        self._batch = []
+        groups, models, verdicts, confidences = (np.fromiter((row[i] for row in batch), np.int64, len(batch))
+                                                 for i in range(4))
+        latencies = np.fromiter((row[4] for row in batch), np.float64, len(batch))
+        tokens = np.array([(row[5], row[6]) for row in batch], dtype=np.int64)
+        
+        self.group_counts = self._grow(self.group_counts, len(self.groups))
+        self.model_counts = self._grow(self.model_counts, len(self.models))
+        self.latency_counts = self._grow(self.latency_counts, len(self.models))
+        self.token_totals = self._grow(self.token_totals, len(self.models))
+        np.add.at(self.group_counts, (groups, verdicts), 1)
+        np.add.at(self.model_counts, (models, verdicts), 1)
+        np.add.at(self.confidence_counts, (verdicts, confidences), 1)
+        np.add.at(self.token_totals, models, tokens)
+        timed = latencies >= 0
+        bins = np.searchsorted(self.latency_edges, latencies[timed])
+        np.add.at(self.latency_counts, (models[timed], bins), 1)
+        
+        # Anlaşmazlık için yalnızca kararı olan ve kimliği bilinen belgeler tutulur
+        tracked = [(row[7], row[1], row[2]) for row in batch if row[7] is not None and row[2] < len(VERDICTS)]
+        if tracked:
+            self.documents = self._grow(self.documents, self.documents_used + len(tracked))
+            self.documents[self.documents_used:self.documents_used + len(tracked)] = tracked
+            self.documents_used += len(tracked)
+    
+    def latency_percentiles(self, counts):
+        """Percentiles from a histogram row; each bin is represented by its geometric midpoint"""
+        total = counts.sum()
+        if not total:
+            return {}
+        edges = self.latency_edges
+        midpoints = np.concatenate(([edges[0]], np.sqrt(edges[:-1] * edges[1:]), [edges[-1]]))
+        cumulative = np.cumsum(counts)
+        return {
+            f"p{percentile}": round(float(midpoints[np.searchsorted(cumulative, total * percentile / 100)]), 4)
+            for percentile in REPORT_PERCENTILES
+        }
+    
+    def disagreement(self):
+        """Share of documents analyzed by both models of a pair on which their verdicts differ"""
+        documents = self.documents[:self.documents_used]
+        latest = {}
+        for model, index in self.models.items():
+            rows = documents[documents['model'] == index][::-1]
+            # Aynı belge aynı modelle birden çok kez analiz edildiyse son sonuç sayılır
+            unique, first = np.unique(rows['document'], return_index=True)
+            if len(unique):
+                latest[model] = (unique, rows['verdict'][first])
+        report = {}
+        names = sorted(latest)
+        for position, first_model in enumerate(names):
+            for second_model in names[position + 1:]:
+                (first_documents, first_verdicts), (second_documents, second_verdicts) = \
+                    latest[first_model], latest[second_model]
+                _, first_index, second_index = np.intersect1d(
+                    first_documents, second_documents, assume_unique=True, return_indices=True
+                )
+                if not len(first_index):
+                    continue
+                differ = int(np.count_nonzero(first_verdicts[first_index] != second_verdicts[second_index]))
+                report[f"{first_model} / {second_model}"] = {
+                    'shared_documents': len(first_index),
+                    'disagreements': differ,
+                    'disagreement_rate': round(differ / len(first_index), 4)
+                }
+        return report
+    
+    @staticmethod
+    def _verdict_summary(counts):
+        decided = int(counts[:len(VERDICTS)].sum())
+        summary = {'documents': int(counts.sum()), 'no_verdict': int(counts[len(VERDICTS)])}
+        summary.update({verdict: int(counts[index]) for index, verdict in enumerate(VERDICTS)})
+        summary['ai_rate'] = round(int(counts[0]) / decided, 4) if decided else None
+        return summary
+    
+    def report(self):
+        """Build the report dict from the counters (flushes pending records first)"""
+        self.flush()
+        totals = self.group_counts[:len(self.groups)].sum(axis=0) if self.groups \
+            else np.zeros(len(VERDICTS) + 1, dtype=np.int64)
+        models = {}
+        for name, index in self.models.items():
+            summary = self._verdict_summary(self.model_counts[index])
+            summary.update(self.latency_percentiles(self.latency_counts[index]))
+            summary['input_tokens'] = int(self.token_totals[index, 0])
+            summary['output_tokens'] = int(self.token_totals[index, 1])
+            models[name] = summary
+        return {
+            'records': self.records,
+            'errors': self.errors,
+            'overall': self._verdict_summary(totals),
+            'groups': {
+                name: self._verdict_summary(self.group_counts[index])
+                for name, index in sorted(self.groups.items())
+            },
+            'confidence': {
+                verdict: {
+                    confidence: int(self.confidence_counts[row, column])
+                    for column, confidence in enumerate(CONFIDENCES + ('Bilinmiyor',))
+                }
+                for row, verdict in enumerate(VERDICTS)
+            },
+            'models': models,
+            'disagreement': self.disagreement()
+        }
+
+
+def run_report(inputs, output=None):
+    """Aggregate result JSONL files (or stdin) into a CorpusReport in one streaming pass"""
+    if not np.is_installed():
+        print("Rapor için numpy gerekli.", file=sys.stderr)
+        return 1
+    report = CorpusReport()
+    skipped = 0
+    started = time.time()
+    for _, record in iter_ndjson(inputs):
+        if isinstance(record, dict):
+            report.add(record)
+        else:
+            skipped += 1
+    data = report.report()
+    data['skipped_lines'] = skipped
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    print(f"{report.records} kayıt {time.time() - started:.1f} saniyede raporlandı.", file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Yapay Zeka Metin Tespit Aracı")
+    parser.add_argument('inputs', nargs='*',
+                        help="Analiz edilecek dosyalar, glob desenleri veya klasörler (verilmezse arayüz açılır)")
+    parser.add_argument('-w', '--workers', type=int, default=4,
+                        help="Eşzamanlı analiz sayısı (varsayılan: 4)")
+    parser.add_argument('-o', '--output',
+                        help="Sonuçların yazılacağı JSONL dosyası (varsayılan: stdout)")
+    parser.add_argument('-m', '--model', help="Kullanılacak Gemini modeli")
+    parser.add_argument('--api-key', action='append',
+                        help="config.json yerine kullanılacak API anahtarı (havuz için birden çok kez verilebilir)")
+    parser.add_argument('--no-cache', action='store_true', help="Sonuç önbelleğini kullanma")
+    parser.add_argument('--rpm', type=int, default=DEFAULT_RPM,
+                        help=f"Anahtar ve model başına dakikalık istek sınırı (varsayılan: {DEFAULT_RPM})")
+    parser.add_argument('--tpm', type=int, default=DEFAULT_TPM,
+                        help=f"Anahtar ve model başına dakikalık token sınırı (varsayılan: {DEFAULT_TPM})")
+    parser.add_argument('--rpd', type=int, default=DEFAULT_RPD,
+                        help="Anahtar başına günlük istek sınırı (varsayılan: sınırsız)")
+    parser.add_argument('--input-budget', type=int, default=INPUT_TOKEN_BUDGET,
+                        help=f"İstek başına girdi token bütçesi (varsayılan: {INPUT_TOKEN_BUDGET})")
+    parser.add_argument('--max-output-tokens', type=int, default=MAX_OUTPUT_TOKENS,
+                        help=f"Yanıt başına en fazla token (varsayılan: {MAX_OUTPUT_TOKENS})")
+    parser.add_argument('--overflow', choices=['chunk', 'trim'], default='chunk',
+                        help="Bütçeyi aşan metinler: bölümle (chunk) veya kırp (trim)")
+    parser.add_argument('--local', action='store_true',
+                        help="Gemini yerine çevrimdışı stilometrik analiz kullan (numpy gerekir)")
+    parser.add_argument('--fallback', action='store_true',
+                        help="Gemini'ye ulaşılamazsa yerel analize geç")
+    parser.add_argument('--cascade', action='store_true',
+                        help="Kademeli analiz: yerel tarama -> hızlı model -> gerekirse güçlü model")
+    parser.add_argument('--cascade-escalate', metavar='GÜVEN', action='append', choices=CONFIDENCES,
+                        help="Kademede hızlı modelin bu güven seviyesindeki sonuçları güçlü modele aktarılır "
+                             f"(tekrarlanabilir; varsayılan: {', '.join(CASCADE_ESCALATE_CONFIDENCES)}; "
+                             "ai_features.json: cascade_escalate_confidences)")
+    parser.add_argument('--cascade-local-accept', metavar='GÜVEN', action='append', choices=CONFIDENCES,
+                        help="Kademede bu güven seviyesindeki stilometri sonuçları modele gönderilmeden kabul edilir "
+                             "(tekrarlanabilir, numpy gerekir; varsayılan: stilometrik kademe kapalı; ai_features.json: "
+                             "cascade_local_accept_confidences)")
+    parser.add_argument('--pack', action='store_true',
+                        help=f"{PACK_MAX_CHARS} karakterden kısa metinleri tek istekte toplu analiz et")
+    parser.add_argument('--jobs', metavar='DOSYA',
+                        help="Kalıcı iş kuyruğu (SQLite); yarıda kalan çalıştırma kaldığı yerden devam eder")
+    parser.add_argument('--retry-failed', action='store_true',
+                        help="İş kuyruğundaki başarısız işleri yeniden dene")
+    parser.add_argument('--dedupe', metavar='DOSYA',
+                        help="Yakın kopya dizini (SQLite); benzer metinler için önceki sonuç kullanılır")
+    parser.add_argument('--dedupe-threshold', type=float, default=DUPLICATE_THRESHOLD,
+                        help=f"Yakın kopya sayılacak en düşük Jaccard benzerliği (varsayılan: {DUPLICATE_THRESHOLD})")
+    parser.add_argument('--dedupe-mode', choices=['reuse', 'flag'], default='reuse',
+                        help="reuse: önceki sonucu kullan (API çağrısı yok), flag: yine analiz et ama işaretle")
+    parser.add_argument('--context-cache', action='store_true',
+                        help="Sabit talimat önekini Gemini bağlam önbelleğine al; istekler yalnızca metni gönderir")
+    parser.add_argument('--context-cache-ttl', type=int, default=CONTEXT_CACHE_TTL,
+                        help=f"Bağlam önbelleği ömrü, saniye (varsayılan: {CONTEXT_CACHE_TTL})")
+    parser.add_argument('--pipe', action='store_true',
+                        help="NDJSON akış modu: stdin'den (ya da verilen .jsonl/.jsonl.gz dosyalarından) okuyup "
+                             "sonuçları satır satır yaz")
+    parser.add_argument('--text-field', default=PIPE_TEXT_FIELD,
+                        help=f"Akış modunda metnin bulunduğu alan (varsayılan: {PIPE_TEXT_FIELD})")
+    parser.add_argument('--in-flight', type=int,
+                        help="Akış modunda aynı anda işlenen en fazla kayıt (varsayılan: 2 x workers)")
+    parser.add_argument('--ordered', action='store_true',
+                        help="Akış modunda sonuçları girdi sırasıyla yaz")
+    parser.add_argument('--reorder-window', type=int, default=PIPE_REORDER_WINDOW,
+                        help=f"Sıralı akışta sıra bekleyebilecek en fazla kayıt (varsayılan: {PIPE_REORDER_WINDOW})")
+    parser.add_argument('--compact', action='store_true',
+                        help="Sonuçları kısa yapılandırılmış biçimde yaz ('r': [karar, güven, model, ms, girdi, çıktı, nedenler])")
+    parser.add_argument('--report', action='store_true',
+                        help="Verilen sonuç JSONL dosyalarından (ya da stdin'den) tek geçişte derlem raporu üret (numpy gerekir)")
+    parser.add_argument('--serve', action='store_true', help="Yerel HTTP/JSON servisini başlat")
+    parser.add_argument('--host', default='127.0.0.1', help="Servis adresi (varsayılan: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8080, help="Servis portu (varsayılan: 8080)")
+    parser.add_argument('--queue-size', type=int, default=SERVER_QUEUE_SIZE,
+                        help=f"Servis kuyruğu kapasitesi; dolunca 503 döner (varsayılan: {SERVER_QUEUE_SIZE})")
+    parser.add_argument('--request-timeout', type=float, default=SERVER_REQUEST_TIMEOUT,
+                        help=f"İstek başına en fazla süre, saniye (varsayılan: {SERVER_REQUEST_TIMEOUT})")
+    parser.add_argument('--fake-backend', action='store_true',
+                        help="Gemini yerine sahte yerel arka uç kullan (test için)")
+    parser.add_argument('--metrics', action='store_true',
+                        help="Aşama süreleri, model gecikmeleri ve hata sayılarını topla (servis: GET /metrics)")
+    parser.add_argument('--metrics-file', metavar='DOSYA',
+                        help="Metriklerin JSON anlık görüntüsünü periyodik olarak bu dosyaya yaz (--metrics içerir)")
+    parser.add_argument('--metrics-interval', type=float, default=METRICS_SNAPSHOT_INTERVAL,
+                        help=f"JSON anlık görüntü aralığı, saniye (varsayılan: {METRICS_SNAPSHOT_INTERVAL})")
+    parser.add_argument('--startup-report', action='store_true',
+                        help="Başlangıç aşamalarının sürelerini (ms) stderr'e yaz")
+    args = parser.parse_args(argv)
+    STARTUP_TIMER.record('imports', _MODULE_LOADED - _MODULE_STARTED)
+    
+    if args.metrics or args.metrics_file:
+        METRICS.enable()
+    if args.metrics_file:
+        METRICS.start_snapshots(args.metrics_file, args.metrics_interval)
+        # Kısa süren batch çalıştırmalarında da son durum dosyaya yazılsın
+        atexit.register(METRICS.write_snapshot, args.metrics_file)
+    
+    if args.report:
+        return run_report(args.inputs, args.output)
+    if args.serve:
+        return run_server(args.host, args.port, args.workers, args.queue_size, args.request_timeout,
+                          args.api_key, args.model, args.fake_backend, args.context_cache,
+                          args.rpm, args.tpm, args.rpd)
+    if args.fake_backend:
+        use_fake_backend()
+        args.api_key = args.api_key or 'fake-api-key'
+        args.no_cache = True
+    
+    if args.pipe:
+        # Dosya listesi gerektiren seçenekler akış modunda anlamsız; sessizce yok sayılmaz
+        unsupported = [flag for flag, value in (('--local', args.local), ('--pack', args.pack),
+                                                ('--jobs', args.jobs), ('--retry-failed', args.retry_failed))
+                       if value]
+        if unsupported:
+            parser.error(f"--pipe ile kullanılamaz: {', '.join(unsupported)}")
+        return run_pipe(args.inputs, args.workers, args.output, args.model, args.api_key,
+                        use_cache=not args.no_cache, rpm=args.rpm, tpm=args.tpm, rpd=args.rpd,
+                        token_budget=TokenBudget(args.input_budget, args.max_output_tokens, args.overflow),
+                        local_fallback=args.fallback, cascade=args.cascade, in_flight=args.in_flight,
+                        ordered=args.ordered, reorder_window=args.reorder_window, text_field=args.text_field,
+                        compact=args.compact, dedupe=args.dedupe, dedupe_threshold=args.dedupe_threshold,
+                        dedupe_mode=args.dedupe_mode, context_cache=args.context_cache,
+                        context_cache_ttl=args.context_cache_ttl, cascade_escalate=args.cascade_escalate,
+                        cascade_local_accept=args.cascade_local_accept)
+    if args.inputs:
+        return run_batch(args.inputs, args.workers, args.output, args.model, args.api_key,
+                         use_cache=not args.no_cache, rpm=args.rpm, tpm=args.tpm,
+                         token_budget=TokenBudget(args.input_budget, args.max_output_tokens, args.overflow),
+                         local=args.local, local_fallback=args.fallback, cascade=args.cascade,
+                         pack=args.pack, jobs=args.jobs, retry_failed=args.retry_failed,
+                         dedupe=args.dedupe, dedupe_threshold=args.dedupe_threshold, dedupe_mode=args.dedupe_mode,
+                         rpd=args.rpd, context_cache=args.context_cache, context_cache_ttl=args.context_cache_ttl,
+                         compact=args.compact, cascade_escalate=args.cascade_escalate,
+                         cascade_local_accept=args.cascade_local_accept)
+    
+    if tk is None or not ctk.is_installed():
+        print("Arayüz için customtkinter gerekli. Batch modu için dosya verin.", file=sys.stderr)
+        return 1
+    app = AIDetectionApp(startup_report=args.startup_report)
     app.run()
+    return 0
+
+
+_MODULE_LOADED = time.perf_counter()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
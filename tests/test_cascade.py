@@ -0,0 +1,68 @@
+"""Unit tests for the cascade's local tier and escalation thresholds."""
+import os
+import sys
+import threading
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+
+def verdict(result, confidence):
+    return f"- Sonuç: {result}\n- Güven Seviyesi: {confidence}\n- Nedenler:\n  • test"
+
+
+class StubDetector:
+    """Just enough of AIDetector for CascadeScheduler; answers are set per model"""
+
+    available_models = ['gemini-1.5-flash', 'gemini-1.5-pro']
+    current_model = 'gemini-1.5-flash'
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.calls = []
+        self.call_state = threading.local()
+
+    def analyze_single(self, text, on_chunk=None, model_name=None, fallback=True):
+        self.calls.append(model_name)
+        return self.answers[model_name]
+
+    def last_usage(self):
+        return {'input_tokens': 1, 'output_tokens': 1}
+
+
+class CascadeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.detector = StubDetector({
+            'gemini-1.5-flash': verdict('İnsan', 'Düşük'),
+            'gemini-1.5-pro': verdict('İnsan', 'Yüksek'),
+        })
+        self.local = SimpleNamespace(name='stylometry', analyze_text=lambda text: verdict('Yapay Zeka', 'Yüksek'))
+        self.previous = main.get_local_detector
+        main.get_local_detector = lambda: self.local
+
+    def tearDown(self):
+        main.get_local_detector = self.previous
+
+    def test_local_tier_is_off_by_default(self):
+        cascade = main.CascadeScheduler(self.detector)
+        self.assertIn('güçlü model', cascade.analyze("metin"))
+        self.assertEqual(self.detector.calls, ['gemini-1.5-flash', 'gemini-1.5-pro'])
+
+    def test_configured_local_confidence_skips_the_models(self):
+        cascade = main.CascadeScheduler(self.detector, local_accept_confidences=['Yüksek'])
+        self.assertIn('Yapay Zeka', cascade.analyze("metin"))
+        self.assertEqual(self.detector.calls, [])
+        self.assertEqual(cascade.stats()['local']['count'], 1)
+
+    def test_escalation_threshold(self):
+        cascade = main.CascadeScheduler(self.detector, escalate_confidences=())
+        self.assertIn('hızlı model', cascade.analyze("metin"))
+        self.assertEqual(self.detector.calls, ['gemini-1.5-flash'])
+
+
+if __name__ == '__main__':
+    unittest.main()
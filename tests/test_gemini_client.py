@@ -0,0 +1,36 @@
+"""Unit tests for binding pooled API keys to GenerativeModel instances."""
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from fake_genai import FakeGenAI  # noqa: E402
+
+
+class BindKeyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = FakeGenAI(latency=0)
+        self.client = main.GeminiClient(self.backend)
+        self.client.configure('birincil', ['ikincil'])
+
+    def test_extra_key_gets_its_own_transport_clients(self):
+        model = self.client.model('gemini-pro', 'ikincil')
+        self.assertEqual(model._client.api_key, 'ikincil')
+        self.assertEqual(model._async_client.api_key, 'ikincil')
+        # Birincil anahtar genai.configure ile gider, istemci SDK'ya bırakılır
+        self.assertIsNone(self.client.model('gemini-pro')._client)
+
+    def test_missing_private_clients_fail_loudly(self):
+        # SDK _client/_async_client alanlarını kaldırırsa ek anahtar sessizce birincil anahtara düşmemeli
+        self.backend.GenerativeModel = lambda name, **kwargs: SimpleNamespace(model_name=name)
+        with self.assertRaises(RuntimeError):
+            self.client.model('gemini-pro', 'ikincil')
+        self.assertIsNotNone(self.client.model('gemini-pro'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+"""Unit tests for latency bookkeeping of hedged requests."""
+import concurrent.futures
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from fake_genai import FakeGenAI  # noqa: E402
+
+
+class HedgedLatencyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = main.AnalysisEngine(client=main.GeminiClient(FakeGenAI(latency=0)))
+        self.futures = {}
+        # İstekler gerçek API yerine sonucu testte belirlenen future'lara gider
+        self.engine.submit = lambda model_name, prompt, **kwargs: self.futures.setdefault(
+            model_name, concurrent.futures.Future()
+        )
+        self.engine.hedge_delay = lambda model_name: 0.05
+
+    def samples(self, model_name):
+        return list(self.engine._latencies.get(model_name, ()))
+
+    def test_primary_win_records_its_latency(self):
+        self.futures['birincil'] = concurrent.futures.Future()
+        self.futures['birincil'].set_result('yanıt')
+        self.assertEqual(self.engine.generate_hedged('birincil', "metin", 'yedek'), ('yanıt', 'birincil'))
+        self.assertEqual(len(self.samples('birincil')), 1)
+
+    def test_hedge_win_records_a_lower_bound_for_the_primary(self):
+        self.futures['yedek'] = concurrent.futures.Future()
+        self.futures['yedek'].set_result('yedek yanıt')
+        self.assertEqual(self.engine.generate_hedged('birincil', "metin", 'yedek'), ('yedek yanıt', 'yedek'))
+        samples = self.samples('birincil')
+        self.assertEqual(len(samples), 1)
+        self.assertGreaterEqual(samples[0], 0.05)
+        self.assertEqual(self.samples('yedek'), [])
+
+    def test_failed_primary_records_nothing(self):
+        self.futures['birincil'] = concurrent.futures.Future()
+        self.futures['birincil'].set_exception(RuntimeError("hata"))
+        self.futures['yedek'] = concurrent.futures.Future()
+        self.futures['yedek'].set_result('yedek yanıt')
+        # Birincil gecikme süresinden önce hata verdiği için yedek istek hiç gönderilmez
+        with self.assertRaises(RuntimeError):
+            self.engine.generate_hedged('birincil', "metin", 'yedek')
+        self.assertEqual(self.samples('birincil'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""Unit tests for the durable SQLite job queue."""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+
+class JobStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix='jobs-test-')
+        self.path = os.path.join(self.workdir, 'jobs.db')
+        self.store = main.JobStore(self.path, max_attempts=3)
+        self.store.add(['a.txt', 'b.txt'])
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def test_claim_hands_out_each_job_once(self):
+        first, second = self.store.claim(), self.store.claim()
+        self.assertEqual([first[1], second[1]], ['a.txt', 'b.txt'])
+        self.assertIsNone(self.store.claim())
+        self.assertEqual(self.store.counts()['in_flight'], 2)
+        # Aynı dosya tekrar eklenince durumu değişmez
+        self.store.add(['a.txt'])
+        self.assertIsNone(self.store.claim())
+
+    def test_resume_returns_in_flight_jobs_to_pending(self):
+        job_id, _ = self.store.claim()
+        self.store.complete(self.store.claim()[0], '{}')
+        self.store.close()
+        # Çöken çalıştırmanın yarım kalan işi yeniden açılışta tekrar kuyruğa döner
+        self.store = main.JobStore(self.path, max_attempts=3)
+        self.assertEqual(self.store.counts(), {'pending': 1, 'in_flight': 0, 'done': 1, 'failed': 0})
+        self.assertEqual(self.store.claim()[0], job_id)
+
+    def test_retryable_failure_backs_off_exponentially(self):
+        self.store.complete(self.store.claim()[0], '{}')
+        now = time.time()
+        for attempt in range(1, 3):
+            with mock.patch.object(main.time, 'time', return_value=now):
+                job_id, path = self.store.claim()
+                self.assertEqual(path, 'b.txt')
+                self.assertEqual(self.store.fail(job_id, "429", retryable=True), 'pending')
+                delay = main.JOB_RETRY_BASE_DELAY * 2 ** (attempt - 1)
+                self.assertAlmostEqual(self.store.next_retry_delay(), delay)
+                # Bekleme süresi dolmadan iş yeniden verilmez
+                self.assertIsNone(self.store.claim())
+            now += delay
+        # Son deneme de başarısız olursa iş kalıcı olarak başarısız sayılır
+        with mock.patch.object(main.time, 'time', return_value=now):
+            job_id, _ = self.store.claim()
+            self.assertEqual(self.store.fail(job_id, "429", retryable=True), 'failed')
+            self.assertIsNone(self.store.next_retry_delay())
+
+    def test_permanent_failure_and_retry_failed(self):
+        job_id, _ = self.store.claim()
+        self.assertEqual(self.store.fail(job_id, "geçersiz", retryable=False), 'failed')
+        self.store.retry_failed()
+        self.assertEqual(self.store.claim()[0], job_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
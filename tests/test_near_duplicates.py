@@ -0,0 +1,86 @@
+"""Unit tests for the MinHash/LSH near-duplicate index."""
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+
+class CandidateRankingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = main.NearDuplicateIndex(':memory:')
+        self.rows = self.index.rows
+
+    def tearDown(self):
+        self.index.close()
+
+    def test_candidates_sharing_more_bands_survive_the_limit(self):
+        query = list(range(1, self.index.num_perm + 1))
+        # Sınırdan fazla belge yalnızca ilk bandı paylaşır ve kova sırasında öndedir
+        for number in range(main.DUPLICATE_MAX_CANDIDATES + 50):
+            noise = query[:self.rows] + [10 ** 6 + number * self.index.num_perm + i
+                                         for i in range(self.index.num_perm - self.rows)]
+            self.index.add("gürültü", "- Sonuç: İnsan", f"gurultu-{number}", noise)
+        # Gerçek yakın kopya ilk bant dışındaki tüm bantları paylaşır
+        close = [0] * self.rows + query[self.rows:]
+        self.index.add("kopya", "- Sonuç: Yapay Zeka", "kopya", close)
+
+        match = self.index.query("sorgu", query)
+        self.assertIsNotNone(match)
+        self.assertEqual(match['source'], 'kopya')
+
+
+class RecallTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = main.NearDuplicateIndex(':memory:')
+        self.random = random.Random(7)
+        self.vocabulary = [f"kelime{number}" for number in range(5000)]
+
+    def tearDown(self):
+        self.index.close()
+
+    def document(self):
+        return [self.random.choice(self.vocabulary) for _ in range(300)]
+
+    def edited(self, words, changes):
+        words = list(words)
+        for position in self.random.sample(range(len(words)), changes):
+            words[position] = self.random.choice(self.vocabulary)
+        return ' '.join(words)
+
+    def test_lightly_edited_copies_are_found(self):
+        documents = [self.document() for _ in range(40)]
+        for number, words in enumerate(documents):
+            self.index.add(' '.join(words), "- Sonuç: İnsan", f"belge-{number}")
+
+        # 300 kelimede 3 değişiklik en fazla 9 shingle'ı bozar: Jaccard ~0.94, eşiğin (0.8) epey üstünde
+        found = 0
+        for number, words in enumerate(documents):
+            match = self.index.query(self.edited(words, 3))
+            if match and match['source'] == f"belge-{number}":
+                found += 1
+        self.assertGreaterEqual(found / len(documents), 0.95)
+
+    def test_unrelated_texts_are_not_matched(self):
+        for number in range(40):
+            self.index.add(' '.join(self.document()), "- Sonuç: İnsan", f"belge-{number}")
+        misses = sum(self.index.query(' '.join(self.document())) is None for _ in range(20))
+        self.assertEqual(misses, 20)
+
+    def test_exact_copy_matches_and_heavy_edit_does_not(self):
+        words = self.document()
+        original = ' '.join(words)
+        self.assertIsNone(self.index.query(original))
+        self.index.add(original, "- Sonuç: İnsan", "asil")
+        self.assertEqual(self.index.query(original)['similarity'], 1.0)
+        # Yarısı değiştirilmiş metin eşiğin altında kalır
+        self.assertIsNone(self.index.query(self.edited(words, 150)))
+
+
+if __name__ == '__main__':
+    unittest.main()
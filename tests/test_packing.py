@@ -0,0 +1,66 @@
+"""Unit tests for packing short texts and parsing packed responses."""
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+
+def item(item_id, sonuc='İnsan', guven='Orta'):
+    return {'id': item_id, 'sonuc': sonuc, 'guven': guven, 'nedenler': ['test']}
+
+
+class PackTextsTest(unittest.TestCase):
+
+    def test_keeps_order_and_respects_max_items(self):
+        items = [(f"t{i}", "kısa metin") for i in range(7)]
+        packs = main.pack_texts(items, max_items=3)
+        self.assertEqual([len(pack) for pack in packs], [3, 3, 1])
+        self.assertEqual([item_id for pack in packs for item_id, _ in pack], [item_id for item_id, _ in items])
+
+    def test_respects_token_budget(self):
+        text = "kelime " * 100
+        budget = 2 * (main.estimate_tokens(text) + 8)
+        packs = main.pack_texts([(f"t{i}", text) for i in range(5)], token_budget=budget)
+        self.assertEqual([len(pack) for pack in packs], [2, 2, 1])
+
+    def test_oversized_text_gets_its_own_pack(self):
+        packs = main.pack_texts([('t0', "a"), ('t1', "kelime " * 1000), ('t2', "b")], token_budget=50)
+        self.assertEqual([[item_id for item_id, _ in pack] for pack in packs], [['t0'], ['t1'], ['t2']])
+
+
+class ParsePackedVerdictsTest(unittest.TestCase):
+
+    def parse(self, items, expected=('t0', 't1', 't2')):
+        return main.parse_packed_verdicts(json.dumps(items, ensure_ascii=False), set(expected))
+
+    def test_out_of_order_ids(self):
+        verdicts = self.parse([item('t2', 'Yapay Zeka'), item('t0'), item('t1', 'Belirsiz')])
+        self.assertEqual(main.parse_verdict(verdicts['t0'])[0], 'İnsan')
+        self.assertEqual(main.parse_verdict(verdicts['t1'])[0], 'Belirsiz')
+        self.assertEqual(main.parse_verdict(verdicts['t2'])[0], 'Yapay Zeka')
+
+    def test_missing_ids_are_left_out(self):
+        # Eksik id'ler sonuçta yer almaz; analyze_packed onları yeniden paketler
+        self.assertEqual(set(self.parse([item('t1')])), {'t1'})
+
+    def test_duplicated_id_keeps_first_valid_answer(self):
+        verdicts = self.parse([{'id': 't0', 'sonuc': '?'}, item('t0', 'Yapay Zeka'), item('t0', 'İnsan')])
+        self.assertEqual(set(verdicts), {'t0'})
+        self.assertEqual(main.parse_verdict(verdicts['t0'])[0], 'Yapay Zeka')
+
+    def test_unknown_ids_and_malformed_items_are_ignored(self):
+        verdicts = self.parse([item('t9'), "t1", {'sonuc': 'İnsan'}, item(1)], expected=('t0', '1'))
+        self.assertEqual(set(verdicts), {'1'})
+
+    def test_wrapped_and_invalid_json(self):
+        raw = json.dumps({'items': [item('t0')]}, ensure_ascii=False)
+        self.assertEqual(set(main.parse_packed_verdicts(raw, {'t0'})), {'t0'})
+        self.assertEqual(main.parse_packed_verdicts('[{"id": "t0"', {'t0'}), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
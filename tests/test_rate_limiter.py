@@ -0,0 +1,84 @@
+"""Unit tests for the token buckets behind the per-model rate limits."""
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+
+class FakeClock:
+    """Manually advanced replacement for time.monotonic"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(main.time, 'monotonic', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Dakikada 60 birim: saniyede 1 birim dolar
+        self.bucket = main.TokenBucket(60)
+
+    def test_starts_full(self):
+        self.assertEqual(self.bucket.wait_time(60), 0.0)
+        self.assertEqual(self.bucket.used(), 0.0)
+
+    def test_refills_continuously(self):
+        self.bucket.consume(60)
+        self.assertAlmostEqual(self.bucket.wait_time(1), 1.0)
+        self.clock.now += 0.5
+        self.assertAlmostEqual(self.bucket.wait_time(1), 0.5)
+        self.clock.now += 10
+        self.assertAlmostEqual(self.bucket.wait_time(10), 0.0)
+        self.assertAlmostEqual(self.bucket.used(), 1 - 10.5 / 60)
+
+    def test_refill_is_capped_at_capacity(self):
+        self.bucket.consume(30)
+        self.clock.now += 3600
+        self.assertEqual(self.bucket.wait_time(60), 0.0)
+        self.bucket.consume(60)
+        self.assertAlmostEqual(self.bucket.wait_time(1), 1.0)
+
+    def test_request_larger_than_capacity_waits_for_a_full_bucket(self):
+        self.bucket.consume(6)
+        self.assertAlmostEqual(self.bucket.wait_time(1000), 6.0)
+
+    def test_drain_empties_the_bucket(self):
+        self.bucket.drain()
+        self.assertAlmostEqual(self.bucket.wait_time(2), 2.0)
+
+
+class RateLimiterTest(unittest.TestCase):
+
+    def test_acquire_waits_for_the_refill(self):
+        clock = FakeClock()
+        limiter = main.RateLimiter(rpm=60, tpm=10 ** 6, model_limits={})
+        sleeps = []
+
+        async def fake_sleep(delay):
+            sleeps.append(delay)
+            clock.now += delay
+
+        async def run():
+            for _ in range(61):
+                await limiter.acquire('model', 10)
+
+        with mock.patch.object(main.time, 'monotonic', clock), mock.patch.object(main.asyncio, 'sleep', fake_sleep):
+            asyncio.run(run())
+        # 60 istek hemen geçer, 61. istek bir birimin dolmasını (1 sn) bekler
+        self.assertEqual(sleeps, [1.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+"""End-to-end tests of the HTTP service mode against the fake Gemini backend."""
+import concurrent.futures
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import main  # noqa: E402
+
+QUEUE_SIZE = 8
+
+
+class ServerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # Önbellek, model kayıtları ve config.json gerçek dosyalara dokunmasın
+        cls.workdir = tempfile.mkdtemp(prefix='server-test-')
+        cls.previous_dir = os.getcwd()
+        os.chdir(cls.workdir)
+        cls.server = main.make_server(port=0, workers=4, queue_size=QUEUE_SIZE, request_timeout=10,
+                                      fake_backend=True, rpm=10 ** 6, tpm=10 ** 12)
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        os.chdir(cls.previous_dir)
+        shutil.rmtree(cls.workdir, ignore_errors=True)
+
+    def request(self, path, payload=None, body=None):
+        if payload is not None:
+            body = json.dumps(payload).encode('utf-8')
+        request = urllib.request.Request(self.url + path, data=body, method='GET' if body is None else 'POST',
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def test_analyze(self):
+        status, data = self.request('/analyze', {'text': "Bugün okulda uzun bir gün geçirdik ve çok yorulduk."})
+        self.assertEqual(status, 200)
+        self.assertIn(data['verdict'], main.VERDICTS)
+        self.assertIn(data['confidence'], main.CONFIDENCES)
+        self.assertIn("Sonuç:", data['result'])
+        self.assertGreater(data['input_tokens'], 0)
+
+    def test_analyze_reports_answering_model(self):
+        status, data = self.request('/analyze', {'text': "Bir dil modeli olarak kişisel görüş bildiremem."})
+        self.assertEqual(status, 200)
+        self.assertEqual(data['model'], main.PRESCREEN_MODEL)
+        self.assertEqual(data['verdict'], 'Yapay Zeka')
+
+    def test_single_generic_indicator_goes_to_the_model(self):
+        text = "Sağlanan bilgilere göre ödev zamanında teslim edildi."
+        local_result, hint = self.server.service.detector.prescreen(text)
+        self.assertIsNone(local_result)
+        self.assertEqual(hint, ('sağlanan bilgilere göre',))
+        status, data = self.request('/analyze', {'text': text})
+        self.assertEqual(status, 200)
+        self.assertNotEqual(data['model'], main.PRESCREEN_MODEL)
+        self.assertGreater(data['input_tokens'], 0)
+
+    def test_batch(self):
+        texts = [f"{number}. deneme metni, derste yazılan kısa bir ödev paragrafı." for number in range(QUEUE_SIZE)]
+        status, data = self.request('/analyze/batch', {'texts': texts})
+        self.assertEqual(status, 200)
+        self.assertEqual(len(data['results']), QUEUE_SIZE)
+        for result in data['results']:
+            self.assertNotIn('error', result)
+            self.assertIn(result['verdict'], main.VERDICTS)
+
+    def test_batch_larger_than_queue_is_rejected_up_front(self):
+        status, data = self.request('/analyze/batch', {'texts': ["metin"] * (QUEUE_SIZE + 1)})
+        self.assertEqual(status, 413)
+        self.assertIn(str(QUEUE_SIZE), data['error'])
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.request('/analyze', ["metin"])[0], 400)
+        self.assertEqual(self.request('/analyze', {'text': "metin", 'timeout': "abc"})[0], 400)
+        self.assertEqual(self.request('/analyze', {'text': "metin", 'timeout': -1})[0], 400)
+        self.assertEqual(self.request('/analyze', {'text': "  "})[0], 400)
+        self.assertEqual(self.request('/analyze', body=b'{bozuk')[0], 400)
+        self.assertEqual(self.request('/analyze/batch', {'texts': "metin"})[0], 400)
+        self.assertEqual(self.request('/yok', {'text': "metin"})[0], 404)
+
+    def test_fake_backend_is_scoped_to_the_server(self):
+        detector = self.server.service.detector
+        self.assertIsNotNone(detector.client.backend)
+        self.assertIsNone(main.get_gemini_client().backend)
+        self.assertIsNone(detector.model_registry.path)
+        self.assertEqual(os.listdir(self.workdir), [])
+    
+    def test_health(self):
+        status, data = self.request('/health')
+        self.assertEqual(status, 200)
+        self.assertEqual(data['queue_capacity'], QUEUE_SIZE)
+        self.assertIn('engine', data)
+
+
+class CancelScopeTest(unittest.TestCase):
+
+    def test_add_finished_future_does_not_deadlock(self):
+        # Bitmiş future'ın geri çağırması add() içinde hemen çalışır; kilit tutuluyken kilitlenme olmamalı
+        scope = main.CancelScope(10)
+        future = concurrent.futures.Future()
+        future.set_result(None)
+        worker = threading.Thread(target=scope.add, args=(future,), daemon=True)
+        worker.start()
+        worker.join(2)
+        self.assertFalse(worker.is_alive())
+        scope.cancel()
+
+    def test_cancel_reaches_pending_futures(self):
+        scope = main.CancelScope()
+        future = concurrent.futures.Future()
+        scope.add(future)
+        scope.cancel()
+        self.assertTrue(future.cancelled())
+        late = concurrent.futures.Future()
+        scope.add(late)
+        self.assertTrue(late.cancelled())
+
+
+if __name__ == '__main__':
+    unittest.main()
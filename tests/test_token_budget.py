@@ -0,0 +1,40 @@
+"""Unit tests for TokenBudget trimming."""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+
+class TrimTest(unittest.TestCase):
+
+    def setUp(self):
+        # 25 token -> 100 karakter sınırı
+        self.budget = main.TokenBudget(input_tokens=25, overflow='trim')
+
+    def test_short_text_is_untouched(self):
+        self.assertEqual(self.budget.trim("Kısa bir metin."), "Kısa bir metin.")
+
+    def test_prefers_sentence_end_near_the_limit(self):
+        text = "a" * 93 + ". " + "ikinci cümle burada devam ediyor ve sınırı aşıyor"
+        self.assertEqual(self.budget.trim(text), "a" * 93 + ".")
+
+    def test_sentence_end_exactly_at_the_limit(self):
+        text = "b" * 99 + ". sonraki"
+        self.assertEqual(self.budget.trim(text), "b" * 99 + ".")
+
+    def test_falls_back_to_word_boundary_when_sentence_end_is_far(self):
+        text = "Kısa. " + " ".join(["kelime"] * 30)
+        trimmed = self.budget.trim(text)
+        self.assertLessEqual(len(trimmed), 100)
+        self.assertGreater(len(trimmed), 90)
+        self.assertTrue(trimmed.endswith("kelime"))
+
+    def test_cuts_hard_without_any_boundary(self):
+        self.assertEqual(self.budget.trim("x" * 300), "x" * 100)
+
+
+if __name__ == '__main__':
+    unittest.main()